@@ -87,6 +87,164 @@ class ClinicaClassLoader:
         return [os.path.join(path, file) for path in paths for file in os.listdir(path) if re.match(reg, file) is not None]
 
 
+class CmdParserDescriptor:
+    """
+    Lightweight descriptor of a sub-command: the module defining its CmdParser
+    is imported (and its arguments are defined) only when the sub-command is needed
+    """
+
+    def __init__(self, name, module_name, class_name):
+        self.name = name
+        self.module_name = module_name
+        self.class_name = class_name
+
+    def load(self):
+        from importlib import import_module
+        return getattr(import_module(self.module_name), self.class_name)()
+
+
+# The order of the pipelines will be the same when typing `clinica run`
+# Pipelines are sorted by main / advanced pipelines then by modality
+RUN_PIPELINES = [
+    # Main pipelines:
+    CmdParserDescriptor('t1-freesurfer', 'clinica.pipelines.t1_freesurfer.t1_freesurfer_cli', 'T1FreeSurferCLI'),
+    CmdParserDescriptor('t1-volume', 'clinica.pipelines.t1_volume.t1_volume_cli', 'T1VolumeCLI'),
+    CmdParserDescriptor('t1-freesurfer-longitudinal',
+                        'clinica.pipelines.t1_freesurfer_longitudinal.t1_freesurfer_longitudinal_cli',
+                        'T1FreeSurferLongitudinalCLI'),
+    CmdParserDescriptor('t1-linear', 'clinica.pipelines.t1_linear.t1_linear_cli', 'T1LinearCLI'),
+    CmdParserDescriptor('dwi-preprocessing-using-fieldmap',
+                        'clinica.pipelines.dwi_preprocessing_using_phasediff_fieldmap.'
+                        'dwi_preprocessing_using_phasediff_fieldmap_cli',
+                        'DwiPreprocessingUsingPhaseDiffFieldmapCli'),
+    CmdParserDescriptor('dwi-preprocessing-using-t1',
+                        'clinica.pipelines.dwi_preprocessing_using_t1.dwi_preprocessing_using_t1_cli',
+                        'DwiPreprocessingUsingT1Cli'),
+    CmdParserDescriptor('dwi-dti', 'clinica.pipelines.dwi_dti.dwi_dti_cli', 'DwiDtiCli'),
+    CmdParserDescriptor('dwi-connectome', 'clinica.pipelines.dwi_connectome.dwi_connectome_cli', 'DwiConnectomeCli'),
+    CmdParserDescriptor('pet-volume', 'clinica.pipelines.pet_volume.pet_volume_cli', 'PETVolumeCLI'),
+    CmdParserDescriptor('pet-surface', 'clinica.pipelines.pet_surface.pet_surface_cli', 'PetSurfaceCLI'),
+    # CmdParserDescriptor('pet-surface-longitudinal', 'clinica.pipelines.pet_surface.pet_surface_longitudinal_cli',
+    #                     'PetSurfaceLongitudinalCLI'),
+    CmdParserDescriptor('deeplearning-prepare-data',
+                        'clinica.pipelines.deeplearning_prepare_data.deeplearning_prepare_data_cli',
+                        'DeepLearningPrepareDataCLI'),
+    CmdParserDescriptor('machinelearning-prepare-spatial-svm',
+                        'clinica.pipelines.machine_learning_spatial_svm.spatial_svm_cli', 'SpatialSVMCLI'),
+    CmdParserDescriptor('statistics-surface', 'clinica.pipelines.statistics_surface.statistics_surface_cli',
+                        'StatisticsSurfaceCLI'),
+    CmdParserDescriptor('statistics-volume', 'clinica.pipelines.statistics_volume.statistics_volume_cli',
+                        'StatisticsVolumeCLI'),
+    CmdParserDescriptor('statistics-volume-correction',
+                        'clinica.pipelines.statistics_volume_correction.statistics_volume_correction_cli',
+                        'StatisticsVolumeCorrectionCLI'),
+    # Advanced pipelines:
+    CmdParserDescriptor('t1-volume-existing-template',
+                        'clinica.pipelines.t1_volume_existing_template.t1_volume_existing_template_cli',
+                        'T1VolumeExistingTemplateCLI'),
+    CmdParserDescriptor('t1-volume-tissue-segmentation',
+                        'clinica.pipelines.t1_volume_tissue_segmentation.t1_volume_tissue_segmentation_cli',
+                        'T1VolumeTissueSegmentationCLI'),
+    CmdParserDescriptor('t1-volume-create-dartel',
+                        'clinica.pipelines.t1_volume_create_dartel.t1_volume_create_dartel_cli',
+                        'T1VolumeCreateDartelCLI'),
+    CmdParserDescriptor('t1-volume-register-dartel',
+                        'clinica.pipelines.t1_volume_register_dartel.t1_volume_register_dartel_cli',
+                        'T1VolumeRegisterDartelCLI'),
+    CmdParserDescriptor('t1-volume-dartel2mni', 'clinica.pipelines.t1_volume_dartel2mni.t1_volume_dartel2mni_cli',
+                        'T1VolumeDartel2MNICLI'),
+    CmdParserDescriptor('t1-volume-parcellation',
+                        'clinica.pipelines.t1_volume_parcellation.t1_volume_parcellation_cli',
+                        'T1VolumeParcellationCLI'),
+    CmdParserDescriptor('t1-freesurfer-template',
+                        'clinica.pipelines.t1_freesurfer_longitudinal.t1_freesurfer_template_cli',
+                        'T1FreeSurferTemplateCLI'),
+    CmdParserDescriptor('t1-freesurfer-longitudinal-correction',
+                        'clinica.pipelines.t1_freesurfer_longitudinal.t1_freesurfer_longitudinal_correction_cli',
+                        'T1FreeSurferLongitudinalCorrectionCLI'),
+]
+
+CONVERTERS = [
+    CmdParserDescriptor('adni-to-bids', 'clinica.iotools.converters.adni_to_bids.adni_to_bids_cli', 'AdniToBidsCLI'),
+    CmdParserDescriptor('aibl-to-bids', 'clinica.iotools.converters.aibl_to_bids.aibl_to_bids_cli', 'AiblToBidsCLI'),
+    CmdParserDescriptor('oasis-to-bids', 'clinica.iotools.converters.oasis_to_bids.oasis_to_bids_cli',
+                        'OasisToBidsCLI'),
+    CmdParserDescriptor('nifd-to-bids', 'clinica.iotools.converters.nifd_to_bids.nifd_to_bids_cli', 'NifdToBidsCLI'),
+]
+
+IO_TOOLS = [
+    CmdParserDescriptor('create-subjects-visits', 'clinica.iotools.utils.data_handling_cli',
+                        'CmdParserSubjectsSessions'),
+    CmdParserDescriptor('merge-tsv', 'clinica.iotools.utils.data_handling_cli', 'CmdParserMergeTsv'),
+    CmdParserDescriptor('check-missing-modalities', 'clinica.iotools.utils.data_handling_cli',
+                        'CmdParserMissingModalities'),
+    CmdParserDescriptor('center-nifti', 'clinica.iotools.utils.data_handling_cli', 'CmdParserCenterNifti'),
+]
+
+VISUALIZERS = [
+    CmdParserDescriptor('t1-freesurfer', 'clinica.pipelines.t1_freesurfer.t1_freesurfer_visualizer',
+                        'T1FreeSurferVisualizer'),
+]
+
+GENERATORS = [
+    CmdParserDescriptor('template', 'clinica.engine.template', 'CmdGenerateTemplates'),
+]
+
+
+def get_selected_command(argv):
+    """
+    Return the category and the sub-command typed on the command line without parsing it.
+
+    Args:
+        argv: Command line arguments (without the program name)
+
+    Returns:
+        (category, name): e.g. ('run', 't1-linear') for `clinica -v run t1-linear bids caps`
+            (None when they are not typed or when the whole parser is needed for shell completion)
+    """
+    if '_ARGCOMPLETE' in os.environ:
+        return None, None
+
+    positionals = []
+    i = 0
+    while i < len(argv) and len(positionals) < 2:
+        if not positionals and argv[i] in ['-l', '--logname']:
+            i += 2
+            continue
+        if not argv[i].startswith('-'):
+            positionals.append(argv[i])
+        i += 1
+    positionals += [None] * (2 - len(positionals))
+    return positionals[0], positionals[1]
+
+
+def load_cmdparser_objects(descriptors, selected_name, plugin_dir=None):
+    """
+    Instantiate the CmdParser objects of a category.
+
+    Only the selected sub-command is loaded when it is a built-in one. Otherwise (listing of
+    the category, plug-in or wrong name), the plug-ins and all the sub-commands are loaded.
+
+    Args:
+        descriptors: CmdParserDescriptor of the built-in sub-commands of the category
+        selected_name: Name of the sub-command typed on the command line (or None)
+        plugin_dir: Sub-folder of $CLINICAPATH containing the plug-ins of the category (None if no plug-in)
+
+    Returns:
+        List of CmdParser instances
+    """
+    from clinica.engine import CmdParser
+
+    for descriptor in descriptors:
+        if descriptor.name == selected_name:
+            return [descriptor.load()]
+
+    cmdparsers = []
+    if plugin_dir is not None:
+        cmdparsers += ClinicaClassLoader(baseclass=CmdParser, extra_dir=plugin_dir).load()
+    return cmdparsers + [descriptor.load() for descriptor in descriptors]
+
+
 # Nice display
 def custom_traceback(exc_type, exc_value, exc_traceback):
     import traceback
@@ -184,66 +342,22 @@ def execute():
                         help='Define the log file name (default: clinica.log)')
 
     """
-    run category: run one of the available pipelines
+    Only the modules of the sub-command typed on the command line are imported
     """
-    from clinica.engine import CmdParser
+    selected_category, selected_name = get_selected_command(sys.argv[1:])
 
-    from clinica.pipelines.t1_freesurfer.t1_freesurfer_cli import T1FreeSurferCLI
-    from clinica.pipelines.t1_freesurfer_longitudinal.t1_freesurfer_longitudinal_cli import T1FreeSurferLongitudinalCLI
-    from clinica.pipelines.t1_freesurfer_longitudinal.t1_freesurfer_template_cli import T1FreeSurferTemplateCLI
-    from clinica.pipelines.t1_freesurfer_longitudinal.t1_freesurfer_longitudinal_correction_cli import T1FreeSurferLongitudinalCorrectionCLI
-    from clinica.pipelines.t1_volume_tissue_segmentation.t1_volume_tissue_segmentation_cli import T1VolumeTissueSegmentationCLI
-    from clinica.pipelines.t1_volume_create_dartel.t1_volume_create_dartel_cli import T1VolumeCreateDartelCLI
-    from clinica.pipelines.t1_volume_register_dartel.t1_volume_register_dartel_cli import T1VolumeRegisterDartelCLI
-    from clinica.pipelines.t1_volume_dartel2mni.t1_volume_dartel2mni_cli import T1VolumeDartel2MNICLI
-    from clinica.pipelines.t1_volume.t1_volume_cli import T1VolumeCLI
-    from clinica.pipelines.t1_volume_existing_template.t1_volume_existing_template_cli import T1VolumeExistingTemplateCLI
-    from clinica.pipelines.t1_volume_parcellation.t1_volume_parcellation_cli import T1VolumeParcellationCLI
-    from clinica.pipelines.t1_linear.t1_linear_cli import T1LinearCLI
-    from clinica.pipelines.deeplearning_prepare_data.deeplearning_prepare_data_cli import DeepLearningPrepareDataCLI
-    from clinica.pipelines.dwi_preprocessing_using_phasediff_fieldmap.dwi_preprocessing_using_phasediff_fieldmap_cli import DwiPreprocessingUsingPhaseDiffFieldmapCli
-    from clinica.pipelines.dwi_preprocessing_using_t1.dwi_preprocessing_using_t1_cli import DwiPreprocessingUsingT1Cli
-    from clinica.pipelines.dwi_dti.dwi_dti_cli import DwiDtiCli
-    from clinica.pipelines.dwi_connectome.dwi_connectome_cli import DwiConnectomeCli
-    from clinica.pipelines.pet_volume.pet_volume_cli import PETVolumeCLI
-    from clinica.pipelines.pet_surface.pet_surface_cli import PetSurfaceCLI
-    from clinica.pipelines.pet_surface.pet_surface_longitudinal_cli import PetSurfaceLongitudinalCLI
-    from clinica.pipelines.machine_learning_spatial_svm.spatial_svm_cli import SpatialSVMCLI
-    from clinica.pipelines.statistics_surface.statistics_surface_cli import StatisticsSurfaceCLI
-    from clinica.pipelines.statistics_volume.statistics_volume_cli import StatisticsVolumeCLI
-    from clinica.pipelines.statistics_volume_correction.statistics_volume_correction_cli import StatisticsVolumeCorrectionCLI
-    pipelines = ClinicaClassLoader(baseclass=CmdParser,
-                                   extra_dir="pipelines").load()
-    # The order in pipelines var will the same when typing `clinica run`
-    # Pipelines are sorted by main / advanced pipelines then by modality
-    pipelines += [
-        # Main pipelines:
-        T1FreeSurferCLI(),
-        T1VolumeCLI(),
-        T1FreeSurferLongitudinalCLI(),
-        T1LinearCLI(),
-        DwiPreprocessingUsingPhaseDiffFieldmapCli(),
-        DwiPreprocessingUsingT1Cli(),
-        DwiDtiCli(),
-        DwiConnectomeCli(),
-        PETVolumeCLI(),
-        PetSurfaceCLI(),
-        # PetSurfaceLongitudinalCLI(),
-        DeepLearningPrepareDataCLI(),
-        SpatialSVMCLI(),
-        StatisticsSurfaceCLI(),
-        StatisticsVolumeCLI(),
-        StatisticsVolumeCorrectionCLI(),
-        # Advanced pipelines:
-        T1VolumeExistingTemplateCLI(),
-        T1VolumeTissueSegmentationCLI(),
-        T1VolumeCreateDartelCLI(),
-        T1VolumeRegisterDartelCLI(),
-        T1VolumeDartel2MNICLI(),
-        T1VolumeParcellationCLI(),
-        T1FreeSurferTemplateCLI(),
-        T1FreeSurferLongitudinalCorrectionCLI(),
-    ]
+    def get_category_cmdparsers(category, descriptors, plugin_dir=None):
+        # Shell completion needs all the sub-commands, the top-level help (no category typed) needs none of them
+        if selected_category is None and '_ARGCOMPLETE' not in os.environ:
+            return []
+        if selected_category is not None and selected_category != category:
+            return []
+        return load_cmdparser_objects(descriptors, selected_name, plugin_dir)
+
+    """
+    run category: run one of the available pipelines
+    """
+    pipelines = get_category_cmdparsers('run', RUN_PIPELINES, plugin_dir="pipelines")
 
     run_parser = sub_parser.add_parser(
         'run',
@@ -265,19 +379,7 @@ def execute():
     """
     convert category: convert one of the supported datasets into BIDS hierarchy
     """
-    from clinica.iotools.converters.aibl_to_bids.aibl_to_bids_cli import AiblToBidsCLI
-    from clinica.iotools.converters.adni_to_bids.adni_to_bids_cli import AdniToBidsCLI
-    from clinica.iotools.converters.oasis_to_bids.oasis_to_bids_cli import OasisToBidsCLI
-    from clinica.iotools.converters.nifd_to_bids.nifd_to_bids_cli import NifdToBidsCLI  # noga
-
-    converters = ClinicaClassLoader(baseclass=CmdParser,
-                                    extra_dir="iotools/converters").load()
-    converters += [
-        AdniToBidsCLI(),
-        AiblToBidsCLI(),
-        OasisToBidsCLI(),
-        NifdToBidsCLI(),
-    ]
+    converters = get_category_cmdparsers('convert', CONVERTERS, plugin_dir="iotools/converters")
 
     convert_parser = sub_parser.add_parser(
         'convert',
@@ -298,16 +400,7 @@ def execute():
     """
     iotools category
     """
-    from clinica.iotools.utils.data_handling_cli import CmdParserSubjectsSessions
-    from clinica.iotools.utils.data_handling_cli import CmdParserMergeTsv
-    from clinica.iotools.utils.data_handling_cli import CmdParserMissingModalities
-    from clinica.iotools.utils.data_handling_cli import CmdParserCenterNifti
-    io_tools = [
-        CmdParserSubjectsSessions(),
-        CmdParserMergeTsv(),
-        CmdParserMissingModalities(),
-        CmdParserCenterNifti()
-    ]
+    io_tools = get_category_cmdparsers('iotools', IO_TOOLS)
 
     HELP_IO_TOOLS = 'Tools to handle BIDS/CAPS datasets.'
     io_parser = sub_parser.add_parser(
@@ -329,15 +422,7 @@ def execute():
     """
     visualize category: run one of the available pipelines
     """
-    from clinica.engine import CmdParser
-
-    from clinica.pipelines.t1_freesurfer.t1_freesurfer_visualizer import T1FreeSurferVisualizer
-
-    visualizers = ClinicaClassLoader(baseclass=CmdParser,
-                                     extra_dir="pipelines").load()
-    visualizers += [
-        T1FreeSurferVisualizer(),
-    ]
+    visualizers = get_category_cmdparsers('visualize', VISUALIZERS, plugin_dir="pipelines")
 
     visualize_parser = sub_parser.add_parser(
         'visualize',
@@ -371,11 +456,10 @@ def execute():
                                          (Fore.YELLOW, Fore.RESET)
     generate_parser._optionals.title = OPTIONAL_TITLE
 
-    from clinica.engine.template import CmdGenerateTemplates
     init_cmdparser_objects(
         parser,
         generate_parser.add_subparsers(metavar='', dest='generate'),
-        [CmdGenerateTemplates()]
+        get_category_cmdparsers('generate', GENERATORS)
     )
 
     """
@@ -0,0 +1,140 @@
+# coding: utf8
+
+"""
+This module contains the conversion manifest shared by the ADNI, AIBL and NIFD converters.
+
+The manifest records, for each converted image, the signature of its source files, the version of the converter
+and the path of the converted image. It is stored in <bids_dir>/conversion_info/conversion_manifest.tsv so that a
+conversion run again on the same BIDS directory (e.g. after a new data release) only converts new or changed
+images. A record is appended as soon as an image is converted, so that an interrupted conversion resumes where it
+stopped.
+"""
+
+import os
+
+MANIFEST_COLUMNS = ['image_key', 'source_signature', 'converter_version', 'output_path']
+
+
+def compute_source_signature(source_path):
+    """Compute the signature of the source of an image (a DICOM folder or an image file).
+
+    The signature is the SHA-256 of the relative path, size and modification time of every file of the source, so
+    that adding, removing or modifying a DICOM slice changes it without reading the content of the files.
+
+    Args:
+        source_path: Path to the DICOM folder or to the image file
+
+    Returns:
+        Hexadecimal signature (None if the source does not exist)
+    """
+    import hashlib
+
+    if not os.path.exists(source_path):
+        return None
+
+    signature = hashlib.sha256()
+    if os.path.isdir(source_path):
+        for root, dirs, files in os.walk(source_path):
+            dirs.sort()
+            for name in sorted(files):
+                file_stat = os.stat(os.path.join(root, name))
+                relative_path = os.path.relpath(os.path.join(root, name), source_path)
+                signature.update(('%s\t%d\t%d\n' % (relative_path, file_stat.st_size, file_stat.st_mtime_ns)).encode())
+    else:
+        file_stat = os.stat(source_path)
+        signature.update(('%s\t%d\t%d\n' % (os.path.basename(source_path), file_stat.st_size,
+                                            file_stat.st_mtime_ns)).encode())
+    return signature.hexdigest()
+
+
+def get_converter_version(converter_name):
+    """Version recorded in the manifest: a change of Clinica version triggers a new conversion of all the images."""
+    from clinica import __version__
+
+    return '%s-%s' % (converter_name, __version__)
+
+
+class ConversionManifest(object):
+    """Conversion manifest of a BIDS directory.
+
+    Attributes:
+        bids_dir (str): Path to the output BIDS directory.
+        converter_version (str): Version of the converter (see get_converter_version()).
+        manifest_file (str): Path of the TSV file storing the records (one line per converted image, the last
+            line of an image wins).
+    """
+
+    def __init__(self, bids_dir, converter_version):
+        self.bids_dir = os.path.abspath(bids_dir)
+        self.converter_version = converter_version
+        self.manifest_file = os.path.join(self.bids_dir, 'conversion_info', 'conversion_manifest.tsv')
+        self._records = {}
+        self._truncated = False
+        if os.path.isfile(self.manifest_file):
+            with open(self.manifest_file, 'r', encoding='utf-8') as manifest:
+                for line in manifest:
+                    # A truncated last line (interrupted write) is ignored
+                    if not line.endswith('\n'):
+                        self._truncated = True
+                        break
+                    fields = line.rstrip('\n').split('\t')
+                    if len(fields) != len(MANIFEST_COLUMNS) or fields == MANIFEST_COLUMNS:
+                        continue
+                    self._records[fields[0]] = dict(zip(MANIFEST_COLUMNS, fields))
+
+    def is_up_to_date(self, image_key, source_signature):
+        """Check if an image was converted from the same source by the same converter and is still present.
+
+        Returns:
+            True if the conversion of the image can be skipped
+        """
+        record = self._records.get(image_key)
+        return (source_signature is not None
+                and record is not None
+                and record['source_signature'] == source_signature
+                and record['converter_version'] == self.converter_version
+                and os.path.isfile(self.get_output_path(image_key)))
+
+    def get_output_path(self, image_key):
+        """Absolute path of the recorded output of an image (None if the image is not in the manifest)."""
+        record = self._records.get(image_key)
+        if record is None:
+            return None
+        return os.path.join(self.bids_dir, record['output_path'])
+
+    def record(self, image_key, source_signature, output_path):
+        """Append the record of a converted image to the manifest (flushed to disk immediately)."""
+        if source_signature is None or not isinstance(output_path, str) or not os.path.isfile(output_path):
+            return
+
+        record = {'image_key': image_key,
+                  'source_signature': source_signature,
+                  'converter_version': self.converter_version,
+                  'output_path': os.path.relpath(os.path.abspath(output_path), self.bids_dir)}
+        os.makedirs(os.path.dirname(self.manifest_file), exist_ok=True)
+        write_header = not os.path.isfile(self.manifest_file)
+        with open(self.manifest_file, 'a', encoding='utf-8') as manifest:
+            if write_header:
+                manifest.write('\t'.join(MANIFEST_COLUMNS) + '\n')
+            elif self._truncated:
+                manifest.write('\n')
+                self._truncated = False
+            manifest.write('\t'.join(record[column] for column in MANIFEST_COLUMNS) + '\n')
+            manifest.flush()
+            os.fsync(manifest.fileno())
+        self._records[image_key] = record
+
+    def remove_outputs(self, image_key):
+        """Remove the files produced by a previous conversion of an image (image, JSON sidecar, bval, bvec...)."""
+        from glob import escape, glob
+
+        output_path = self.get_output_path(image_key)
+        if output_path is None:
+            return
+        output_stem = output_path
+        for extension in ['.nii.gz', '.nii']:
+            if output_stem.endswith(extension):
+                output_stem = output_stem[:-len(extension)]
+                break
+        for output_file in glob(escape(output_stem) + '.*'):
+            os.remove(output_file)
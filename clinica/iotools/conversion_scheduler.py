@@ -0,0 +1,205 @@
+# coding: utf8
+
+"""
+This module contains the scheduler running the DICOM to NIfTI conversions of the ADNI, AIBL and NIFD converters.
+
+The conversions are run by a pool of threads (the work is done by dcm2niix, dcm2nii or mri_convert subprocesses).
+All the schedulers of a process share the same number of conversion slots, so that converters running at the same
+time do not oversubscribe the machine. The scheduler can be configured with the following environment variables:
+    - CLINICA_CONVERSION_WORKERS: number of conversions run at the same time (default: number of CPUs - 1)
+    - CLINICA_CONVERSION_TIMEOUT: maximum duration in seconds of the conversion of an image (default: no timeout)
+    - CLINICA_CONVERSION_RETRIES: number of times a failed conversion is retried (default: 1)
+"""
+
+import os
+import threading
+
+# Conversion slots shared by all the schedulers of the process (created at the first use)
+_conversion_slots = None
+_conversion_slots_lock = threading.Lock()
+
+# Deadline of the conversion run by the current thread (see run_conversion_command)
+_current_conversion = threading.local()
+
+
+def get_conversion_workers():
+    """Number of conversions run at the same time (CLINICA_CONVERSION_WORKERS, default: number of CPUs - 1)."""
+    from multiprocessing import cpu_count
+
+    n_workers = os.environ.get('CLINICA_CONVERSION_WORKERS')
+    if n_workers is not None:
+        return max(int(n_workers), 1)
+    return max(cpu_count() - 1, 1)
+
+
+def _get_conversion_slots():
+    global _conversion_slots
+    with _conversion_slots_lock:
+        if _conversion_slots is None:
+            _conversion_slots = threading.BoundedSemaphore(get_conversion_workers())
+    return _conversion_slots
+
+
+def run_conversion_command(command):
+    """Run a conversion command (dcm2niix, dcm2nii, mri_convert...) with the timeout of the current conversion.
+
+    Args:
+        command: Shell command
+
+    Raises:
+        subprocess.TimeoutExpired: if the conversion of the current image exceeded its timeout
+    """
+    import signal
+    import subprocess
+    import time
+
+    deadline = getattr(_current_conversion, 'deadline', None)
+    timeout = None
+    if deadline is not None:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            raise subprocess.TimeoutExpired(command, 0)
+
+    # The command runs in its own process group: on timeout, the converter is killed with the shell running it, so
+    # that it does not write in the output folder of the next attempt
+    process = subprocess.Popen(command,
+                               shell=True,
+                               stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL,
+                               start_new_session=True)
+    try:
+        return_code = process.wait(timeout=timeout)
+    except BaseException:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        process.wait()
+        raise
+    return subprocess.CompletedProcess(command, return_code)
+
+
+def is_converted_image(output_image):
+    """Default success criterion of a conversion: the function returned the path of an existing image."""
+    return isinstance(output_image, str) and os.path.isfile(output_image)
+
+
+class ConversionScheduler(object):
+    """Bounded pool of conversions with timeouts, retries and progress report.
+
+    Attributes:
+        name (str): Name displayed in the progress messages (e.g. 'T1').
+        n_workers (int): Number of conversions run at the same time by this scheduler (bounded by the number of
+            conversion slots of the process).
+        timeout (float): Maximum duration in seconds of the conversion of an image (None for no timeout).
+        retries (int): Number of times a failed conversion is retried.
+        reports (list): One dictionary per finished conversion (name, status, attempts, duration in seconds).
+    """
+
+    def __init__(self, name, n_workers=None, timeout=None, retries=None):
+        self.name = name
+        self.n_workers = n_workers if n_workers is not None else get_conversion_workers()
+        if timeout is None and os.environ.get('CLINICA_CONVERSION_TIMEOUT'):
+            timeout = float(os.environ['CLINICA_CONVERSION_TIMEOUT'])
+        self.timeout = timeout
+        if retries is None:
+            retries = int(os.environ.get('CLINICA_CONVERSION_RETRIES', 1))
+        self.retries = retries
+        self.reports = []
+        self._lock = threading.Lock()
+
+    def _run_task(self, function, task, task_name, total, succeeded):
+        import time
+        from colorama import Fore
+        from clinica.utils.stream import cprint
+
+        result = None
+        start = time.monotonic()
+        with _get_conversion_slots():
+            for attempt in range(1, self.retries + 2):
+                attempt_start = time.monotonic()
+                _current_conversion.deadline = attempt_start + self.timeout if self.timeout is not None else None
+                try:
+                    result = function(task)
+                    error = None if succeeded(result) else 'no image produced'
+                except Exception as e:
+                    result, error = None, '%s: %s' % (type(e).__name__, e)
+                finally:
+                    _current_conversion.deadline = None
+                if error is None:
+                    break
+                if attempt <= self.retries:
+                    cprint(Fore.YELLOW + '[%s] Conversion of %s failed (%s), retrying (attempt %d / %d)'
+                           % (self.name, task_name, error, attempt + 1, self.retries + 1) + Fore.RESET)
+
+        report = {'name': task_name,
+                  'status': 'converted' if error is None else 'failed',
+                  'attempts': attempt,
+                  'duration': round(time.monotonic() - start, 3)}
+        with self._lock:
+            self.reports.append(report)
+            n_done = len(self.reports)
+        message = '[%s] %d / %d %s %s in %.1f s' % (self.name, n_done, total, report['status'], task_name,
+                                                    report['duration'])
+        if error is None:
+            cprint(message)
+        else:
+            cprint(Fore.RED + message + ' (' + error + ')' + Fore.RESET)
+        return result
+
+    def imap(self, function, tasks, task_names=None, succeeded=is_converted_image):
+        """Run function on each task and yield the results in the order of tasks, as soon as they are available.
+
+        Args:
+            function: conversion function (called with a task, returns the converted image)
+            tasks: list of tasks
+            task_names: names of the tasks displayed in the progress messages (default: rank of the task)
+            succeeded: function checking the result of a conversion (a failed conversion is retried)
+
+        Yields:
+            Result of function for each task (None if the conversion raised an exception)
+        """
+        from multiprocessing.pool import ThreadPool
+
+        tasks = list(tasks)
+        if task_names is None:
+            task_names = [str(i) for i in range(len(tasks))]
+        total = len(tasks)
+        if total == 0:
+            return
+
+        pool = ThreadPool(max(min(self.n_workers, total), 1))
+        try:
+            for result in pool.imap(lambda args: self._run_task(function, args[0], args[1], total, succeeded),
+                                    zip(tasks, task_names)):
+                yield result
+        finally:
+            pool.close()
+            pool.join()
+        self.print_summary()
+
+    def map(self, function, tasks, task_names=None, succeeded=is_converted_image):
+        """List of the results of imap()."""
+        return list(self.imap(function, tasks, task_names, succeeded))
+
+    def print_summary(self):
+        """Display the number of converted and failed images and the conversion timings."""
+        from clinica.utils.stream import cprint
+
+        if not self.reports:
+            return
+        durations = [report['duration'] for report in self.reports]
+        n_failed = sum(report['status'] == 'failed' for report in self.reports)
+        cprint('[%s] %d image(s) converted, %d failed (conversion time per image: mean %.1f s, max %.1f s)'
+               % (self.name, len(self.reports) - n_failed, n_failed, sum(durations) / len(durations), max(durations)))
+
+    def write_reports(self, tsv_file):
+        """Append the reports of the conversions to a TSV file (name, status, attempts, duration)."""
+        columns = ['name', 'status', 'attempts', 'duration']
+        os.makedirs(os.path.dirname(os.path.abspath(tsv_file)), exist_ok=True)
+        write_header = not os.path.isfile(tsv_file)
+        with open(tsv_file, 'a', encoding='utf-8') as tsv:
+            if write_header:
+                tsv.write('\t'.join(columns) + '\n')
+            for report in self.reports:
+                tsv.write('\t'.join(str(report[column]) for column in columns) + '\n')
@@ -69,18 +69,19 @@ class MissingModsTracker:
                         't1w': 0}
                     })
 
-    def add_missing_mod(self, ses, mod):
+    def add_missing_mod(self, ses, mod, count=1):
         """
         Increase the number of missing files for the input modality.
 
         Args:
             ses: name of the session
             mod: modality missing
+            count: number of subjects missing the modality
         """
-        self.missing[ses][mod] += 1
+        self.missing[ses][mod] += count
 
-    def increase_missing_ses(self, ses):
-        self.missing[ses]['session'] += 1
+    def increase_missing_ses(self, ses, count=1):
+        self.missing[ses]['session'] += count
 
     def get_missing_list(self):
         """
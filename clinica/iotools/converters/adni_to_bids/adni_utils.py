@@ -439,6 +439,36 @@ def remove_fields_duplicated(bids_fields):
     return [x for x in bids_fields if not (x in seen or seen_add(x))]
 
 
+def match_bids_ids(subject_ids, bids_ids):
+    """
+    Find the BIDS ids containing each subject id (e.g. a RID or a PTID without symbols)
+
+    The BIDS ids are indexed by their substrings, so that each subject id is found with a dictionary lookup
+    instead of a scan of the whole list of BIDS ids.
+
+    Args:
+        subject_ids: list of subject ids
+        bids_ids: list of BIDS ids
+
+    Returns:
+        dictionary subject id -> list of the BIDS ids containing it
+    """
+    substrings_index = {}
+    matches = {}
+    for subj_id in set(subject_ids):
+        length = len(subj_id)
+        if length not in substrings_index:
+            index = {}
+            for bids_id in bids_ids:
+                for k in range(len(bids_id) - length + 1):
+                    ids_found = index.setdefault(bids_id[k:k + length], [])
+                    if len(ids_found) == 0 or ids_found[-1] is not bids_id:
+                        ids_found.append(bids_id)
+            substrings_index[length] = index
+        matches[subj_id] = substrings_index[length].get(subj_id, [])
+    return matches
+
+
 def create_adni_sessions_dict(bids_ids, clinic_specs_path, clinical_data_dir, bids_subjs_paths):
     """
     Extract all the data required for the sessions files and organize them in a
@@ -453,7 +483,8 @@ def create_adni_sessions_dict(bids_ids, clinic_specs_path, clinical_data_dir, bi
     """
     import pandas as pd
     from os import path
-    from datetime import datetime
+    from multiprocessing.dummy import Pool
+    from os import cpu_count
     import clinica.iotools.bids_utils as bids
     from clinica.utils.stream import cprint
 
@@ -463,7 +494,6 @@ def create_adni_sessions_dict(bids_ids, clinic_specs_path, clinical_data_dir, bi
     field_location = sessions['ADNI location']
     sessions_fields_bids = sessions['BIDS CLINICA']
     fields_dataset = []
-    previous_location = ''
     fields_bids = []
     sessions_dict = {}
 
@@ -472,95 +502,137 @@ def create_adni_sessions_dict(bids_ids, clinic_specs_path, clinical_data_dir, bi
             fields_bids.append(sessions_fields_bids[i])
             fields_dataset.append(sessions_fields[i])
 
-    sessions_df = pd.DataFrame(columns=fields_bids)
-
+    # Every file is processed once, in the order of the specifications. All the sessions fields are looked for in
+    # each file.
+    locations = []
     for i in range(0, len(field_location)):
-        # If the i-th field is available
         if (not pd.isnull(field_location[i])) and path.exists(path.join(clinical_data_dir,
                                                                         field_location[i].split('/')[0])):
-            # Load the file
-            tmp = field_location[i].split('/')
-            location = tmp[0]
-            if location != previous_location:
-                previous_location = location
-                file_to_read_path = path.join(clinical_data_dir, location)
-                cprint('\tReading clinical data file : ' + location)
-                file_to_read = pd.read_csv(file_to_read_path, dtype=str)
-
-                for r in range(0, len(file_to_read.values)):
-                    row = file_to_read.iloc[r]
-
-                    # Depending of the file that needs to be open, identify and
-                    # do needed preprocessing on the column that contains the
-                    # subjects ids
-                    if location == 'ADNIMERGE.csv':
-                        id_ref = 'PTID'
-                        # What was the meaning of this line ?
-                        # subj_id = row[id_ref.decode('utf-8')]
-                        subj_id = row[id_ref]
-                        subj_id = bids.remove_space_and_symbols(subj_id)
-                    else:
-                        id_ref = 'RID'
-                        rid = str(row[id_ref])
-
-                        # Fill the rid with the needed number of zero
-                        if 4 - len(rid) > 0:
-                            zeros_to_add = 4 - len(rid)
-                            subj_id = '0' * zeros_to_add + rid
-                        else:
-                            subj_id = rid
-
-                    # Extract the BIDS subject id related with the original
-                    # subject id
-                    subj_bids = [s for s in bids_ids if subj_id in s]
-
-                    if len(subj_bids) == 0:
-                        pass
-                    elif len(subj_bids) > 1:
-                        raise('Error: multiple subjects found for the same RID')
-                    else:
-                        subj_bids = subj_bids[0]
-                        for j in range(0, len(sessions_fields)):
-                            # If the i-th field is available
-                            if not pd.isnull(sessions_fields[j]):
-                                # Extract only the fields related to the current file opened
-                                if location in field_location[i]:
-                                    if location in ['ADAS_ADNIGO2.csv', 'DXSUM_PDXCONV_ADNIALL.csv', 'CDR.csv',
-                                                    'NEUROBAT.csv', 'GDSCALE.csv', 'MODHACH.csv', 'MOCA.csv',
-                                                    'NPIQ.csv', 'MEDHIST.csv', 'VITALS.csv', 'UWNPSYCHSUM_03_07_19.csv',
-                                                    'ECOGPT.csv', 'ECOGSP.csv', 'FCI.csv', 'CCI.csv']:
-                                        if pd.isnull(row['VISCODE2']) or row['VISCODE2'] == 'f':
-                                            continue
-                                        visit_id = row['VISCODE2']
-                                        # Convert sc to bl
-                                        if visit_id == 'sc':
-                                            visit_id = 'bl'
-                                    elif location in ['BHR_EVERYDAY_COGNITION.csv', 'BHR_BASELINE_QUESTIONNAIRE.csv',
-                                                      'BHR_LONGITUDINAL_QUESTIONNAIRE.csv']:
-                                        visit_id = row['Timepoint']
-                                    else:
-                                        visit_id = row['VISCODE']
-                                    try:
-                                        field_value = row[sessions_fields[j]]
-                                        bids_field_name = sessions_fields_bids[j]
-
-                                        # Calculating age from ADNIMERGE
-                                        if (sessions_fields[j] == "AGE") and (visit_id != "bl"):
-                                            examdate = datetime.strptime(row["EXAMDATE"], "%Y-%m-%d")
-                                            examdate_bl = datetime.strptime(row["EXAMDATE_bl"], "%Y-%m-%d")
-                                            delta = examdate - examdate_bl
-
-                                            # Adding time passed since bl to patient's age in current visit
-                                            field_value = round(float(field_value) + (delta.days / 365.25), 1)
-
-                                        sessions_dict = update_sessions_dict(sessions_dict, subj_bids, visit_id,
-                                                                             field_value, bids_field_name)
-                                    except KeyError:
-                                        pass
-                                        # cprint('Field value ' + Fore.RED + sessions_fields[j] + Fore.RESET +
-                                        # ' could not be added to sessions.tsv')
-            else:
+            location = field_location[i].split('/')[0]
+            if location not in locations:
+                locations.append(location)
+
+    def read_clinical_file(location):
+        cprint('\tReading clinical data file : ' + location)
+        return pd.read_csv(path.join(clinical_data_dir, location), dtype=str)
+
+    # Independent files are loaded concurrently
+    pool = Pool(max(1, min(cpu_count() or 1, len(locations))))
+    try:
+        files_to_read = pool.map(read_clinical_file, locations)
+    finally:
+        pool.close()
+        pool.join()
+
+    # Each (subject, visit, field) takes the first non-null value found in the files (in the order of the files,
+    # of their rows and of the fields), as update_sessions_dict() does
+    events = []
+    for i_file, (location, file_to_read) in enumerate(zip(locations, files_to_read)):
+        if len(file_to_read) == 0:
+            continue
+
+        # Depending of the file that needs to be open, identify and
+        # do needed preprocessing on the column that contains the
+        # subjects ids
+        if location == 'ADNIMERGE.csv':
+            subj_ids = file_to_read['PTID'].map(
+                {ptid: bids.remove_space_and_symbols(ptid) for ptid in file_to_read['PTID'].unique()})
+        else:
+            # Fill the rid with the needed number of zero
+            subj_ids = file_to_read['RID'].map(
+                {rid: '0' * (4 - len(str(rid))) + str(rid) for rid in file_to_read['RID'].unique()})
+
+        # Extract the BIDS subject id related with the original
+        # subject id
+        matches = match_bids_ids(subj_ids.unique(), bids_ids)
+        if any(len(subj_bids) > 1 for subj_bids in matches.values()):
+            raise ValueError('Error: multiple subjects found for the same RID')
+        subj_bids = subj_ids.map({subj_id: subj_bids[0] if len(subj_bids) == 1 else None
+                                  for subj_id, subj_bids in matches.items()})
+        file_to_read = file_to_read[subj_bids.notnull()]
+        subj_bids = subj_bids[subj_bids.notnull()]
+
+        if location in ['ADAS_ADNIGO2.csv', 'DXSUM_PDXCONV_ADNIALL.csv', 'CDR.csv',
+                        'NEUROBAT.csv', 'GDSCALE.csv', 'MODHACH.csv', 'MOCA.csv',
+                        'NPIQ.csv', 'MEDHIST.csv', 'VITALS.csv', 'UWNPSYCHSUM_03_07_19.csv',
+                        'ECOGPT.csv', 'ECOGSP.csv', 'FCI.csv', 'CCI.csv']:
+            if len(file_to_read) == 0:
+                continue
+            kept = file_to_read['VISCODE2'].notnull() & (file_to_read['VISCODE2'] != 'f')
+            file_to_read = file_to_read[kept]
+            subj_bids = subj_bids[kept]
+            # Convert sc to bl
+            visit_ids = file_to_read['VISCODE2'].replace('sc', 'bl')
+        elif location in ['BHR_EVERYDAY_COGNITION.csv', 'BHR_BASELINE_QUESTIONNAIRE.csv',
+                          'BHR_LONGITUDINAL_QUESTIONNAIRE.csv']:
+            if len(file_to_read) == 0:
+                continue
+            visit_ids = file_to_read['Timepoint']
+        else:
+            if len(file_to_read) == 0:
                 continue
+            visit_ids = file_to_read['VISCODE']
+
+        # Screening and unscheduled visits are not kept (see update_sessions_dict)
+        kept = ~visit_ids.isin(['sc', 'uns1'])
+        file_to_read = file_to_read[kept]
+        subj_bids = subj_bids[kept]
+        visit_ids = visit_ids[kept]
+        if len(file_to_read) == 0:
+            continue
+        sessions_ids = visit_ids.map({visit_id: viscode_to_session(visit_id) for visit_id in visit_ids.unique()})
+
+        for j in range(0, len(sessions_fields)):
+            # If the j-th field is available in the current file
+            if pd.isnull(sessions_fields[j]) or sessions_fields[j] not in file_to_read.columns:
+                continue
+            bids_field_name = sessions_fields_bids[j]
+            field_values = file_to_read[sessions_fields[j]]
+            kept = pd.Series(True, index=file_to_read.index)
+
+            # Calculating age from ADNIMERGE
+            if sessions_fields[j] == "AGE":
+                not_bl = visit_ids != 'bl'
+                if not_bl.any():
+                    if "EXAMDATE" not in file_to_read.columns or "EXAMDATE_bl" not in file_to_read.columns:
+                        kept = ~not_bl
+                    else:
+                        delta = (pd.to_datetime(file_to_read.loc[not_bl, "EXAMDATE"], format="%Y-%m-%d")
+                                 - pd.to_datetime(file_to_read.loc[not_bl, "EXAMDATE_bl"], format="%Y-%m-%d"))
+                        # Adding time passed since bl to patient's age in current visit
+                        ages = [round(float(age) + (days / 365.25), 1)
+                                for age, days in zip(field_values[not_bl], delta.dt.days)]
+                        field_values = field_values.astype(object)
+                        field_values[not_bl] = ages
+
+            if bids_field_name == 'diagnosis':
+                # Unknown diagnosis codes are ignored
+                diagnosis = {'CN': 'CN', 'MCI': 'MCI', 'Dementia': 'AD'}
+                kept = kept & (field_values.isnull() | field_values.isin(list(diagnosis.keys())))
+                field_values = field_values.map(lambda code: convert_diagnosis_code(code) if code in diagnosis
+                                                else code)
+
+            events.append(pd.DataFrame({
+                'file': i_file,
+                'row': range(len(file_to_read)),
+                'field_index': j,
+                'participant_id': subj_bids.to_numpy(),
+                'session': sessions_ids.to_numpy(),
+                'field': bids_field_name,
+                'value': field_values.astype(object).to_numpy()
+            })[kept.to_numpy()])
+
+    if len(events) > 0:
+        events = pd.concat(events, ignore_index=True)
+        events = events.sort_values(['file', 'row', 'field_index'], kind='mergesort')
+        values = events.groupby(['participant_id', 'session', 'field'], sort=False)['value'].first()
+
+        # Sessions and fields are inserted in the order of their first occurrence
+        for (subj_bids, session, field), value in values.items():
+            subj_sessions = sessions_dict.setdefault(subj_bids, {})
+            if session not in subj_sessions:
+                subj_sessions[session] = {'session_id': 'ses-' + session}
+            subj_sessions[session][field] = value
 
     # Write the sessions dictionary created in several tsv files
     write_adni_sessions_tsv(sessions_dict, fields_bids, bids_subjs_paths)
@@ -710,6 +782,33 @@ def create_adni_scans_files(clinic_specs_path, bids_subjs_paths, bids_ids):
             scans_df = pd.DataFrame(columns=(fields_bids))
 
 
+# Source directories whose index was refreshed by this process
+_refreshed_source_indexes = set()
+
+
+def get_adni_source_index(source_dir):
+    """
+    Index of the folders and NIfTI files of the ADNI source directory, shared by all the modality converters
+
+    The index is persistent (see clinica.utils.file_index). It is refreshed once per process, with a parallel crawl
+    in which only the folders whose modification time changed are listed again. DICOM files are not indexed.
+
+    Args:
+        source_dir: path to the ADNI directory
+
+    Returns: FileIndex of source_dir
+
+    """
+    from os import cpu_count
+    from clinica.utils.file_index import get_file_index
+
+    source_index = get_file_index(source_dir, file_suffixes=['.nii'])
+    if source_index.root_directory not in _refreshed_source_indexes:
+        source_index.refresh(n_threads=max(4, cpu_count() or 1))
+        _refreshed_source_indexes.add(source_index.root_directory)
+    return source_index
+
+
 def find_image_path(images, source_dir, modality, prefix, id_field):
     """
     For each image, the path to an existing image file or folder is created from image metadata.
@@ -726,34 +825,61 @@ def find_image_path(images, source_dir, modality, prefix, id_field):
     """
 
     from os import path, walk
+    import sqlite3
     import pandas as pd
+    from clinica.utils.file_index import is_file_index_enabled
     from clinica.utils.stream import cprint
 
     is_dicom = []
     image_folders = []
 
+    # Image folders are looked for in the index of the source directory instead of walking the tree for each image
+    source_index = None
+    if is_file_index_enabled():
+        try:
+            source_index = get_adni_source_index(source_dir)
+            image_folders_found = source_index.directories_named(
+                [prefix + str(image_id) for image_id in images[id_field]])
+        except (OSError, sqlite3.Error):
+            source_index = None
+
     for row in images.iterrows():
         image = row[1]
         seq_path = path.join(source_dir, str(image.Subject_ID), image.Sequence)
         image_path = ''
-        for (dirpath, dirnames, filenames) in walk(seq_path):
-            found = False
-            for d in dirnames:
-                if d == prefix + str(image[id_field]):
-                    image_path = path.join(dirpath, d)
-                    found = True
-                    break
-            if found:
-                break
-
         dicom = True
-        for (dirpath, dirnames, filenames) in walk(image_path):
-            for f in filenames:
-                if f.endswith(".nii"):
+
+        if source_index is not None:
+            seq_relative_path = str(image.Subject_ID) + '/' + image.Sequence + '/'
+            candidates = [f for f in image_folders_found.get(prefix + str(image[id_field]), [])
+                          if f.startswith(seq_relative_path)]
+            if len(candidates) > 0:
+                # Shallowest folder first, as when walking the sequence folder
+                image_relative_path = min(candidates, key=lambda f: (f.count('/'), f))
+                image_path = path.join(source_dir, image_relative_path)
+                nifti_files = [f for f in source_index.find(image_relative_path, '*.nii', refresh=False)
+                               if f.endswith('.nii')]
+                if len(nifti_files) > 0:
                     dicom = False
-                    image_path = path.join(dirpath, f)
+                    image_path = path.join(image_path, nifti_files[-1])
+        else:
+            for (dirpath, dirnames, filenames) in walk(seq_path):
+                found = False
+                for d in dirnames:
+                    if d == prefix + str(image[id_field]):
+                        image_path = path.join(dirpath, d)
+                        found = True
+                        break
+                if found:
                     break
 
+            for (dirpath, dirnames, filenames) in walk(image_path):
+                for f in filenames:
+                    if f.endswith(".nii"):
+                        dicom = False
+                        image_path = path.join(dirpath, f)
+                        break
+
         is_dicom.append(dicom)
         image_folders.append(image_path)
         if image_path == '':
@@ -770,6 +896,9 @@ def paths_to_bids(images, bids_dir, modality, mod_to_update=False):
     """
     Images in the list are converted and copied to directory in BIDS format
 
+    Images already converted from the same source files by the same version of the converter (as recorded in the
+    conversion manifest of the BIDS directory) are not converted again, unless mod_to_update is True.
+
     Args:
         images: List of images metadata and paths
         bids_dir: Path to the output BIDS directory
@@ -777,49 +906,71 @@ def paths_to_bids(images, bids_dir, modality, mod_to_update=False):
         mod_to_update:
 
     """
-    from multiprocessing import Pool, cpu_count, Value
     from functools import partial
+    from os import path
+    from colorama import Fore
+    from numpy import nan
+    from clinica.iotools.conversion_manifest import ConversionManifest, compute_source_signature, \
+        get_converter_version
+    from clinica.iotools.conversion_scheduler import ConversionScheduler
+    from clinica.utils.stream import cprint
 
     if modality.lower() not in ['t1', 'dwi', 'flair', 'fmri', 'fdg', 'pib', 'av45_fbb', 'tau']:
         # This should never be reached
         raise RuntimeError(modality.lower()
                            + ' is not supported for conversion in paths_to_bids')
 
-    counter = None
-
-    def init(args):
-        """
-        Counter is stored for later use
-        Args:
-            args:
-        """
-
-        global counter
-        counter = args
-
-    counter = Value('i', 0)
-    total = images.shape[0]
-    # Reshape inputs to give it as a list to the workers
-    images_list = []
-    for i in range(total):
-        images_list.append(images.iloc[i])
+    manifest = ConversionManifest(bids_dir, get_converter_version('adni-to-bids'))
+
+    # Only the images that are not in the manifest or whose source changed are converted
+    output_file_treated = [None] * images.shape[0]
+    images_list, images_indices, images_keys, images_signatures = [], [], [], []
+    n_skipped = 0
+    for i in range(images.shape[0]):
+        image = images.iloc[i]
+        if image.Path == '':
+            cprint(Fore.RED + '[' + modality.upper() + '] No path specified for '
+                   + image.Subject_ID + ' in session ' + image.VISCODE + Fore.RESET)
+            output_file_treated[i] = nan
+            continue
+        image_key = '%s_%s_%s_%s' % (modality, image.Subject_ID, image.VISCODE, image.Image_ID)
+        source_signature = compute_source_signature(image.Path)
+        # Images of a modality to update are always converted again
+        if not mod_to_update and manifest.is_up_to_date(image_key, source_signature):
+            output_file_treated[i] = manifest.get_output_path(image_key)
+            n_skipped += 1
+            continue
+        if manifest.get_output_path(image_key) is not None:
+            # The source of the image changed since its last conversion, or the modality is updated
+            manifest.remove_outputs(image_key)
+        images_list.append(image)
+        images_indices.append(i)
+        images_keys.append(image_key)
+        images_signatures.append(source_signature)
+
+    if n_skipped > 0:
+        cprint('[' + modality.upper() + '] ' + str(n_skipped) + ' image(s) already converted '
+               'according to ' + manifest.manifest_file)
 
     # Handle multiargument for create_file functions
     partial_create_file = partial(create_file,
                                   modality=modality,
-                                  total=total,
                                   bids_dir=bids_dir,
                                   mod_to_update=mod_to_update)
 
-    # intializer are used with the counter variable to keep track of how many
-    # files have been processed
-    poolrunner = Pool(max(cpu_count() - 1, 1), initializer=init, initargs=(counter,))
-    output_file_treated = poolrunner.map(partial_create_file, images_list)
-    del counter
+    scheduler = ConversionScheduler(modality.upper())
+    images_names = ['subject ' + str(image.Subject_ID) + ' - session ' + image.VISCODE for image in images_list]
+    # Each converted image is recorded as soon as it is available so that an interrupted conversion can be resumed
+    for i, image_key, source_signature, output_image in zip(images_indices, images_keys, images_signatures,
+                                                            scheduler.imap(partial_create_file, images_list,
+                                                                           images_names)):
+        manifest.record(image_key, source_signature, output_image)
+        output_file_treated[i] = output_image
+    scheduler.write_reports(path.join(bids_dir, 'conversion_info', 'conversion_timings.tsv'))
     return output_file_treated
 
 
-def create_file(image, modality, total, bids_dir, mod_to_update):
+def create_file(image, modality, bids_dir, mod_to_update):
     """
     Image file is created at the corresponding output folder
     as result of image conversion (DICOM to NIFTI) and centering,
@@ -828,16 +979,15 @@ def create_file(image, modality, total, bids_dir, mod_to_update):
     Args:
         image: Image metadata
         modality: Imaging modality
-        total: Total number of images to convert
         bids_dir: Path to the output BIDS directory
         mod_to_update:
 
     Returns:
 
     """
-    import subprocess
     from colorama import Fore
     from clinica.utils.stream import cprint
+    from clinica.iotools.conversion_scheduler import run_conversion_command
     from clinica.iotools.utils.data_handling import center_nifti_origin
     from numpy import nan
     import os
@@ -884,11 +1034,6 @@ def create_file(image, modality, total, bids_dir, mod_to_update):
                                  'json': 'n'}
                          }
 
-    global counter
-
-    with counter.get_lock():
-        counter.value += 1
-
     subject = image.Subject_ID
 
     if modality == 'av45_fbb':
@@ -897,12 +1042,10 @@ def create_file(image, modality, total, bids_dir, mod_to_update):
     if image.Path == '':
         cprint(Fore.RED + '[' + modality.upper() + '] No path specified for '
                + image.Subject_ID + ' in session '
-               + image.VISCODE + ' ' + str(counter.value)
-               + ' / ' + str(total) + Fore.RESET)
+               + image.VISCODE + Fore.RESET)
         return nan
     cprint('[' + modality.upper() + '] Processing subject ' + str(subject)
-           + ' - session ' + image.VISCODE + ', ' + str(counter.value)
-           + ' / ' + str(total))
+           + ' - session ' + image.VISCODE)
     session = viscode_to_session(image.VISCODE)
     image_path = image.Path
     image_id = image.Image_ID
@@ -937,10 +1080,7 @@ def create_file(image, modality, total, bids_dir, mod_to_update):
     if image.Is_Dicom:
         command = 'dcm2niix -b %s -z %s -o %s -f %s %s' % \
                   (generate_json, zip_image, output_path, output_filename, image_path)
-        subprocess.run(command,
-                       shell=True,
-                       stderr=subprocess.DEVNULL,
-                       stdout=subprocess.DEVNULL)
+        run_conversion_command(command)
 
         # If "_t" - the trigger delay time - exists in dcm2niix output filename, we remove it
         exception_t = glob(path.join(output_path, output_filename + '_t[0-9]*'))
@@ -970,10 +1110,7 @@ def create_file(image, modality, total, bids_dir, mod_to_update):
                    'for subject ' + subject + ' and session ' + session)
             command = 'dcm2nii -a n -d n -e n -i y -g %s -p n -m n -r n -x n -o %s %s' % \
                       (zip_image, output_path, image_path)
-            subprocess.run(command,
-                           shell=True,
-                           stdout=subprocess.DEVNULL,
-                           stderr=subprocess.DEVNULL)
+            run_conversion_command(command)
 
             # If modality is DWI we check if .bvec and .bval files are also present
             if modality == "dwi":
@@ -185,8 +185,8 @@ def dicom_to_nii(subject, output_path, output_filename, image_path):
         :return: Image in a nifti format
     """
     import os
-    import subprocess
     from clinica.utils.stream import cprint
+    from clinica.iotools.conversion_scheduler import run_conversion_command
     from os.path import exists
     import shutil
     from colorama import Fore
@@ -199,17 +199,13 @@ def dicom_to_nii(subject, output_path, output_filename, image_path):
 
     # if image.Is_Dicom:
     command = 'dcm2niix -b n -z y -o ' + output_path + ' -f ' + output_filename + ' ' + image_path
-    subprocess.run(command, shell=True,
-                   stdout=subprocess.DEVNULL,
-                   stderr=subprocess.DEVNULL)
+    run_conversion_command(command)
     nifti_file = os.path.join(output_path, output_filename + '.nii.gz')
 
     # Check if conversion worked (output file exists?)
     if not exists(nifti_file):
         command = 'dcm2nii -a n -d n -e n -i y -g y -p n -m n -r n -x n -o ' + output_path + ' ' + image_path
-        subprocess.run(command, shell=True,
-                       stdout=subprocess.DEVNULL,
-                       stderr=subprocess.DEVNULL)
+        run_conversion_command(command)
         nifti_file_dcm2nii = os.path.join(output_path, 'DE-IDENTIFIED.nii.gz')
         if os.path.isfile(nifti_file_dcm2nii):
             shutil.move(nifti_file_dcm2nii, nifti_file)
@@ -228,9 +224,7 @@ def dicom_to_nii(subject, output_path, output_filename, image_path):
         # it requires the installation of Freesurfer (checked at the beginning)
         command = 'mri_convert ' + dicom_image + ' ' + nifti_file
         if exists(os.path.expandvars('$FREESURFER_HOME/bin/mri_convert')):
-            subprocess.run(command, shell=True,
-                           stdout=subprocess.DEVNULL,
-                           stderr=subprocess.DEVNULL)
+            run_conversion_command(command)
         else:
             cprint('mri_convert (from Freesurfer) not detected. '
                    + nifti_file + ' not created...')
@@ -493,13 +487,18 @@ def paths_to_bids(path_to_dataset, path_to_csv, bids_dir, modality):
          :return: list of all the images that are potentially converted in a
          BIDS format and saved in the bids_dir. This does not guarantee
          existence
+
+         Images already converted from the same source files by the same
+         version of the converter (as recorded in the conversion manifest of
+         the BIDS directory) are not converted again.
      """
     from os.path import join, exists
     from numpy import nan
     import pandas as pds
     from clinica.utils.stream import cprint
-    from multiprocessing.dummy import Pool
-    from multiprocessing import cpu_count, Value
+    from clinica.iotools.conversion_manifest import ConversionManifest, compute_source_signature, \
+        get_converter_version
+    from clinica.iotools.conversion_scheduler import ConversionScheduler
     import glob
 
     if modality.lower() not in ['t1', 'av45', 'flute', 'pib']:
@@ -507,15 +506,7 @@ def paths_to_bids(path_to_dataset, path_to_csv, bids_dir, modality):
         raise RuntimeError(modality.lower()
                            + ' is not supported for conversion')
 
-    counter = None
-
-    def init(args):
-        """ store the counter for later use """
-        global counter
-        counter = args
-
     def create_file(image):
-        global counter
         subject = image.Subjects_ID
         session = image.Session_ID
         name_of_path = {'t1': 'Path_to_T1',
@@ -525,15 +516,12 @@ def paths_to_bids(path_to_dataset, path_to_csv, bids_dir, modality):
         # depending on the dataframe, there is different way of accessing
         # the iage object
         image_path = image[name_of_path[modality]]
-        with counter.get_lock():
-            counter.value += 1
         if image_path is nan:
             cprint('No path specified for ' + subject + ' in session '
                    + session)
             return nan
         cprint('[' + modality.upper() + '] Processing subject ' + str(subject)
-               + ' - session ' + session + ', ' + str(counter.value) + ' / '
-               + str(total))
+               + ' - session ' + session)
         session = viscode_to_session(session)
         # creation of the path
         if modality == 't1':
@@ -577,18 +565,47 @@ def paths_to_bids(path_to_dataset, path_to_csv, bids_dir, modality):
     images.to_csv(join(bids_dir, modality + '_paths_aibl.tsv'),
                   index=False, sep='\t', encoding='utf-8')
 
-    counter = Value('i', 0)
-    total = images.shape[0]
-    # Reshape inputs to give it as a list to the workers
-    images_list = []
-    for i in range(total):
-        images_list.append(images.iloc[i])
-
-    # intializer are used with the counter variable to keep track of how many
-    # files have been processed
-    poolrunner = Pool(cpu_count(), initializer=init, initargs=(counter,))
-    output_file_treated = poolrunner.map(create_file, images_list)
-    del counter
+    manifest = ConversionManifest(bids_dir, get_converter_version('aibl-to-bids'))
+
+    # Only the images that are not in the manifest or whose source changed are converted
+    output_file_treated = [None] * images.shape[0]
+    images_list, images_indices, images_keys, images_signatures = [], [], [], []
+    n_skipped = 0
+    for i in range(images.shape[0]):
+        image = images.iloc[i]
+        image_path = image['Path_to_T1' if modality == 't1' else 'Path_to_pet']
+        if image_path is nan:
+            cprint('No path specified for ' + image.Subjects_ID + ' in session '
+                   + image.Session_ID)
+            output_file_treated[i] = nan
+            continue
+        image_key = '%s_%s_%s' % (modality, image.Subjects_ID, image.Session_ID)
+        source_signature = compute_source_signature(image_path)
+        if manifest.is_up_to_date(image_key, source_signature):
+            output_file_treated[i] = manifest.get_output_path(image_key)
+            n_skipped += 1
+            continue
+        if manifest.get_output_path(image_key) is not None:
+            # The source of the image changed since its last conversion
+            manifest.remove_outputs(image_key)
+        images_list.append(image)
+        images_indices.append(i)
+        images_keys.append(image_key)
+        images_signatures.append(source_signature)
+
+    if n_skipped > 0:
+        cprint('[' + modality.upper() + '] ' + str(n_skipped) + ' image(s) already converted '
+               'according to ' + manifest.manifest_file)
+
+    scheduler = ConversionScheduler(modality.upper())
+    images_names = ['subject ' + str(image.Subjects_ID) + ' - session ' + str(image.Session_ID)
+                    for image in images_list]
+    # Each converted image is recorded as soon as it is available so that an interrupted conversion can be resumed
+    for i, image_key, source_signature, output_image in zip(images_indices, images_keys, images_signatures,
+                                                            scheduler.imap(create_file, images_list, images_names)):
+        manifest.record(image_key, source_signature, output_image)
+        output_file_treated[i] = output_image
+    scheduler.write_reports(join(bids_dir, 'conversion_info', 'conversion_timings.tsv'))
     return output_file_treated
 
 # -- Methods for the clinical data --
@@ -113,14 +113,9 @@ def convert_images(path_to_dataset, bids_dir, path_to_clinical):
     assert to_convert != [], "No Dicom files to convert!"
     cprint("Converting files to Nifti")
 
-    # Converting only images that have not been already converted,
+    # Converting only images that have not been already converted (or whose DICOM files changed),
     # the converter does not have to restart from scratch if something fails
-    final_convert = []
-    for tuple in to_convert:
-        if not os.path.isfile(tuple[1] + '.nii.gz'):
-            final_convert.append(tuple)
-
-    convert(final_convert)
+    convert(to_convert, bids_dir)
     return to_convert
 
 
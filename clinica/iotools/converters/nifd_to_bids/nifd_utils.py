@@ -256,31 +256,65 @@ def convert_dcm_to_nii(single_tuple):
             and tuple[1] the path to the coverted data
 
     Returns:
-
+        Path to the converted Nifti file
     """
-    import subprocess
     import os
     from clinica.utils.stream import cprint
+    from clinica.iotools.conversion_scheduler import run_conversion_command
 
     filename = os.path.basename(single_tuple[1])
     path_dest = os.path.dirname(single_tuple[1])
     create_folder(path_dest)
     command = 'dcm2niix -b y -z y -o ' + path_dest + ' -f ' + filename + ' ' + single_tuple[0]
     cprint(' Converting ' + os.path.basename(filename).replace('_', ' '))
-    subprocess.run(command,
-                   shell=True,
-                   stdout=subprocess.DEVNULL,
-                   stderr=subprocess.DEVNULL)
+    run_conversion_command(command)
+    return single_tuple[1] + '.nii.gz'
 
 
-def convert(list_tuples):
+def convert(list_tuples, bids_dir=None):
     """
     Converts a list of tuples = [(path/to/dicom, path/to/nifti), ...]
 
+    If bids_dir is given, the images already converted from the same DICOM files by the same version of the
+    converter (as recorded in the conversion manifest of bids_dir) are not converted again, and each converted
+    image is recorded in the manifest as soon as it is available so that an interrupted conversion can be resumed.
+
     Args:
         list_tuples: list of tuples, tuple[0] contains a path to a Dicom file, tuple[1] contains the path where the Nifti file needs to be created.
+        bids_dir: path to the output BIDS directory holding the conversion manifest
     """
-    from multiprocessing import Pool, cpu_count
-
-    p = Pool(max(cpu_count() - 1, 1))
-    p.map(convert_dcm_to_nii, list_tuples)
+    import os
+    from clinica.iotools.conversion_manifest import ConversionManifest, compute_source_signature, \
+        get_converter_version
+    from clinica.iotools.conversion_scheduler import ConversionScheduler
+
+    scheduler = ConversionScheduler('NIFD')
+    if bids_dir is None:
+        scheduler.map(convert_dcm_to_nii, list_tuples,
+                      [os.path.basename(single_tuple[1]) for single_tuple in list_tuples])
+        return
+
+    manifest = ConversionManifest(bids_dir, get_converter_version('nifd-to-bids'))
+    tuples_to_convert, images_keys, images_signatures = [], [], []
+    for single_tuple in list_tuples:
+        image_key = os.path.relpath(os.path.abspath(single_tuple[1]), manifest.bids_dir)
+        source_signature = compute_source_signature(single_tuple[0])
+        if manifest.is_up_to_date(image_key, source_signature):
+            continue
+        if manifest.get_output_path(image_key) is not None:
+            # The DICOM files changed since the last conversion
+            manifest.remove_outputs(image_key)
+        elif os.path.isfile(single_tuple[1] + '.nii.gz'):
+            # Image converted before the manifest was introduced
+            manifest.record(image_key, source_signature, single_tuple[1] + '.nii.gz')
+            continue
+        tuples_to_convert.append(single_tuple)
+        images_keys.append(image_key)
+        images_signatures.append(source_signature)
+
+    tuples_names = [os.path.basename(single_tuple[1]) for single_tuple in tuples_to_convert]
+    for image_key, source_signature, output_image in zip(images_keys, images_signatures,
+                                                         scheduler.imap(convert_dcm_to_nii, tuples_to_convert,
+                                                                        tuples_names)):
+        manifest.record(image_key, source_signature, output_image)
+    scheduler.write_reports(os.path.join(bids_dir, 'conversion_info', 'conversion_timings.tsv'))
@@ -4,6 +4,72 @@
 Data handling scripts
 """
 
+# Listing of the subjects and sessions of the BIDS/CAPS directories (see list_subjects_sessions), indexed by
+# (path of the folder containing the subjects, use_session_tsv)
+_subjects_sessions_cache = {}
+
+
+def _thread_map(function, items, n_threads=None):
+    """
+    Apply function to each item with a pool of threads (serially if there is a single item).
+
+    Args:
+        function: function called with each item
+        items: list of items
+        n_threads: number of threads (number of CPUs available to the process if None)
+
+    Returns:
+        list of the results, in the order of items
+    """
+    from multiprocessing.dummy import Pool
+    from clinica.utils.resources import get_available_cpus
+
+    if len(items) <= 1:
+        return [function(item) for item in items]
+
+    pool = Pool(min(n_threads or get_available_cpus(), len(items)))
+    try:
+        return pool.map(function, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def read_tsv_files(tsv_files, missing_ok=False, n_threads=None):
+    """
+    Read a list of TSV files in parallel.
+
+    Args:
+        tsv_files: list of paths to TSV files
+        missing_ok: if True, None is returned for the files that do not exist
+        n_threads: number of threads reading the files (number of available CPUs if None)
+
+    Returns:
+        list of DataFrames, in the order of tsv_files
+    """
+    import os
+    import pandas as pd
+
+    def read_tsv(tsv_file):
+        if missing_ok and not os.path.isfile(tsv_file):
+            return None
+        return pd.read_csv(tsv_file, sep='\t')
+
+    return _thread_map(read_tsv, list(tsv_files), n_threads)
+
+
+def _scalar_dtype(value):
+    """Dtype inferred by pandas for a column filled with the scalar `value` (values read by pd.read_csv)."""
+    import numpy as np
+
+    if isinstance(value, (bool, np.bool_)):
+        return np.dtype(bool)
+    if isinstance(value, (int, np.integer)):
+        return np.dtype('int64')
+    if isinstance(value, (float, np.floating)):
+        return np.dtype('float64')
+    return np.dtype(object)
+
 
 def create_merge_file(bids_dir, out_tsv, caps_dir=None, tsv_file=None, pipelines=None, **kwargs):
     """
@@ -32,7 +98,6 @@ def create_merge_file(bids_dir, out_tsv, caps_dir=None, tsv_file=None, pipelines
             raise IOError('The path to the CAPS directory is wrong')
 
     col_list = []
-    scans_dict = {}
 
     if not os.path.isfile(path.join(bids_dir, 'participants.tsv')):
         raise IOError('participants.tsv not found in the specified BIDS directory')
@@ -68,83 +133,104 @@ def create_merge_file(bids_dir, out_tsv, caps_dir=None, tsv_file=None, pipelines
     for col in participants_df.columns.values:
         col_list.append(col)
 
-    merged_df = pd.DataFrame(columns=col_list)
-
     # BIDS part
+    # The sessions and scans TSV files are read in parallel and the merged table is built with a single
+    # concatenation. The rows are built as DataFrame.append() used to build them session by session, so that the
+    # dtypes of the columns (and thus the output file) do not change.
+    participant_rows = {}
+    for i_row, participant_id in enumerate(participants_df['participant_id'].to_numpy()):
+        participant_rows.setdefault(participant_id, []).append(i_row)
+    participant_columns = [(col, participants_df[col].to_numpy(), participants_df[col].dtype)
+                           for col in participants_df.columns.values]
+
+    # Consecutive sessions of the same subject
+    subject_groups = []
     i_subject = 0
     while i_subject < n_sessions:
-        sub_path = path.join(bids_dir, subjects[i_subject])
-        sub_name = sub_path.split(os.sep)[-1]
-        # For each subject, extract the relative row from the dataframe
-        row_participant = participants_df[participants_df['participant_id'] == sub_name]
-        # Open the sessions file related to the subject
-        sessions_df = pd.read_csv(path.join(sub_path, sub_name + '_sessions.tsv'), sep='\t')
-        # Looking for the sessions corresponding to the subject
-        loc_sessions = []
         i_session = i_subject
         while i_session < n_sessions and subjects[i_session] == subjects[i_subject]:
-            loc_sessions.append(i_session)
             i_session += 1
-
-        # For each session found
-        # extract the information contained in the scans files
-        # for line in range(0, len(sessions_df)):
-        for i_session in loc_sessions:
-            # Extract and convert to a dictionary information
-            # regarding the session
-            row_session_df = sessions_df[sessions_df.session_id == sessions[i_session]]
-            row_session_df.reset_index(inplace=True, drop=True)
-            if len(row_session_df) == 0:
+        subject_groups.append(list(range(i_subject, i_session)))
+        i_subject = i_session
+
+    sub_names = [path.join(bids_dir, subjects[group[0]]).split(os.sep)[-1] for group in subject_groups]
+    sessions_dfs = read_tsv_files([path.join(bids_dir, subjects[group[0]], sub_name + '_sessions.tsv')
+                                   for group, sub_name in zip(subject_groups, sub_names)])
+
+    # Session rows of each subject
+    session_rows = []
+    for group, sub_name, sessions_df in zip(subject_groups, sub_names, sessions_dfs):
+        first_rows = {}
+        for i_row, session_id in enumerate(sessions_df['session_id'].to_numpy()):
+            first_rows.setdefault(session_id, i_row)
+        rows = []
+        for i_session in group:
+            if sessions[i_session] not in first_rows:
                 raise DatasetError(sessions_df.loc[0, 'session_id'] + ' / ' + sessions[i_session])
-
-            new_cols = [s for s in row_session_df.columns.values if s not in col_list]
-            if len(new_cols) != 0:
-                for i in range(0, len(new_cols)):
-                    col_list.append(new_cols[i])
-
-            session_id = row_session_df.loc[0, 'session_id']
-            if os.path.isfile(path.join(bids_dir, sub_name, 'ses-' + session_id,
-                                        sub_name + '_' + 'ses-' + session_id + '_scans.tsv')):
-                scans_df = pd.read_csv(path.join(bids_dir, sub_name, 'ses-' + session_id,
-                                                 sub_name + '_' + 'ses-' + session_id + '_scans.tsv'), sep='\t')
+            rows.append(first_rows[sessions[i_session]])
+        session_rows.append(rows)
+
+    scans_files = [
+        [path.join(bids_dir, sub_name, 'ses-' + sessions_df['session_id'].to_numpy()[i_row],
+                   sub_name + '_' + 'ses-' + sessions_df['session_id'].to_numpy()[i_row] + '_scans.tsv')
+         for i_row in rows]
+        for sub_name, sessions_df, rows in zip(sub_names, sessions_dfs, session_rows)
+    ]
+    scans_dfs = read_tsv_files([f for files in scans_files for f in files], missing_ok=True)
+
+    # Rows with the same columns (and dtypes) are gathered in blocks
+    blocks = {}
+    i_merged = 0
+    i_scans = 0
+    for sub_name, sessions_df, rows, files in zip(sub_names, sessions_dfs, session_rows, scans_files):
+        session_columns = [(col, sessions_df[col].to_numpy()) for col in sessions_df.columns.values]
+        # As in the previous implementation, the scans information accumulates over the sessions of a subject
+        scans_dict = {}
+        for i_row in rows:
+            scans_df = scans_dfs[i_scans]
+            i_scans += 1
+
+            new_cols = [col for col, _ in session_columns if col not in col_list]
+            col_list.extend(new_cols)
+
+            if scans_df is not None:
+                mod_types = [os.path.splitext(os.path.splitext(file_scan.split('/')[1])[0])[0].split('_')[-1]
+                             for file_scan in scans_df['filename'].to_numpy()]
+                scans_values = [(col, scans_df[col].to_numpy()) for col in scans_df.columns.values
+                                if col != 'filename']
                 for i in range(0, len(scans_df)):
-                    for col in scans_df.columns.values:
-                        if col == 'filename':
-                            pass
-                        else:
-                            file_scan = scans_df.iloc[i]['filename']
-                            file_name = file_scan.split('/')[1]
-                            # Remove the extension .nii.gz
-                            file_name = os.path.splitext(os.path.splitext(file_name)[0])[0]
-                            file_parts = file_name.split('_')
-                            last_pattern_index = len(file_parts) - 1
-                            mod_type = file_parts[last_pattern_index]
-                            value = scans_df.iloc[i][col]
-                            new_col_name = col + '_' + mod_type
-                            scans_dict.update({new_col_name: value})
-                row_scans = pd.DataFrame(scans_dict, index=[0])
+                    for col, values in scans_values:
+                        scans_dict.update({col + '_' + mod_types[i]: values[i]})
+                row_scans = scans_dict
             else:
-                row_scans = pd.DataFrame()
-
-            new_cols = [s for s in row_scans.columns.values if s not in col_list]
-            if len(new_cols) != 0:
-                for i in range(0, len(new_cols)):
-                    col_list.append(new_cols[i])
-
-            row_to_append_df = pd.DataFrame(columns=row_participant.columns)
-            for col in row_participant:
-                row_to_append_df[col] = row_participant[col]
-
-            # Append all the data inside session_df
-            for col in row_session_df:
-                row_to_append_df[col] = row_session_df[col].values[0]
-
-            for col in row_scans:
-                row_to_append_df[col] = row_scans[col].values[0]
-
-            merged_df = merged_df.append(row_to_append_df)
-        scans_dict = {}
-        i_subject = loc_sessions[-1] + 1
+                row_scans = {}
+
+            new_cols = [col for col in row_scans if col not in col_list]
+            col_list.extend(new_cols)
+
+            # Scalars assigned to the row get the dtype pandas infers from them
+            row_values = {}
+            for col, values in session_columns:
+                row_values[col] = (values[i_row], _scalar_dtype(values[i_row]))
+            for col, value in row_scans.items():
+                row_values[col] = (value, _scalar_dtype(value))
+
+            for i_participant in participant_rows.get(sub_name, []):
+                merged_row = {col: (values[i_participant], dtype) for col, values, dtype in participant_columns}
+                merged_row.update(row_values)
+                key = tuple((col, dtype) for col, (_, dtype) in merged_row.items())
+                blocks.setdefault(key, []).append((i_merged, [value for value, _ in merged_row.values()]))
+                i_merged += 1
+
+    block_dfs = []
+    for key, block_rows in blocks.items():
+        index = [i_row for i_row, _ in block_rows]
+        block_dfs.append(pd.DataFrame({
+            col: pd.Series([values[i_col] for _, values in block_rows], index=index, dtype=dtype)
+            for i_col, (col, dtype) in enumerate(key)
+        }, columns=[col for col, _ in key]))
+    merged_df = pd.concat([pd.DataFrame(columns=list(participants_df.columns.values))] + block_dfs, sort=False)
+    merged_df = merged_df.sort_index(kind='mergesort')
 
     old_index = col_list.index('session_id')
     col_list.insert(1, col_list.pop(old_index))
@@ -240,12 +326,68 @@ def create_merge_file(bids_dir, out_tsv, caps_dir=None, tsv_file=None, pipelines
     merged_df.to_csv(path.join(out_dir, out_file_name), sep='\t', index=False)
 
 
-def find_mods_and_sess(bids_dir):
+def scan_bids_inventory(bids_dir, n_threads=None):
+    """
+    List the content of a BIDS dataset in a single parallel traversal.
+
+    The subjects ('*sub-*' entries of bids_dir) are listed in parallel with os.scandir. Hidden entries are ignored
+    and the entries of each folder are kept in the order of the listing.
+
+    Args:
+        bids_dir: path to the BIDS dataset
+        n_threads: number of threads listing the subjects (number of available CPUs if None)
+
+    Returns:
+        DataFrame with one row per entry of a modality folder, with columns participant_id, session_id, modality
+        (name of the folder inside the session), task (task of the func/*bold.nii.gz files) and file (name of the
+        entry). Subjects without session, sessions without modality folder and empty modality folders are stored
+        in a row whose remaining columns are None.
+    """
+    import os
+    import pandas as pd
+
+    columns = ['participant_id', 'session_id', 'modality', 'task', 'file']
+
+    def list_entries(folder):
+        try:
+            with os.scandir(folder) as iterator:
+                return [entry for entry in iterator if not entry.name.startswith('.')]
+        except OSError:
+            return []
+
+    def scan_subject(subject):
+        rows = []
+        sessions = [entry for entry in list_entries(os.path.join(bids_dir, subject)) if 'ses-' in entry.name]
+        if not sessions:
+            rows.append((subject, None, None, None, None))
+        for session in sessions:
+            modalities = [entry for entry in list_entries(session.path) if entry.is_dir()]
+            if not modalities:
+                rows.append((subject, session.name, None, None, None))
+            for modality in modalities:
+                files = list_entries(modality.path)
+                if not files:
+                    rows.append((subject, session.name, modality.name, None, None))
+                for file in files:
+                    task = None
+                    if modality.name == 'func' and file.name.endswith('bold.nii.gz'):
+                        task = file.name.split('_')[2]
+                    rows.append((subject, session.name, modality.name, task, file.name))
+        return rows
+
+    subjects = [entry.name for entry in list_entries(bids_dir) if 'sub-' in entry.name]
+    subjects_rows = _thread_map(scan_subject, subjects, n_threads)
+
+    return pd.DataFrame([row for rows in subjects_rows for row in rows], columns=columns)
+
+
+def find_mods_and_sess(bids_dir, inventory=None):
     """
     Find all the modalities and sessions available for a given BIDS dataset
 
     Args:
         bids_dir: path to the BIDS dataset
+        inventory: content of the BIDS dataset computed by scan_bids_inventory (computed if None)
 
     Returns:
         mods_dict: a dictionary that stores the sessions and modalities found and has the following structure.
@@ -259,90 +401,48 @@ def find_mods_and_sess(bids_dir):
     }
 
     """
-    from glob import glob
-    from os import path
     import os
 
+    if inventory is None:
+        inventory = scan_bids_inventory(bids_dir)
+
     mods_dict = {}
-    mods_list = []
-    subjects_paths_lists = glob(path.join(bids_dir, '*sub-*'))
-
-    for sub_path in subjects_paths_lists:
-        ses_paths = glob(path.join(sub_path, '*ses-*'))
-        for session in ses_paths:
-            ses_name = session.split(os.sep)[-1]
-            mods_avail = []
-            if 'sessions' in mods_dict:
-                if ses_name not in mods_dict['sessions']:
-                    mods_dict['sessions'].append(ses_name)
-            else:
-                mods_dict.update({'sessions': [ses_name]})
-            mods_paths_folders = glob(path.join(session, '*/'))
-
-            for p in mods_paths_folders:
-                p = p[:-1]
-                mods_avail.append(p.split('/').pop())
-
-            if 'func' in mods_avail:
-                list_funcs_paths = glob(path.join(session, 'func', '*bold.nii.gz'))
-                for func_path in list_funcs_paths:
-                    func_name = func_path.split(os.sep)[-1]
-                    func_name_tokens = func_name.split('_')
-                    func_task = func_name_tokens[2]
-                if 'func' in mods_dict:
-                    if 'func_' + func_task not in mods_dict['func']:
-                        mods_dict['func'].append('func_' + func_task)
+    sessions = inventory.dropna(subset=['session_id'])
+    for (subject, ses_name), session_rows in sessions.groupby(['participant_id', 'session_id'], sort=False):
+        mods_dict.setdefault('sessions', [])
+        if ses_name not in mods_dict['sessions']:
+            mods_dict['sessions'].append(ses_name)
+        mods_avail = list(session_rows.modality.dropna().unique())
+
+        if 'func' in mods_avail:
+            func_tasks = session_rows.task.dropna()
+            if len(func_tasks) > 0:
+                # As for the modalities, the task of the last bold file of the session is kept
+                func_task = func_tasks.iloc[-1]
+                mods_dict.setdefault('func', [])
+                if 'func_' + func_task not in mods_dict['func']:
+                    mods_dict['func'].append('func_' + func_task)
+
+        for mod in ['dwi', 'fmap', 'pet']:
+            if mod in mods_avail and mod not in mods_dict:
+                mods_dict.update({mod: [mod]})
+
+        if 'anat' in mods_avail:
+            for anat_name in session_rows[session_rows.modality == 'anat'].file.dropna():
+                # Extract the name of the file without the extension
+                if '.nii.gz' in anat_name:
+                    anat_name = anat_name.replace('.nii.gz', '')
+                    anat_ext = 'nii.gz'
                 else:
-                    mods_dict.update({'func': ['func_' + func_task]})
-
-                if 'func_' + func_task not in mods_list:
-                    mods_list.append('func_' + func_task)
-
-            if 'dwi' in mods_avail:
-                if 'dwi' not in mods_dict:
-                    mods_dict.update({'dwi': ['dwi']})
-                if 'dwi' not in mods_list:
-                    mods_list.append('dwi')
-
-            if 'fmap' in mods_avail:
-                if 'fmap' not in mods_dict:
-                    mods_dict.update({'fmap': ['fmap']})
-                if 'fmap' not in mods_list:
-                    mods_list.append('fmap')
-
-            if 'pet' in mods_avail:
-                if 'pet' not in mods_dict:
-                    mods_dict.update({'pet': ['pet']})
-                if 'pet' not in mods_list:
-                    mods_list.append('pet')
-
-            if 'anat' in mods_avail:
-                anat_files_paths = glob(path.join(session, 'anat', '*'))
-
-                for anat_file in anat_files_paths:
-                    anat_name = anat_file.split(os.sep)[-1]
-
-                    # Extract the name of the file without the extension
-                    if '.nii.gz' in anat_name:
-                        anat_name = anat_name.replace('.nii.gz', '')
-                        anat_ext = 'nii.gz'
-                    else:
-                        anat_name = os.path.splitext(anat_name.split(os.sep)[-1])[0]
-                        anat_ext = os.path.splitext(anat_name.split(os.sep)[-1])[1]
-
-                    if anat_ext != 'json':
-                        file_parts = anat_name.split("_")
-                        anat_type = str.lower(file_parts[len(file_parts) - 1])
-                        if 'anat' in mods_dict:
-                            if anat_type not in mods_dict['anat']:
-                                anat_aval = mods_dict['anat']
-                                anat_aval.append(anat_type)
-                                mods_dict.update({'anat': anat_aval})
-                        else:
-                            mods_dict.update({'anat': [anat_type]})
-
-                        if anat_type not in mods_list:
-                            mods_list.append(anat_type)
+                    anat_name = os.path.splitext(anat_name)[0]
+                    anat_ext = os.path.splitext(anat_name)[1]
+
+                if anat_ext != 'json':
+                    file_parts = anat_name.split("_")
+                    anat_type = str.lower(file_parts[len(file_parts) - 1])
+                    mods_dict.setdefault('anat', [])
+                    if anat_type not in mods_dict['anat']:
+                        mods_dict['anat'].append(anat_type)
 
     return mods_dict
 
@@ -351,6 +451,9 @@ def compute_missing_mods(bids_dir, out_dir, output_prefix=''):
     """
     Compute the list of missing modalities for each subject in a BIDS compliant dataset
 
+    The BIDS dataset is listed once (see scan_bids_inventory) and the availability of each modality is computed
+    for all the subjects and sessions at once.
+
     Args:
         bids_dir: path to the BIDS directory
         out_dir: path to the output folder
@@ -360,14 +463,15 @@ def compute_missing_mods(bids_dir, out_dir, output_prefix=''):
     from ..converter_utils import MissingModsTracker, print_statistics
     import os
     from os import path
+    import numpy as np
     import pandas as pd
-    from glob import glob
 
     if not os.path.exists(out_dir):
         os.makedirs(out_dir)
 
     # Find all the modalities and sessions available for the input dataset
-    mods_and_sess = find_mods_and_sess(bids_dir)
+    inventory = scan_bids_inventory(bids_dir)
+    mods_and_sess = find_mods_and_sess(bids_dir, inventory)
     sessions_found = mods_and_sess['sessions']
     mods_and_sess.pop('sessions')
     mods_avail_dict = mods_and_sess
@@ -382,100 +486,141 @@ def compute_missing_mods(bids_dir, out_dir, output_prefix=''):
         out_file_name = output_prefix + '_'
 
     summary_file = open(path.join(out_dir, out_file_name + 'summary.txt'), 'w')
-    missing_mods_df = pd.DataFrame(columns=cols_dataframe)
-    row_to_append_df = pd.DataFrame(columns=cols_dataframe)
-    subjects_paths_lists = glob(path.join(bids_dir, '*sub-*'))
-    subjects_paths_lists.sort()
+    subjects = sorted(inventory.participant_id.unique())
 
-    if len(subjects_paths_lists) == 0:
+    if len(subjects) == 0:
         raise IOError("No subjects found or dataset not BIDS complaint.")
-    # Check the modalities available for each session
-    for ses in sessions_found:
-        mods_avail_bids = []
-        for sub_path in subjects_paths_lists:
-            mods_avail_bids = []
-            subj_id = sub_path.split(os.sep)[-1]
-            row_to_append_df['participant_id'] = pd.Series(subj_id)
-            ses_path_avail = glob(path.join(sub_path, ses))
-            if len(ses_path_avail) == 0:
-                mmt.increase_missing_ses(ses)
-                for mod in mods_avail:
-                    row_to_append_df[mod] = pd.Series('0')
-            else:
-
-                ses_path = ses_path_avail[0]
-                mods_paths_folders = glob(path.join(ses_path, '*/'))
-
-                for p in mods_paths_folders:
-                    p = p[:-1]
-                    mods_avail_bids.append(p.split('/').pop())
-
-                # Check if a modality folder is available and if is empty
-                if 'func' in mods_avail_bids:
-                    # Extract all the task available
-                    for m in mods_avail_dict['func']:
-                        tokens = m.split('_')
-                        task_name = tokens[1]
-                        task_avail_list = glob(path.join(
-                            ses_path, 'func', '*' + task_name + '*')
-                        )
-
-                        if len(task_avail_list) == 0:
-                            row_to_append_df[m] = pd.Series('0')
-                        else:
-                            row_to_append_df[m] = pd.Series('1')
-                # If the folder is not available but the modality is
-                # in the list of the available one mark it as missing
-                else:
-                    if 'func' in mods_avail_dict:
-                        for m in mods_avail_dict['func']:
-                            row_to_append_df[m] = pd.Series('0')
-                        mmt.add_missing_mod(ses, m)
 
-                if 'dwi' in mods_avail_bids:
-                    row_to_append_df['dwi'] = pd.Series('1')
-                else:
-                    if 'dwi' in mods_avail:
-                        row_to_append_df['dwi'] = pd.Series('0')
-                        mmt.add_missing_mod(ses, 'dwi')
-
-                if 'anat' in mods_avail_bids:
-                    for m in mods_avail_dict['anat']:
-                        anat_aval_list = glob(path.join(ses_path, 'anat', '*.nii.gz'))
-                        anat_aval_list = [elem for elem in anat_aval_list if m.lower() in elem.lower()]
-                        if len(anat_aval_list) > 0:
-                            row_to_append_df[m] = pd.Series('1')
-                        else:
-                            row_to_append_df[m] = pd.Series('0')
-                            mmt.add_missing_mod(ses, m)
-                else:
-                    if 'anat' in mods_avail_dict:
-                        for m in mods_avail_dict['anat']:
-                            row_to_append_df[m] = pd.Series('0')
-                            mmt.add_missing_mod(ses, m)
+    # (participant_id, session_id) pairs of the sessions and of the sessions containing each modality folder
+    def session_pairs(rows):
+        return pd.MultiIndex.from_frame(rows[['participant_id', 'session_id']].drop_duplicates())
 
-                if 'fmap' in mods_avail_bids:
-                    row_to_append_df['fmap'] = pd.Series('1')
-                else:
-                    if 'fmap' in mods_avail:
-                        row_to_append_df['fmap'] = pd.Series('0')
-                        mmt.add_missing_mod(ses, 'fmap')
-                if 'pet' in mods_avail_bids:
-                    row_to_append_df['pet'] = pd.Series('1')
-                else:
-                    if 'pet' in mods_avail:
-                        row_to_append_df['pet'] = pd.Series('0')
-                        mmt.add_missing_mod(ses, 'pet')
+    sessions = session_pairs(inventory.dropna(subset=['session_id']))
+    folders = {modality: session_pairs(rows) for modality, rows in inventory.groupby('modality')}
+    files = inventory.dropna(subset=['file'])
+    func_files = files[files.modality == 'func']
+    anat_files = files[(files.modality == 'anat') & files.file.str.endswith('.nii.gz')]
+    anat_paths = (path.join(bids_dir, '') + anat_files.participant_id + os.sep + anat_files.session_id + os.sep
+                  + 'anat' + os.sep + anat_files.file).str.lower()
 
-            missing_mods_df = missing_mods_df.append(row_to_append_df)
-            row_to_append_df = pd.DataFrame(columns=cols_dataframe)
+    # Check the modalities available for each session
+    for ses in sessions_found:
+        index = pd.MultiIndex.from_arrays([subjects, [ses] * len(subjects)])
+        has_session = index.isin(sessions)
+        mmt.increase_missing_ses(ses, int(np.sum(~has_session)))
+
+        def has_folder(modality):
+            return index.isin(folders[modality]) if modality in folders else np.zeros(len(index), dtype=bool)
+
+        missing_mods_df = pd.DataFrame({'participant_id': subjects})
+        if 'func' in mods_avail_dict:
+            has_func = has_folder('func')
+            for m in mods_avail_dict['func']:
+                task_name = m.split('_')[1]
+                task_files = func_files[func_files.file.str.contains(task_name, regex=False)]
+                missing_mods_df[m] = np.where(index.isin(session_pairs(task_files)), '1', '0')
+            # If the folder is not available but the modality is
+            # in the list of the available one mark it as missing
+            mmt.add_missing_mod(ses, m, int(np.sum(has_session & ~has_func)))
+
+        for mod in ['dwi', 'fmap', 'pet']:
+            if mod in mods_avail:
+                has_mod = has_folder(mod)
+                missing_mods_df[mod] = np.where(has_mod, '1', '0')
+                mmt.add_missing_mod(ses, mod, int(np.sum(has_session & ~has_mod)))
+
+        for m in mods_avail_dict.get('anat', []):
+            has_anat = index.isin(session_pairs(anat_files[anat_paths.str.contains(m.lower(), regex=False)]))
+            missing_mods_df[m] = np.where(has_anat, '1', '0')
+            mmt.add_missing_mod(ses, m, int(np.sum(has_session & ~has_anat)))
 
         missing_mods_df = missing_mods_df[cols_dataframe]
         missing_mods_df.to_csv(path.join(out_dir, out_file_name + ses + '.tsv'), sep='\t', index=False,
                                encoding='utf-8')
-        missing_mods_df = pd.DataFrame(columns=cols_dataframe)
 
-    print_statistics(summary_file, len(subjects_paths_lists), sessions_found, mmt)
+    print_statistics(summary_file, len(subjects), sessions_found, mmt)
+
+
+def list_subjects_sessions(input_dir, is_bids_dir=True, use_session_tsv=False, n_threads=None):
+    """
+    List the visits of each subject of a BIDS or CAPS compliant dataset.
+
+    The subject folders are listed in parallel with os.scandir. The listing is kept in memory and shared by all the
+    calls of the process: a subject folder (or its sessions.tsv file) is listed again only if its modification time
+    changed since the previous call.
+
+    Args:
+        input_dir (str): Path to the BIDS or CAPS directory.
+        is_bids_dir (boolean): Specify if input_dir is a BIDS directory or
+            not (i.e. a CAPS directory)
+        use_session_tsv (boolean): Specify if the list uses the sessions listed in the sessions.tsv files
+        n_threads (int): Number of threads listing the subjects (number of available CPUs if None)
+
+    Returns:
+        (subjects, sessions): participant_id and session_id of each visit, sorted by participant_id
+    """
+    import os
+    import time
+    import pandas as pd
+
+    if is_bids_dir:
+        path_to_search = input_dir
+    else:
+        path_to_search = os.path.join(input_dir, 'subjects')
+    path_to_search = os.path.abspath(path_to_search)
+
+    def modification_time(file_path):
+        try:
+            mtime = os.stat(file_path).st_mtime_ns
+        except OSError:
+            return None
+        # A folder modified a short time ago may still change within the same mtime tick: do not trust it
+        if time.time() * 1e9 - mtime < 2e9:
+            return None
+        return mtime
+
+    def list_sessions(subj_id, cached):
+        sub_path = os.path.join(path_to_search, subj_id)
+        if use_session_tsv:
+            sessions_tsv = os.path.join(sub_path, subj_id + '_sessions.tsv')
+            mtime = modification_time(sessions_tsv)
+            if cached is not None and mtime is not None and cached[0] == mtime:
+                return cached
+            session_df = pd.read_csv(sessions_tsv, sep='\t')
+            return mtime, [str(session).strip(' ') for session in session_df['session_id'].to_numpy()]
+
+        mtime = modification_time(sub_path)
+        if cached is not None and mtime is not None and cached[0] == mtime:
+            return cached
+        try:
+            with os.scandir(sub_path) as iterator:
+                return mtime, [entry.name for entry in iterator
+                               if 'ses-' in entry.name and not entry.name.startswith('.')]
+        except OSError:
+            return mtime, []
+
+    cache = _subjects_sessions_cache.setdefault((path_to_search, use_session_tsv), {})
+    try:
+        with os.scandir(path_to_search) as iterator:
+            subjects = sorted(entry.name for entry in iterator
+                              if 'sub-' in entry.name and not entry.name.startswith('.'))
+    except OSError:
+        subjects = []
+
+    if len(subjects) == 0:
+        raise IOError('Dataset empty or not BIDS/CAPS compliant.')
+
+    args = [(subj_id, cache.get(subj_id)) for subj_id in subjects]
+    listings = _thread_map(lambda arg: list_sessions(*arg), args, n_threads)
+
+    cache.clear()
+    cache.update(zip(subjects, listings))
+
+    participant_ids, session_ids = [], []
+    for subj_id, (_, sessions) in zip(subjects, listings):
+        participant_ids.extend([subj_id.strip(' ')] * len(sessions))
+        session_ids.extend(sessions)
+    return participant_ids, session_ids
 
 
 def create_subs_sess_list(input_dir, output_dir,
@@ -493,8 +638,6 @@ def create_subs_sess_list(input_dir, output_dir,
         use_session_tsv (boolean): Specify if the list uses the sessions listed in the sessions.tsv files
     """
     from os import path
-    from glob import glob
-    import pandas as pd
     import os
 
     if not os.path.exists(output_dir):
@@ -502,38 +645,237 @@ def create_subs_sess_list(input_dir, output_dir,
 
     if file_name is None:
         file_name = 'subjects_sessions_list.tsv'
-    subjs_sess_tsv = open(path.join(output_dir, file_name), 'w')
-    subjs_sess_tsv.write('participant_id' + '\t' + 'session_id' + '\n')
 
-    if is_bids_dir:
-        path_to_search = input_dir
-    else:
-        path_to_search = path.join(input_dir, 'subjects')
-    subjects_paths = glob(path.join(path_to_search, '*sub-*'))
+    participant_ids, session_ids = list_subjects_sessions(input_dir, is_bids_dir, use_session_tsv)
 
-    # Sort the subjects list
-    subjects_paths.sort()
+    with open(path.join(output_dir, file_name), 'w') as subjs_sess_tsv:
+        subjs_sess_tsv.write('participant_id' + '\t' + 'session_id' + '\n')
+        for subj_id, session in zip(participant_ids, session_ids):
+            subjs_sess_tsv.write(subj_id + '\t' + session + '\n')
 
-    if len(subjects_paths) == 0:
-        raise IOError('Dataset empty or not BIDS/CAPS compliant.')
 
-    for sub_path in subjects_paths:
-        subj_id = sub_path.split(os.sep)[-1]
+def get_cross_sectional_conversion_mode():
+    """
+    Mode of the conversion of cross-sectional BIDS datasets (see convert_cross_sectional).
 
-        if use_session_tsv:
-            session_df = pd.read_csv(path.join(sub_path, subj_id + '_sessions.tsv'), sep='\t')
-            session_list = list(session_df['session_id'].to_numpy())
-            for session in session_list:
-                subjs_sess_tsv.write(subj_id + '\t' + session + '\n')
+    The mode is read from the CLINICA_CROSS_SECTIONAL_CONVERSION environment variable:
+        - 'copy' (default): the files are copied
+        - 'hardlink': the files are hard links to the original files (copied if the file system does not allow
+          it, e.g. across devices)
+        - 'symlink': the files are symbolic links to the original files
 
-        else:
-            sess_list = glob(path.join(sub_path, '*ses-*'))
+    Returns:
+        The conversion mode ('copy' if the variable has an unknown value)
+    """
+    import os
+
+    mode = os.environ.get('CLINICA_CROSS_SECTIONAL_CONVERSION', 'copy').lower()
+    if mode not in ['copy', 'hardlink', 'symlink']:
+        mode = 'copy'
+    return mode
+
+
+def _add_session_to_filename(f):
+    """
+    Use this function to transform a cross sectional filename into
+    a longitudinal one.
+    Examples:
+    sub-ADNI001_scans.tsv -> sub-ADNI001_ses-M00_scans.tsv
+    sub-023a_ses-M12_T1w.nii.gz -> sub-023a_ses-M12_T1w.nii.gz (no
+        modification done if filename already has a session)
+
+    Args:
+        f: filename
+
+    Returns:
+        filename with '_ses-M00_ added just after participant_id
+    """
+    import re
+    # If filename contains ses-..., returns the original filename
+    # Regex explication:
+    # ^ start of string
+    # ([a-zA-Z0-9]*) matches any number of characters from a to z,
+    #       A to Z, 0 to 9, and store it in group(1)
+    # (?!ses-[a-zA-Z0-9]) do not match if there is already a 'ses-'
+    # (.*) catches the rest of the string
+    m = re.search(r'(^sub-[a-zA-Z0-9]*)_(?!ses-[a-zA-Z0-9])(.*)', f)
+    try:
+        return m.group(1) + '_ses-M00_' + m.group(2)
+    except AttributeError:
+        # If something goes wrong, we return the original filename
+        return f
+
+
+def convert_cross_sectional(bids_in, bids_out, cross_subjects, long_subjects, mode='copy'):
+    """
+    This function converts a cross-sectional-bids dataset into a
+    longitudinal clinica-compliant dataset
+
+    Args:
+        bids_in: cross sectional bids dataset you want to convert
+        bids_out: converted longitudinal bids dataset
+        cross_subjects: list of subjects in cross sectional form
+            (they need some adjustment)
+        long_subjects: list of subjects in longitudinal form (they
+            just need to be copied)
+        mode: 'copy', 'hardlink' or 'symlink' (see
+            get_cross_sectional_conversion_mode)
+
+    Returns:
+        nothing
+    """
+    import os
+    import shutil
+    from os import listdir, mkdir
+    from os.path import abspath, basename, dirname, exists, isdir, isfile, join
+    from shutil import copytree
+
+    def copy2(src, dst):
+        """
+        copy2 calls copy2 function from shutil, or creates a hard
+        link or a symbolic link to src depending on the conversion
+        mode (the file is copied if the link cannot be created)
+        """
+        if isdir(dst):
+            dst = join(dst, basename(src))
+        try:
+            if mode == 'hardlink':
+                os.link(src, dst)
+                return dst
+            elif mode == 'symlink':
+                os.symlink(abspath(src), dst)
+                return dst
+        except OSError:
+            pass
+        return shutil.copy2(src, dst)
+
+    def copy2_add_ses(src, dst):
+        """
+        copy2_add_ses calls copy2, but modifies the filename of the
+        copied files if they match the regex template described in
+        _add_session_to_filename() function
+
+        Args:
+            src: path to the file that needs to be copied
+            dst: original destination for the copied file
+
+        Returns:
+            copy2 with modified filename
+        """
+        dst_modified = join(dirname(dst), _add_session_to_filename(basename(src)))
+        return copy2(src, dst_modified)
+
+    if not exists(bids_out):
+        # Create the output folder if it does not exists yet
+        mkdir(bids_out)
+
+    # First part of the algorithm: deal with subjects that does not
+    # have longitudinal (session) information
+    for subj in cross_subjects:
+        # Get list of of files/folders to copy. Remove hidden element
+        # ( if they start with a dot '.')
+        to_copy = [f for f in listdir(join(bids_in, subj)) if
+                   not f.startswith('.')]
+        # Always check that folder are existing, otherwise an exception
+        # is raised even though that does not prevent the function from
+        # working
+        if not exists(join(bids_out, subj)):
+            mkdir(join(bids_out, subj))
+        if not exists(join(bids_out, subj, 'ses-M00')):
+            mkdir(join(bids_out, subj, 'ses-M00'))
+        for el in to_copy:
+            path_el = join(bids_in, subj, el)
+            if not exists(join(bids_out, subj, 'ses-M00', el)):
+                # If the element to copy is a folder...
+                if isdir(path_el):
+                    # Copytree is used with a 'custom' copy function,
+                    # to give a correct filemename to the files inside
+                    # the copied folders
+                    copytree(path_el,
+                             join(bids_out, subj, 'ses-M00',
+                                  basename(path_el)),
+                             copy_function=copy2_add_ses)
+                # If the element to copy is a file...
+                elif isfile(path_el):
+                    # Modify the filename with _add_session_to_filename function
+                    new_filename_wo_ses = _add_session_to_filename(el)
+                    copy2(path_el,
+                          join(bids_out, subj, 'ses-M00',
+                               new_filename_wo_ses))
+    # Second part of the algorithm: deal with subjects that do not
+    # have the problem. We only xopy the content of the folder, and no
+    # filename needs to be changed
+    for su in long_subjects:
+        # Do not copy hidden files
+        to_copy = [f for f in listdir(join(bids_in, su))
+                   if not f.startswith('.')]
+        if not exists(join(bids_out, su)):
+            mkdir(join(bids_out, su))
+        for el in to_copy:
+            path_el = join(bids_in, su, el)
+            if not exists(join(bids_out, su, el)):
+                # 2 possible cases: element to pcopy is a folder or a
+                # file
+                if isdir(path_el):
+                    copytree(path_el,
+                             join(bids_out, su, basename(path_el)),
+                             copy_function=copy2)
+                elif isfile(path_el):
+                    copy2(path_el,
+                          join(bids_out, su))
+
+
+def _write_centered_header(img, input_image, output_image, affine):
+    """
+    Write a NIfTI image whose only change is its affine, without decoding its voxels.
+
+    The new header is written, then the raw voxel data of input_image is copied to output_image. Only single file
+    NIfTI-1 images stored with a canonical (RAS+) orientation can be handled this way.
+
+    Args:
+        img: image loaded from input_image with nibabel
+        input_image: path to the input image
+        output_image: path to the output image (may be input_image)
+        affine: new affine of the image
+
+    Returns:
+        True if the image was written, False if the image cannot be handled without decoding its voxels
+    """
+    import nibabel as nib
+    import numpy as np
+    import os
+    from nibabel.openers import Opener
+    from os.path import basename, dirname, join
 
-            for ses_path in sess_list:
-                session_name = ses_path.split(os.sep)[-1]
-                subjs_sess_tsv.write(subj_id + '\t' + session_name + '\n')
+    if type(img) is not nib.Nifti1Image or not nib.is_proxy(img.dataobj) or nib.as_closest_canonical(img) is not img:
+        return False
+
+    # Same header as the one written by nib.save(nib.Nifti1Image(data, affine, header)), except for the scaling of
+    # the data which is kept as is
+    new_img = nib.Nifti1Image(img.dataobj, affine=affine, header=img.header)
+    new_img.update_header()
+    header = new_img.header
+    header.set_slope_inter(img.dataobj.slope, img.dataobj.inter)
 
-    subjs_sess_tsv.close()
+    n_bytes = int(np.prod(img.dataobj.shape)) * img.dataobj.dtype.itemsize
+    # The image is written next to output_image first so that input_image can be output_image
+    tmp_image = join(dirname(output_image), '.tmp_' + basename(output_image))
+    try:
+        with Opener(input_image, 'rb') as input_file, Opener(tmp_image, 'wb') as output_file:
+            header.write_to(output_file)
+            output_file.write(b'\x00' * (header.get_data_offset() - output_file.tell()))
+            input_file.seek(img.dataobj.offset)
+            while n_bytes > 0:
+                chunk = input_file.read(min(n_bytes, 2 ** 24))
+                if not chunk:
+                    raise IOError('File ' + input_image + ' is truncated')
+                output_file.write(chunk)
+                n_bytes -= len(chunk)
+        os.replace(tmp_image, output_image)
+    finally:
+        if os.path.isfile(tmp_image):
+            os.remove(tmp_image)
+    return True
 
 
 def center_nifti_origin(input_image, output_image):
@@ -541,6 +883,8 @@ def center_nifti_origin(input_image, output_image):
 
     Put the origin of the coordinate system at the center of the image
 
+    When the image is already in canonical orientation, only its header is rewritten (the voxels are not decoded).
+
     Args:
         input_image: path to the input image
         output_image: path to the output image (where the result will be stored)
@@ -576,13 +920,20 @@ def center_nifti_origin(input_image, output_image):
             for i in range(1, 4):
                 qform[i - 1, i - 1] = hd['pixdim'][i]
                 qform[i - 1, 3] = -1.0 * hd['pixdim'][i] * hd['dim'][i] / 2.0
-            new_img = nib.Nifti1Image(canonical_img.get_data(caching='unchanged'), affine=qform, header=hd)
 
-            # Without deleting already-existing file, nib.save causes a severe bug on Linux system
-            if isfile(output_image):
-                os.remove(output_image)
+            try:
+                header_only = _write_centered_header(img, input_image, output_image, qform)
+            except Exception:
+                header_only = False
 
-            nib.save(new_img, output_image)
+            if not header_only:
+                new_img = nib.Nifti1Image(canonical_img.get_data(caching='unchanged'), affine=qform, header=hd)
+
+                # Without deleting already-existing file, nib.save causes a severe bug on Linux system
+                if isfile(output_image):
+                    os.remove(output_image)
+
+                nib.save(new_img, output_image)
             if not isfile(output_image):
                 error_str = Fore.RED + '[Error] NIfTI file created but Clinica could not save it to ' \
                             + output_image + '. Please check that the output folder has the correct permissions.' \
@@ -594,17 +945,51 @@ def center_nifti_origin(input_image, output_image):
     return output_image, error_str
 
 
-def center_all_nifti(bids_dir, output_dir, modality, center_all_files=False):
+def _center_nifti_file(args):
+    """
+    Center (if needed) a NIfTI image of center_all_nifti.
+
+    Args:
+        args: tuple (input_image, output_image, center_all_files)
+
+    Returns:
+        (centered, error): centered is True if the image was centered (else it was hardlinked or copied),
+        error is the error message of the centering (None if no error)
+    """
+    import os
+    from shutil import copy2
+
+    input_image, output_image, center_all_files = args
+    if center_all_files or not is_centered(input_image):
+        print('Handling ' + output_image)
+        if os.path.lexists(output_image):
+            os.remove(output_image)
+        _, error = center_nifti_origin(input_image, output_image)
+        return True, error
+
+    if not os.path.lexists(output_image):
+        try:
+            os.link(input_image, output_image)
+        except OSError:
+            copy2(input_image, output_image)
+    return False, None
+
+
+def center_all_nifti(bids_dir, output_dir, modality, center_all_files=False, n_procs=None):
     """
     Center all the NIfTI images of the input BIDS folder into the empty output_dir specified in argument.
     All the files from bids_dir are copied into output_dir, then all the NIfTI images we can found are replaced by their
     centered version if their center if off the origin by more than 50 mm.
 
+    Files that are not centered are hardlinked into output_dir when possible (copied otherwise), and the NIfTI images
+    are checked and centered in parallel.
+
     Args:
         bids_dir: (str) path to bids directory
         output_dir: (str) path to EMPTY output directory
         modality: (list of str) modalities to convert
         center_all_files: (bool) center only files that may cause problem for SPM if false. If true, center all NIfTI
+        n_procs: (int) number of processes checking and centering the images (number of available CPUs if None)
 
     Returns:
         List of the centered files
@@ -612,11 +997,11 @@ def center_all_nifti(bids_dir, output_dir, modality, center_all_files=False):
     from colorama import Fore
     from clinica.utils.inputs import check_bids_folder
     from clinica.utils.exceptions import ClinicaBIDSError
-    from os.path import join, basename
-    from glob import glob
-    from os import listdir
-    from os.path import isdir, isfile
-    from shutil import copy2, copytree
+    from multiprocessing import Pool
+    from clinica.utils.resources import get_available_cpus
+    import os
+    from os.path import join, relpath
+    from shutil import copy2
 
     # output and input must be different, so that we do not mess with user's data
     if bids_dir == output_dir:
@@ -627,32 +1012,47 @@ def center_all_nifti(bids_dir, output_dir, modality, center_all_files=False):
     # check that input is a BIDS dir
     check_bids_folder(bids_dir)
 
-    for f in listdir(bids_dir):
-        if isdir(join(bids_dir, f)) and not isdir(join(output_dir, f)):
-            copytree(join(bids_dir, f), join(output_dir, f))
-        elif isfile(join(bids_dir, f)) and not isfile(join(output_dir, f)):
-            copy2(join(bids_dir, f), output_dir)
-
-    pattern = join(output_dir, '**/*.nii*')
-    nifti_files = glob(pattern, recursive=True)
-
-    # Now filter this list by elements in modality list
+    # Files of the top-level entries of bids_dir that are not already in output_dir (as copytree/copy2 did)
+    files_to_copy = []
+    for f in os.listdir(bids_dir):
+        if os.path.isdir(join(bids_dir, f)) and not os.path.isdir(join(output_dir, f)):
+            for root, dirs, files in os.walk(join(bids_dir, f), followlinks=True):
+                os.makedirs(join(output_dir, relpath(root, bids_dir)), exist_ok=True)
+                files_to_copy.extend(relpath(join(root, name), bids_dir) for name in files)
+        elif os.path.isfile(join(bids_dir, f)) and not os.path.isfile(join(output_dir, f)):
+            files_to_copy.append(f)
+
+    # Filter the NIfTI files by elements in modality list
     #   For each file:
     #       if any modality name (lowercase) is found in the basename of the file:
     #           keep the file
-    nifti_files_filtered = [f for f in nifti_files
-                            if any(elem.lower() in basename(f).lower() for elem in modality)]
-
-    # Remove those who are centered
-    if not center_all_files:
-        nifti_files_filtered = [file for file in nifti_files_filtered if not is_centered(file)]
-
-    all_errors = []
-    for f in nifti_files_filtered:
-        print('Handling ' + f)
-        _, current_error = center_nifti_origin(f, f)
-        if current_error:
-            all_errors.append(current_error)
+    # (hidden files and folders are ignored, as with glob(join(output_dir, '**/*.nii*'), recursive=True))
+    nifti_files = [f for f in files_to_copy
+                   if '.nii' in os.path.basename(f)
+                   and not any(name.startswith('.') for name in f.split(os.sep))
+                   and any(elem.lower() in os.path.basename(f).lower() for elem in modality)]
+    nifti_set = set(nifti_files)
+    for f in files_to_copy:
+        if f not in nifti_set:
+            try:
+                os.link(join(bids_dir, f), join(output_dir, f))
+            except OSError:
+                copy2(join(bids_dir, f), join(output_dir, f))
+
+    tasks = [(join(bids_dir, f), join(output_dir, f), center_all_files) for f in nifti_files]
+    n_procs = min(n_procs or get_available_cpus(), max(len(tasks), 1))
+    if n_procs > 1:
+        pool = Pool(n_procs)
+        try:
+            results = pool.map(_center_nifti_file, tasks)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [_center_nifti_file(task) for task in tasks]
+
+    nifti_files_filtered = [join(output_dir, f) for f, (centered, _) in zip(nifti_files, results) if centered]
+    all_errors = [error for _, error in results if error]
     if len(all_errors) > 0:
         final_error_msg = Fore.RED + '[Error] Clinica encoutered ' + str(len(all_errors)) \
                           + ' error(s) while trying to center all NIfTI images.\n'
@@ -712,7 +1112,8 @@ def write_list_of_files(file_list, output_file):
 def check_relative_volume_location_in_world_coordinate_system(label_1, nifti_list1,
                                                               label_2, nifti_list2,
                                                               bids_dir,
-                                                              modality):
+                                                              modality,
+                                                              cache_dir=None):
     """
     Check if the NIfTI file list nifti_list1 and nifti_list2 provided in argument are not too far apart (otherwise coreg
     in SPM may fail. Norm between center of volumes of 2 files must be less than 80 mm.
@@ -725,6 +1126,7 @@ def check_relative_volume_location_in_world_coordinate_system(label_1, nifti_lis
         bids_dir: bids directory (used in potential warning message)
         modality: string that must be used in argument of: clinica iotools bids --modality MODALITY (used in potential
                 warning message)
+        cache_dir: folder where the centers of the volumes are cached (see get_world_coordinates_of_centers)
     Returns:
         Nothing
     """
@@ -734,8 +1136,8 @@ def check_relative_volume_location_in_world_coordinate_system(label_1, nifti_lis
     from clinica.utils.stream import cprint
     import sys
 
-    center_coordinate_1 = [get_world_coordinate_of_center(file) for file in nifti_list1]
-    center_coordinate_2 = [get_world_coordinate_of_center(file) for file in nifti_list2]
+    center_coordinate_1 = get_world_coordinates_of_centers(nifti_list1, cache_dir)
+    center_coordinate_2 = get_world_coordinates_of_centers(nifti_list2, cache_dir)
 
     l2_norm = [np.linalg.norm(center_1 - center_2) for center_1, center_2 in zip(center_coordinate_1, center_coordinate_2)]
     pairs_with_problems = [i for i, norm in enumerate(l2_norm) if norm > 80]
@@ -795,7 +1197,7 @@ def check_relative_volume_location_in_world_coordinate_system(label_1, nifti_lis
             sys.exit(0)
 
 
-def check_volume_location_in_world_coordinate_system(nifti_list, bids_dir, modality='t1w'):
+def check_volume_location_in_world_coordinate_system(nifti_list, bids_dir, modality='t1w', cache_dir=None):
     """
     Check if the NIfTI file list nifti_list provided in argument are aproximately centered around the origin of the
     world coordinates. (Problem may arise with SPM segmentation
@@ -809,6 +1211,7 @@ def check_volume_location_in_world_coordinate_system(nifti_list, bids_dir, modal
         bids_dir: (str) path to bids directory associated with this check (in order to propose directly the good
             command line for center-nifti tool)
         modality: (str) to propose directly the good command line option
+        cache_dir: (str) folder where the centers of the volumes are cached (see get_world_coordinates_of_centers)
 
     Returns:
         Nothing
@@ -819,9 +1222,11 @@ def check_volume_location_in_world_coordinate_system(nifti_list, bids_dir, modal
     import numpy as np
     import sys
 
-    list_non_centered_files = [file for file in nifti_list if not is_centered(file)]
+    all_centers = get_world_coordinates_of_centers(nifti_list, cache_dir)
+    non_centered = [not is_center_close_to_origin(center) for center in all_centers]
+    list_non_centered_files = [file for file, is_off in zip(nifti_list, non_centered) if is_off]
     if len(list_non_centered_files) > 0:
-        centers = [get_world_coordinate_of_center(file) for file in list_non_centered_files]
+        centers = [center for center, is_off in zip(all_centers, non_centered) if is_off]
         l2_norm = [np.linalg.norm(center, ord=2) for center in centers]
 
         # File column width : 3 spaces more than the longest string to display
@@ -903,16 +1308,26 @@ def is_centered(nii_volume, threshold_l2=50):
         True or False
 
     """
-    import numpy as np
-    from os.path import basename
-
     center = get_world_coordinate_of_center(nii_volume)
+    return is_center_close_to_origin(center, threshold_l2)
+
+
+def is_center_close_to_origin(center, threshold_l2=50):
+    """
+    Tells if the center of a volume (see get_world_coordinate_of_center) is close to the origin (see is_centered).
+
+    Args:
+        center: world coordinates of the center of the volume (np.nan if unknown)
+        threshold_l2: maximum distance between origin of the world coordinate system and the center of the volume
+
+    Returns:
+        True or False
+    """
+    import numpy as np
 
     # Compare to the threshold and retun boolean
     # if center is a np.nan, comparison will be False, and False will be returned
     distance_from_origin = np.linalg.norm(center, ord=2)
-    # if not np.isnan(distance_from_origin):
-    #     print('\t' + basename(nii_volume) + ' has its center at {0:.2f} mm of the origin.'.format(distance_from_origin))
     if distance_from_origin < threshold_l2:
         return True
     else:
@@ -920,6 +1335,66 @@ def is_centered(nii_volume, threshold_l2=50):
         return False
 
 
+def get_world_coordinates_of_centers(nii_volumes, cache_dir=None, n_threads=None):
+    """
+    Extract the world coordinates of the centers of a list of images (see get_world_coordinate_of_center).
+
+    Only the headers of the images are read, by a pool of threads. If cache_dir is given, the centers are cached in
+    <cache_dir>/world_coordinates_of_centers.json, indexed by the path, size and modification time of the images.
+
+    Args:
+        nii_volumes: list of paths to nii volumes
+        cache_dir: folder where the centers are cached (no cache if None)
+        n_threads: number of threads reading the headers (number of available CPUs if None)
+
+    Returns:
+        List of the world coordinates of the centers (np.nan for the images that could not be read)
+    """
+    import json
+    import os
+    import tempfile
+    import numpy as np
+
+    def file_key(nii_volume):
+        file_stat = os.stat(nii_volume)
+        return '%s:%d:%d' % (os.path.abspath(nii_volume), file_stat.st_size, file_stat.st_mtime_ns)
+
+    cache, cache_file = {}, None
+    if cache_dir is not None:
+        cache_file = os.path.join(cache_dir, 'world_coordinates_of_centers.json')
+        if os.path.isfile(cache_file):
+            try:
+                with open(cache_file, 'r') as f:
+                    cache = json.load(f)
+            except (OSError, ValueError):
+                cache = {}
+
+    keys = [file_key(nii_volume) for nii_volume in nii_volumes]
+    to_read = [nii_volume for nii_volume, key in zip(nii_volumes, keys) if key not in cache]
+    to_read_keys = [key for key in keys if key not in cache]
+    read_centers = _thread_map(get_world_coordinate_of_center, to_read, n_threads)
+
+    centers = dict(zip(to_read_keys, read_centers))
+    if cache_file is not None and len(to_read) > 0:
+        # Images that could not be read are not cached
+        cache.update({key: [float(x) for x in center] for key, center in centers.items()
+                      if np.ndim(center) == 1})
+        # Pipelines sharing the cache folder write their own temporary file. The cache is only an optimization: it is
+        # left as it is if it cannot be written
+        temporary_file = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            file_descriptor, temporary_file = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+            with os.fdopen(file_descriptor, 'w') as f:
+                json.dump(cache, f)
+            os.replace(temporary_file, cache_file)
+        except OSError:
+            if temporary_file is not None and os.path.exists(temporary_file):
+                os.remove(temporary_file)
+
+    return [centers[key] if key in centers else np.array(cache[key]) for key in keys]
+
+
 def get_world_coordinate_of_center(nii_volume):
     """
     Extract the world coordinates of the center of the image. Based on methods described
@@ -140,6 +140,9 @@ class CmdParserCenterNifti(ce.CmdParser):
                                 action='store_true',
                                 dest='center_all_files',
                                 default=False)
+        self._args.add_argument("-np", "--n_procs",
+                                metavar='N', type=int,
+                                help='Number of cores used to check and center the NIfTI images in parallel.')
 
     def run_command(self, args):
         from colorama import Fore
@@ -184,7 +187,8 @@ class CmdParserCenterNifti(ce.CmdParser):
         centered_files = center_all_nifti(abspath(args.bids_directory),
                                           abspath(args.output_bids_directory),
                                           split_modality,
-                                          center_all_files=args.center_all_files)
+                                          center_all_files=args.center_all_files,
+                                          n_procs=args.n_procs)
 
         # Write list of created files
         timestamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(time.time()))
@@ -137,39 +137,7 @@ def pet_volume_pipeline(caps_dir, df, **kwargs):
             row_summary_df.iloc[0] = row_summary
             summary_df = pd.concat([summary_df, row_summary_df])
 
-    # Initial empty DataFrame for the pipeline
-    number_sessions = len(df)
-    pipeline_df = pd.DataFrame(index=np.arange(number_sessions), columns=col_list)
-
-    for i in range(number_sessions):
-        # Reading the reference (subject + session)
-        participant_id = df['participant_id'][i]
-        session_id = df['session_id'][i]
-
-        ses_path = caps_dir + os.sep + participant_id + os.sep + session_id
-        mod_path = ses_path + os.sep + pet_path
-        ses_df = pd.DataFrame(index=np.arange(1), columns=col_list)
-
-        if os.path.exists(mod_path):
-            # Looking for groups
-            for group in group_list:
-                group_path = mod_path + os.sep + group
-                if os.path.exists(group_path):
-                    # Looking for atlases
-                    atlas_list = summary_df[summary_df.group_id == group]['atlas_id'].to_numpy()
-                    for atlas in atlas_list:
-                        atlas_path = group_path + os.sep + 'atlas_statistics' + os.sep
-                        atlas_path = atlas_path + participant_id + '_' + session_id + '_' + atlas + '_statistics.tsv'
-                        if os.path.exists(atlas_path):
-                            n_regions = summary_df[(summary_df.group_id == group) &
-                                                   (summary_df.atlas_id == atlas)]['regions_number'].values[0]
-                            atlas_df = pd.read_csv(atlas_path, sep='\t')
-                            label_list = [group + '_' + atlas + '_ROI-' + str(x) for x in
-                                          range(n_regions)]
-                            ses_df.loc[:, label_list] = atlas_df['mean_scalar'].to_numpy()
-
-        pipeline_df.iloc[i] = ses_df.iloc[0]
-
+    pipeline_df = merge_atlas_statistics(caps_dir, pet_path, df, group_list, summary_df, col_list)
     final_df = pd.concat([df, pipeline_df], axis=1)
 
     return final_df, summary_df
@@ -277,44 +245,57 @@ def t1_volume_pipeline(caps_dir, df, **kwargs):
             row_summary_df.iloc[0] = row_summary
             summary_df = pd.concat([summary_df, row_summary_df])
 
-    # Initial empty DataFrame for the pipeline
-    number_sessions = len(df)
-    pipeline_df = pd.DataFrame(index=np.arange(number_sessions), columns=col_list)
-
-    for i in range(number_sessions):
-        # Reading the reference (subject + session)
-        participant_id = df['participant_id'][i]
-        session_id = df['session_id'][i]
-
-        ses_path = caps_dir + os.sep + participant_id + os.sep + session_id
-        mod_path = ses_path + os.sep + t1_spm_path
-        ses_df = pd.DataFrame(index=np.arange(1), columns=col_list)
-
-        if os.path.exists(mod_path):
-            # Looking for groups
-            for group in group_list:
-                group_path = mod_path + os.sep + group
-                if os.path.exists(group_path):
-                    # Looking for atlases
-                    atlas_list = summary_df[summary_df.group_id == group]['atlas_id'].to_numpy()
-                    for atlas in atlas_list:
-                        atlas_path = group_path + os.sep + 'atlas_statistics' + os.sep
-                        atlas_path = atlas_path + participant_id + '_' + session_id + '_' + atlas + '_statistics.tsv'
-                        if os.path.exists(atlas_path):
-                            n_regions = summary_df[(summary_df.group_id == group) &
-                                                   (summary_df.atlas_id == atlas)]['regions_number'].values[0]
-                            atlas_df = pd.read_csv(atlas_path, sep='\t')
-                            label_list = [group + '_' + atlas + '_ROI-' + str(x) for x in
-                                          range(n_regions)]
-                            ses_df.loc[:, label_list] = atlas_df['mean_scalar'].to_numpy()
-
-        pipeline_df.iloc[i] = ses_df.iloc[0]
-
+    pipeline_df = merge_atlas_statistics(caps_dir, t1_spm_path, df, group_list, summary_df, col_list)
     final_df = pd.concat([df, pipeline_df], axis=1)
 
     return final_df, summary_df
 
 
+def merge_atlas_statistics(caps_dir, mod_path, df, group_list, summary_df, col_list):
+    """
+    This method gathers the atlas statistics of a pipeline for all the sessions of the merged file.
+
+    The statistics files of each (group, atlas) are read in parallel and their mean values are put in the rows of
+    the corresponding (participant_id, session_id).
+
+    Args:
+        caps_dir: the path to the subjects folder of the CAPS directory
+        mod_path: path of the pipeline outputs inside a session folder (e.g. pet/preprocessing)
+        df: the DataFrame containing the BIDS information
+        group_list: list of the groups (group-<label>) of the pipeline
+        summary_df: DataFrame describing the atlases of each group
+        col_list: list of the columns of the pipeline
+
+    Returns:
+        pipeline_df: a DataFrame (one row per session of df) containing the information of the pipeline
+    """
+    from .data_handling import read_tsv_files
+
+    number_sessions = len(df)
+    pipeline_values = np.full((number_sessions, len(col_list)), np.nan, dtype=object)
+    col_index = {col: i for i, col in enumerate(col_list)}
+    participant_ids = df['participant_id'].to_numpy()
+    session_ids = df['session_id'].to_numpy()
+
+    for group in group_list:
+        group_summary_df = summary_df[summary_df.group_id == group]
+        for atlas, n_regions in zip(group_summary_df['atlas_id'].to_numpy(),
+                                    group_summary_df['regions_number'].to_numpy()):
+            label_index = [col_index[group + '_' + atlas + '_ROI-' + str(x)] for x in range(n_regions)]
+            atlas_paths = [
+                caps_dir + os.sep + participant_id + os.sep + session_id + os.sep + mod_path + os.sep + group
+                + os.sep + 'atlas_statistics' + os.sep + participant_id + '_' + session_id + '_' + atlas
+                + '_statistics.tsv'
+                for participant_id, session_id in zip(participant_ids, session_ids)
+            ]
+            atlas_dfs = read_tsv_files(atlas_paths, missing_ok=True)
+            for i, atlas_df in enumerate(atlas_dfs):
+                if atlas_df is not None:
+                    pipeline_values[i, label_index] = atlas_df['mean_scalar'].to_numpy()
+
+    return pd.DataFrame(pipeline_values, index=np.arange(number_sessions), columns=col_list)
+
+
 class InitException(Exception):
     def __init__(self, name):
         self.name = name
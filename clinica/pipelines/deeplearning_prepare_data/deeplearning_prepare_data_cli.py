@@ -41,6 +41,17 @@ class DeepLearningPrepareDataCLI(ce.CmdParser):
                               cropped image generated by t1-linear.''',
                               default=False, action="store_true"
                               )
+        optional.add_argument('-of', '--output_format',
+                              help='''Format of the extracted patches or slices. Three options:
+                              'pt' to save each patch or slice in a PyTorch tensor file,
+                              'shard' to save all the patches or slices of an image in a
+                              single memory-mappable .npy array, with a TSV index giving
+                              the offset of each patch or slice,
+                              'virtual' to only save the image tensor and a JSON descriptor
+                              of the patches or slices, which are then computed on the fly
+                              by DeepLearningViewsDataset (default: --output_format pt).''',
+                              choices=['pt', 'shard', 'virtual'], default='pt'
+                              )
 
         optional_patch = self._args.add_argument_group(
             "%sPipeline options if you chose ‘patch’ extraction%s" % (Fore.BLUE, Fore.RESET)
@@ -95,6 +106,7 @@ class DeepLearningPrepareDataCLI(ce.CmdParser):
             'slice_direction': args.slice_direction,
             'slice_mode': args.slice_mode,
             'use_uncropped_image': args.use_uncropped_image,
+            'output_format': args.output_format,
         }
 
         pipeline = DeepLearningPrepareData(
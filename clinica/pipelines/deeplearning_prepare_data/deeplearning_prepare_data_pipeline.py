@@ -91,6 +91,9 @@ class DeepLearningPrepareData(cpe.Pipeline):
             self.patch_size = 50
             self.stride_size = 50
 
+        # Slices and patches are saved one per file, in a single shard per image or only described (virtual)
+        self.output_format = self.parameters.get('output_format', 'pt')
+
         # The reading node
         # -------------------------
         read_node = npe.Node(name="ReadingFiles",
@@ -181,74 +184,54 @@ class DeepLearningPrepareData(cpe.Pipeline):
 
         import nipype.interfaces.utility as nutil
         import nipype.pipeline.engine as npe
-        from .deeplearning_prepare_data_utils import (extract_slices,
-                                                      extract_patches,
-                                                      save_as_pt)
+        from .deeplearning_prepare_data_utils import prepare_image_views
         # The processing nodes
 
-        # Node to save MRI in nii.gz format into pytorch .pt format
-        # ----------------------
-        save_as_pt = npe.MapNode(
-               name='save_as_pt',
-               iterfield=['input_img'],
-               interface=nutil.Function(
-                   function=save_as_pt,
-                   input_names=['input_img'],
-                   output_names=['output_file']
-                   )
-               )
-
-        # Extract slices node (options: 3 directions, mode)
+        # Node converting the MRI in nii.gz format into pytorch .pt format and
+        # extracting its slices or patches (options: 3 directions, mode, patch
+        # size and stride size), without saving and loading the tensor in between
         # ----------------------
-        extract_slices = npe.MapNode(
-                name='extract_slices',
-                iterfield=['input_tensor'],
+        prepare_views = npe.MapNode(
+                name='prepare_image_views',
+                iterfield=['input_img'],
                 interface=nutil.Function(
-                    function=extract_slices,
+                    function=prepare_image_views,
                     input_names=[
-                        'input_tensor', 'slice_direction',
-                        'slice_mode'
+                        'input_img', 'extract_method',
+                        'slice_direction', 'slice_mode',
+                        'patch_size', 'stride_size',
+                        'output_format'
                         ],
-                    output_names=['output_file_rgb', 'output_file_original']
-                    )
-                )
-
-        extract_slices.inputs.slice_direction = self.slice_direction
-        extract_slices.inputs.slice_mode = self.slice_mode
-
-        # Extract patches node (options, patch size and stride size)
-        # ----------------------
-        extract_patches = npe.MapNode(
-                name='extract_patches',
-                iterfield=['input_tensor'],
-                interface=nutil.Function(
-                    function=extract_patches,
-                    input_names=['input_tensor', 'patch_size', 'stride_size'],
-                    output_names=['output_patch']
+                    output_names=[
+                        'output_file', 'output_file_rgb',
+                        'output_file_original', 'output_patch'
+                        ]
                     )
                 )
 
-        extract_patches.inputs.patch_size = self.patch_size
-        extract_patches.inputs.stride_size = self.stride_size
+        prepare_views.inputs.extract_method = self.parameters.get('extract_method')
+        prepare_views.inputs.slice_direction = self.slice_direction
+        prepare_views.inputs.slice_mode = self.slice_mode
+        prepare_views.inputs.patch_size = self.patch_size
+        prepare_views.inputs.stride_size = self.stride_size
+        prepare_views.inputs.output_format = self.output_format
 
         # Connections
         # ----------------------
         self.connect([
-            (self.input_node, save_as_pt, [('input_nifti', 'input_img')]),
+            (self.input_node, prepare_views, [('input_nifti', 'input_img')]),
             ])
 
         if self.parameters.get('extract_method') == 'slice':
             self.connect([
-                (save_as_pt, extract_slices, [('output_file', 'input_tensor')]),
-                (extract_slices, self.output_node, [('output_file_rgb', 'slices_rgb_T1')]),
-                (extract_slices, self.output_node, [('output_file_original', 'slices_original_T1')])
+                (prepare_views, self.output_node, [('output_file_rgb', 'slices_rgb_T1')]),
+                (prepare_views, self.output_node, [('output_file_original', 'slices_original_T1')])
                 ])
         elif self.parameters.get('extract_method') == 'patch':
             self.connect([
-                (save_as_pt, extract_patches, [('output_file', 'input_tensor')]),
-                (extract_patches, self.output_node, [('output_patch', 'patches_T1')])
+                (prepare_views, self.output_node, [('output_patch', 'patches_T1')])
                 ])
         else:
             self.connect([
-                (save_as_pt, self.output_node, [('output_file', 'output_pt_file')]),
+                (prepare_views, self.output_node, [('output_file', 'output_pt_file')]),
                 ])
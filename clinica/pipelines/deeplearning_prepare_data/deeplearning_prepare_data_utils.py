@@ -1,6 +1,6 @@
 # coding: utf8
 
-def extract_slices(input_tensor, slice_direction=0, slice_mode='single'):
+def extract_slices(input_tensor, slice_direction=0, slice_mode='single', output_format='pt'):
     """Extracts the slices from three directions
     
     This function extracts slices form the preprocesed nifti image.  The
@@ -14,23 +14,136 @@ def extract_slices(input_tensor, slice_direction=0, slice_mode='single'):
         input_tensor: tensor version of the nifti MRI.
         slice_direction: which axis direction that the slices were extracted
         slice_mode: 'single' or 'RGB'.
+        output_format: 'pt' to save one tensor per slice, 'shard' to save
+            all the slices in a single array (see save_as_shard) or 'virtual'
+            to only describe the slices (see save_view_descriptor).
 
     Returns:
         file: multiple tensors saved on the disk, suffixes corresponds to
-            indexes of the slices. Same location than input file.
+            indexes of the slices. Same location than input file. With the
+            'shard' format, the shard and its index. With the 'virtual'
+            format, the descriptor and the input tensor.
     """
     import torch
-    import os
+    from clinica.pipelines.deeplearning_prepare_data.deeplearning_prepare_data_utils import save_slices
+
+    image_tensor = torch.load(input_tensor)
+    return save_slices(image_tensor, input_tensor, slice_direction, slice_mode, output_format)
+
+
+def extract_patches(input_tensor, patch_size, stride_size, output_format='pt'):
+    """Extracts the patches
+    
+    This function extracts patches form the preprocesed nifti image. Patch size
+    if provieded as input and also the stride size. If stride size is smaller
+    than the patch size an overlap exist between consecutive patches. If stride
+    size is equal to path size there is no overlap. Otherwise, unprocessed
+    zones can exits.
+    
+    Args:
+        input_tensor: tensor version of the nifti MRI.
+        patch_size: size of a single patch.
+        stride_size: size of the stride leading to next patch.
+        output_format: 'pt' to save one tensor per patch, 'shard' to save
+            all the patches in a single array (see save_as_shard) or 'virtual'
+            to only describe the patches (see save_view_descriptor).
+
+    Returns:
+        file: multiple tensors saved on the disk, suffixes corresponds to
+            indexes of the patches. Same location than input file. With the
+            'shard' format, the shard and its index. With the 'virtual'
+            format, the descriptor and the input tensor.
+    """
+    import torch
+    from clinica.pipelines.deeplearning_prepare_data.deeplearning_prepare_data_utils import save_patches
 
     image_tensor = torch.load(input_tensor)
+    return save_patches(image_tensor, input_tensor, patch_size, stride_size, output_format)
+
+
+def prepare_image_views(input_img, extract_method='image', slice_direction=0, slice_mode='rgb',
+                        patch_size=50, stride_size=50, output_format='pt'):
+    """Converts a nifti image into a tensor and extracts its slices or patches
+
+    This function fuses save_as_pt and extract_slices / extract_patches: the
+    image is read once in float32 and the slices or patches are extracted from
+    the tensor in memory, without saving and loading it again.
+
+    Args:
+        input_img: nifti MRI.
+        extract_method: 'image', 'slice' or 'patch'.
+        slice_direction: see extract_slices.
+        slice_mode: see extract_slices.
+        patch_size: see extract_patches.
+        stride_size: see extract_patches.
+        output_format: see extract_slices and extract_patches.
+
+    Returns:
+        output_file (str): tensor version of the image (None when slices or
+            patches are extracted).
+        output_file_rgb, output_file_original (list of str): see extract_slices.
+        output_patch (list of str): see extract_patches.
+    """
+    import os
+    import torch
+    import nibabel as nib
+    from clinica.pipelines.deeplearning_prepare_data.deeplearning_prepare_data_utils import save_slices
+    from clinica.pipelines.deeplearning_prepare_data.deeplearning_prepare_data_utils import save_patches
+
+    image_array = nib.load(input_img).get_fdata(dtype='float32')
+    image_tensor = torch.from_numpy(image_array).unsqueeze(0)
+    output_file = os.path.join(os.getcwd(), os.path.basename(input_img).split('.nii.gz')[0] + '.pt')
+
+    # The image tensor is only saved when it is an output of the pipeline
+    if extract_method not in ['slice', 'patch'] or output_format == 'virtual':
+        torch.save(image_tensor, output_file)
+
+    output_file_rgb, output_file_original, output_patch = [], [], []
+    if extract_method == 'slice':
+        output_file_rgb, output_file_original = save_slices(image_tensor, output_file, slice_direction,
+                                                            slice_mode, output_format)
+    elif extract_method == 'patch':
+        output_patch = save_patches(image_tensor, output_file, patch_size, stride_size, output_format)
+
+    if extract_method in ['slice', 'patch']:
+        output_file = None
+    return output_file, output_file_rgb, output_file_original, output_patch
+
+
+def save_slices(image_tensor, input_tensor, slice_direction=0, slice_mode='single', output_format='pt'):
+    """Extracts and saves the slices of an image tensor (see extract_slices)
+
+    Args:
+        image_tensor: tensor of the image (1 * D * H * W).
+        input_tensor: tensor file of the image (used to name the outputs).
+        slice_direction: see extract_slices.
+        slice_mode: see extract_slices.
+        output_format: see extract_slices.
+
+    Returns:
+        output_file_rgb, output_file_original: see extract_slices.
+    """
+    import torch
+    import os
+    from clinica.pipelines.deeplearning_prepare_data.deeplearning_prepare_data_utils import get_slices
+    from clinica.pipelines.deeplearning_prepare_data.deeplearning_prepare_data_utils import save_as_shard
+    from clinica.pipelines.deeplearning_prepare_data.deeplearning_prepare_data_utils import save_view_descriptor
+
     # reshape the tensor, delete the first dimension for slice-level
     image_tensor = image_tensor.view(image_tensor.shape[1], image_tensor.shape[2], image_tensor.shape[3])
 
-    # sagital
+    # sagital (0), coronal (1) or axial (other)
+    if slice_direction == 0:
+        axis, axis_name = 0, 'sag'
+    elif slice_direction == 1:
+        axis, axis_name = 1, 'cor'
+    else:
+        axis, axis_name = 2, 'axi'
+
     # M and N correspond to the first and last slices (if need to remove)
     M = 0
     N = 0
-    slice_list_sag = range(M, image_tensor.shape[0] - N)  # delete the first M slices and last N slices
+    slice_list = range(M, image_tensor.shape[axis] - N)  # delete the first M slices and last N slices
 
     basedir = os.getcwd()
     input_tensor_filename = os.path.basename(input_tensor)
@@ -38,158 +151,127 @@ def extract_slices(input_tensor, slice_direction=0, slice_mode='single'):
     txt_idx = input_tensor_filename.rfind("_")
     it_filename_prefix = input_tensor_filename[0:txt_idx]
     it_filename_suffix = input_tensor_filename[txt_idx:]
-    
-    output_file_original = []
-    output_file_rgb = []
-    if slice_direction == 0:
-        for index_slice, index_slice_list in zip(slice_list_sag, range(len(slice_list_sag))):
-            # for i in slice_list:
-            # sagital
-            slice_select_sag = image_tensor[index_slice, :, :]
-
-            extracted_slice_original_sag = slice_select_sag.unsqueeze(0)  # shape should be 1 * W * L
-
-            # train for transfer learning, creating the fake RGB image.
-            slice_select_sag = (slice_select_sag - slice_select_sag.min()) / (slice_select_sag.max() - slice_select_sag.min())
-            extracted_slice_rgb_sag = torch.stack((slice_select_sag, slice_select_sag, slice_select_sag))  # shape should be 3 * W * L
-
-            # save into .pt format
-            if slice_mode == 'single':
-                output_file_original.append(
-                        os.path.join(
-                            basedir,
-                            it_filename_prefix
-                            + '_axis-sag_channel-single_slice-'
-                            + str(index_slice)
-                            + it_filename_suffix
-                            )
-                        )
-                torch.save(extracted_slice_original_sag.clone(), output_file_original[index_slice_list])
-            elif slice_mode == 'rgb':
-                output_file_rgb.append(
-                        os.path.join(
-                            basedir,
-                            it_filename_prefix
-                            + '_axis-sag_channel-rgb_slice-'
-                            + str(index_slice)
-                            + it_filename_suffix
-                            )
-                        )
-                torch.save(extracted_slice_rgb_sag.clone(), output_file_rgb[index_slice_list])
 
-    elif slice_direction == 1:
-        # cornal
-        slice_list_cor = range(M, image_tensor.shape[1] - N)  # delete the first M slices and last N slices
-        for index_slice, index_slice_list in zip(slice_list_cor, range(len(slice_list_cor))):
-            # for i in slice_list:
-            # sagital
-            slice_select_cor = image_tensor[:, index_slice, :]
-
-            extracted_slice_original_cor = slice_select_cor.unsqueeze(0)  # shape should be 1 * W * L
-
-            # train for transfer learning, creating the fake RGB image.
-            slice_select_cor = (slice_select_cor - slice_select_cor.min()) / (slice_select_cor.max() - slice_select_cor.min())
-            extracted_slice_rgb_cor = torch.stack((slice_select_cor, slice_select_cor, slice_select_cor))  # shape should be 3 * W * L
-
-            # save into .pt format
-            if slice_mode == 'single':
-                output_file_original.append(
-                        os.path.join(
-                            basedir,
-                            it_filename_prefix
-                            + '_axis-cor_channel-single_slice-'
-                            + str(index_slice)
-                            + it_filename_suffix
-                            )
-                        )
-                torch.save(extracted_slice_original_cor.clone(), output_file_original[index_slice_list])
-            elif slice_mode == 'rgb':
-                output_file_rgb.append(
+    output_files = []
+    if output_format == 'virtual':
+        output_files = save_view_descriptor(
+                input_tensor,
+                os.path.join(
+                    basedir,
+                    it_filename_prefix
+                    + '_axis-' + axis_name
+                    + '_channel-' + slice_mode
+                    + it_filename_suffix
+                    ),
+                {'extract_method': 'slice',
+                 'slice_direction': slice_direction,
+                 'axis': axis,
+                 'slice_mode': slice_mode,
+                 'slice_ids': list(slice_list)},
+                (1,) + tuple(image_tensor.shape)
+                )
+    elif slice_mode in ['single', 'rgb']:
+        extracted_slices = get_slices(image_tensor, axis, slice_list, slice_mode)
+        if output_format == 'shard':
+            output_files = save_as_shard(
+                    extracted_slices,
                     os.path.join(
                         basedir,
                         it_filename_prefix
-                        + '_axis-cor_channel-rgb_slice-'
-                        + str(index_slice)
+                        + '_axis-' + axis_name
+                        + '_channel-' + slice_mode
                         + it_filename_suffix
-                        )
+                        ),
+                    'slice_id',
+                    list(slice_list),
+                    axis=axis_name
                     )
-                torch.save(extracted_slice_rgb_cor.clone(), output_file_rgb[index_slice_list])
-
-    else:
-
-        # axial
-        slice_list_axi = range(M, image_tensor.shape[2] - N)  # delete the first M slices and last N slices
-        for index_slice, index_slice_list in zip(slice_list_axi, range(len(slice_list_axi))):
-            # for i in slice_list:
-            # sagital
-            slice_select_axi = image_tensor[:, :, index_slice]
-
-            extracted_slice_original_axi = slice_select_axi.unsqueeze(0)  # shape should be 1 * W * L
-
-            # train for transfer learning, creating the fake RGB image.
-            slice_select_axi = (slice_select_axi - slice_select_axi.min()) / (slice_select_axi.max() - slice_select_axi.min())
-            extracted_slice_rgb_axi = torch.stack((slice_select_axi, slice_select_axi, slice_select_axi))  # shape should be 3 * W * L
-
-            # save into .pt format
-            if slice_mode == 'single':
-                output_file_original.append(
+        else:
+            for index_slice, extracted_slice in zip(slice_list, extracted_slices):
+                # save into .pt format
+                output_files.append(
                         os.path.join(
                             basedir,
                             it_filename_prefix
-                            + '_axis-axi_channel-single_slice-'
-                            + str(index_slice)
+                            + '_axis-' + axis_name
+                            + '_channel-' + slice_mode
+                            + '_slice-' + str(index_slice)
                             + it_filename_suffix
                             )
                         )
-                torch.save(extracted_slice_original_axi.clone(), output_file_original[index_slice_list])
-            elif slice_mode == 'rgb':
-                output_file_rgb.append(
-                        os.path.join(
-                            basedir,
-                            it_filename_prefix
-                            + '_axis-axi_channel-rgb_slice-'
-                            + str(index_slice)
-                            + it_filename_suffix
-                            )
-                        )
-                torch.save(extracted_slice_rgb_axi.clone(), output_file_rgb[index_slice_list])
+                torch.save(extracted_slice.clone(memory_format=torch.contiguous_format), output_files[-1])
 
-    return output_file_rgb, output_file_original
+    if slice_mode == 'rgb':
+        return output_files, []
+    return [], output_files
 
 
-def extract_patches(input_tensor, patch_size, stride_size):
-    """Extracts the patches
-    
-    This function extracts patches form the preprocesed nifti image. Patch size
-    if provieded as input and also the stride size. If stride size is smaller
-    than the patch size an overlap exist between consecutive patches. If stride
-    size is equal to path size there is no overlap. Otherwise, unprocessed
-    zones can exits.
-    
+def save_patches(image_tensor, input_tensor, patch_size, stride_size, output_format='pt'):
+    """Extracts and saves the patches of an image tensor (see extract_patches)
+
     Args:
-        input_tensor: tensor version of the nifti MRI.
-        patch_size: size of a single patch.
-        stride_size: size of the stride leading to next patch.
+        image_tensor: tensor of the image (1 * D * H * W).
+        input_tensor: tensor file of the image (used to name the outputs).
+        patch_size: see extract_patches.
+        stride_size: see extract_patches.
+        output_format: see extract_patches.
 
     Returns:
-        file: multiple tensors saved on the disk, suffixes corresponds to
-            indexes of the patches. Same location than input file.
+        output_patch: see extract_patches.
     """
     import torch
     import os
+    from clinica.pipelines.deeplearning_prepare_data.deeplearning_prepare_data_utils import save_as_shard
+    from clinica.pipelines.deeplearning_prepare_data.deeplearning_prepare_data_utils import save_view_descriptor
 
     basedir = os.getcwd()
-    image_tensor = torch.load(input_tensor)
+    input_tensor_filename = os.path.basename(input_tensor)
+    txt_idx = input_tensor_filename.rfind("_")
+    it_filename_prefix = input_tensor_filename[0:txt_idx]
+    it_filename_suffix = input_tensor_filename[txt_idx:]
+
+    if output_format == 'virtual':
+        n_patches = 1
+        for dim in image_tensor.shape[1:]:
+            n_patches *= max((dim - patch_size) // stride_size + 1, 0)
+        return save_view_descriptor(
+                input_tensor,
+                os.path.join(
+                    basedir,
+                    it_filename_prefix
+                    + '_patchsize-'
+                    + str(patch_size)
+                    + '_stride-'
+                    + str(stride_size)
+                    + it_filename_suffix
+                    ),
+                {'extract_method': 'patch',
+                 'patch_size': patch_size,
+                 'stride_size': stride_size,
+                 'patch_ids': list(range(n_patches))},
+                image_tensor.shape
+                )
 
     # use classifiers tensor.upfold to crop the patch.
     patches_tensor = image_tensor.unfold(1, patch_size, stride_size).unfold(2, patch_size, stride_size).unfold(3, patch_size, stride_size).contiguous()
     # the dimension of patch_tensor should be [1, patch_num1, patch_num2, patch_num3, patch_size1, patch_size2, patch_size3]
     patches_tensor = patches_tensor.view(-1, patch_size, patch_size, patch_size)
-    
-    input_tensor_filename = os.path.basename(input_tensor)
-    txt_idx = input_tensor_filename.rfind("_")
-    it_filename_prefix = input_tensor_filename[0:txt_idx]
-    it_filename_suffix = input_tensor_filename[txt_idx:]
+
+    if output_format == 'shard':
+        return save_as_shard(
+                patches_tensor.unsqueeze(1),  # add one dimension
+                os.path.join(
+                    basedir,
+                    it_filename_prefix
+                    + '_patchsize-'
+                    + str(patch_size)
+                    + '_stride-'
+                    + str(stride_size)
+                    + it_filename_suffix
+                    ),
+                'patch_id',
+                list(range(patches_tensor.shape[0]))
+                )
 
     output_patch = []
     for index_patch in range(patches_tensor.shape[0]):
@@ -213,6 +295,86 @@ def extract_patches(input_tensor, patch_size, stride_size):
     return output_patch
 
 
+def get_slices(image_tensor, axis, slice_list, slice_mode):
+    """Gets the slices of an image along an axis
+
+    Same slices as get_slice, the min-max normalization of the 'rgb' mode
+    being computed for all the slices at once.
+
+    Args:
+        image_tensor: 3D tensor of the image (without the channel dimension).
+        axis: axis of the slices (0: sagittal, 1: coronal, 2: axial).
+        slice_list: range of the indexes of the slices along the axis.
+        slice_mode: 'single' (1 channel) or 'rgb' (3 identical channels
+            normalized between 0 and 1).
+
+    Returns:
+        tensor of shape n_slices * 1 * W * L or n_slices * 3 * W * L.
+    """
+    # put the slice dimension first, the other dimensions keep the order of Tensor.select
+    slices = image_tensor.permute([axis] + [dim for dim in range(3) if dim != axis])
+    slices = slices[slice_list.start:slice_list.stop]
+    if slice_mode == 'single':
+        return slices.unsqueeze(1)  # shape should be n_slices * 1 * W * L
+
+    # train for transfer learning, creating the fake RGB image.
+    flat_slices = slices.reshape(slices.shape[0], -1)
+    slice_min = flat_slices.min(dim=1)[0].view(-1, 1, 1)
+    slice_max = flat_slices.max(dim=1)[0].view(-1, 1, 1)
+    slices = (slices - slice_min) / (slice_max - slice_min)
+    return slices.unsqueeze(1).expand(-1, 3, -1, -1)  # shape should be n_slices * 3 * W * L
+
+
+def get_slice(image_tensor, axis, index_slice, slice_mode):
+    """Gets a slice of an image
+
+    Args:
+        image_tensor: 3D tensor of the image (without the channel dimension).
+        axis: axis of the slice (0: sagittal, 1: coronal, 2: axial).
+        index_slice: index of the slice along the axis.
+        slice_mode: 'single' (1 channel) or 'rgb' (3 identical channels
+            normalized between 0 and 1).
+
+    Returns:
+        tensor of shape 1 * W * L or 3 * W * L (None for an unknown slice_mode).
+    """
+    import torch
+
+    slice_select = image_tensor.select(axis, index_slice)
+    if slice_mode == 'single':
+        return slice_select.unsqueeze(0)  # shape should be 1 * W * L
+    elif slice_mode == 'rgb':
+        # train for transfer learning, creating the fake RGB image.
+        slice_select = (slice_select - slice_select.min()) / (slice_select.max() - slice_select.min())
+        return torch.stack((slice_select, slice_select, slice_select))  # shape should be 3 * W * L
+    return None
+
+
+def get_patch(image_tensor, patch_size, stride_size, index_patch):
+    """Gets a patch of an image
+
+    Patches are numbered in the same order as the patches extracted by
+    extract_patches (i.e. by Tensor.unfold along the 3 spatial dimensions).
+
+    Args:
+        image_tensor: 4D tensor of the image (1 * D * H * W).
+        patch_size: size of a single patch.
+        stride_size: size of the stride leading to next patch.
+        index_patch: index of the patch.
+
+    Returns:
+        tensor of shape 1 * patch_size * patch_size * patch_size.
+    """
+    n_patches = [(dim - patch_size) // stride_size + 1 for dim in image_tensor.shape[1:]]
+    i = index_patch // (n_patches[1] * n_patches[2])
+    j = (index_patch // n_patches[2]) % n_patches[1]
+    k = index_patch % n_patches[2]
+    return image_tensor[:,
+                        i * stride_size:i * stride_size + patch_size,
+                        j * stride_size:j * stride_size + patch_size,
+                        k * stride_size:k * stride_size + patch_size]
+
+
 def save_as_pt(input_img):
     """Saves PyTorch tensor version of the nifti image
     
@@ -240,3 +402,163 @@ def save_as_pt(input_img):
     torch.save(image_tensor.clone(), output_file)
 
     return output_file
+
+
+def save_as_shard(views, output_file, id_column, view_ids, axis=None):
+    """Saves all the views (slices or patches) of an image in a single shard
+
+    The views are stacked in a contiguous float32 array saved in .npy format,
+    so that any view can be read without copy from a memory map of the shard.
+    The shard comes with an index (TSV file with the same name) giving, for
+    each view, the participant, the session, the axis (slices only), the
+    identifier of the view and its offset (in bytes) in the shard.
+
+    Args:
+        views: tensor (or array) of the views, the first dimension indexes the views.
+        output_file: filename of the shard (the extension is replaced by .npy).
+        id_column: name of the column of the view identifiers ('slice_id' or 'patch_id').
+        view_ids: identifiers of the views (e.g. indexes of the slices).
+        axis: axis of the slices ('sag', 'cor' or 'axi', None for patches).
+
+    Returns:
+        [shard_file, index_file] (list of str): the shard and its index.
+    """
+    import os
+    import re
+    import numpy as np
+    import pandas as pd
+
+    stem = os.path.splitext(output_file)[0]
+    shard_file = stem + '.npy'
+    index_file = stem + '.tsv'
+
+    if hasattr(views, 'numpy'):
+        views = views.detach().cpu().numpy()
+    np.save(shard_file, np.ascontiguousarray(views, dtype=np.float32))
+    shard = np.load(shard_file, mmap_mode='r')
+    view_nbytes = shard.itemsize * int(np.prod(shard.shape[1:]))
+
+    m = re.match(r'(sub-[a-zA-Z0-9]+)_(ses-[a-zA-Z0-9]+)', os.path.basename(stem))
+    index = pd.DataFrame({'participant_id': m.group(1) if m else 'n/a',
+                          'session_id': m.group(2) if m else 'n/a',
+                          'axis': axis if axis is not None else 'n/a',
+                          id_column: view_ids,
+                          'offset': [shard.offset + i * view_nbytes for i in range(shard.shape[0])]},
+                         columns=['participant_id', 'session_id', 'axis', id_column, 'offset'])
+    if axis is None:
+        index = index.drop(columns='axis')
+    index.to_csv(index_file, sep='\t', index=False, encoding='utf-8')
+
+    return [shard_file, index_file]
+
+
+def load_shard(shard_file):
+    """Loads a shard written by save_as_shard
+
+    Args:
+        shard_file: path to the .npy shard.
+
+    Returns:
+        (views, index): read-only memory map of the views (first dimension
+            indexes the views) and DataFrame of the index of the shard.
+    """
+    import os
+    import numpy as np
+    import pandas as pd
+
+    views = np.load(shard_file, mmap_mode='r')
+    index = pd.read_csv(os.path.splitext(shard_file)[0] + '.tsv', sep='\t')
+    return views, index
+
+
+def save_view_descriptor(input_tensor, output_file, parameters, image_shape):
+    """Saves the descriptor of the views (slices or patches) of an image
+
+    Instead of saving the views, only the parameters needed to compute them
+    from the image tensor are saved in a JSON file. The views are computed
+    at access time by DeepLearningViewsDataset.
+
+    Args:
+        input_tensor: tensor version of the nifti MRI (as written by save_as_pt).
+        output_file: filename of the descriptor (the extension is replaced by .json).
+        parameters: extraction parameters (extract_method, slice or patch
+            parameters and identifiers of the views).
+        image_shape: shape of the image tensor.
+
+    Returns:
+        [descriptor_file, input_tensor] (list of str): the descriptor and the
+            image tensor it refers to (both are saved in the same folder).
+    """
+    import os
+    import json
+
+    descriptor_file = os.path.splitext(output_file)[0] + '.json'
+    descriptor = dict(parameters)
+    descriptor['image'] = os.path.basename(input_tensor)
+    descriptor['image_shape'] = [int(dim) for dim in image_shape]
+    with open(descriptor_file, 'w') as f:
+        json.dump(descriptor, f, indent=4)
+
+    return [descriptor_file, input_tensor]
+
+
+class DeepLearningViewsDataset(object):
+    """Slices or patches computed on the fly from image tensors
+
+    The dataset reads the descriptors written by save_view_descriptor (output
+    format 'virtual' of deeplearning-prepare-data). Each view is computed at
+    access time from the image tensor, which is memory-mapped when the
+    version of PyTorch supports it. The class follows the map-style dataset
+    protocol of PyTorch and can be given to a torch.utils.data.DataLoader.
+
+    Args:
+        descriptor_files: list of descriptors (JSON files).
+    """
+
+    def __init__(self, descriptor_files):
+        import os
+        import json
+
+        self.descriptors = []
+        self.views = []
+        for descriptor_file in descriptor_files:
+            with open(descriptor_file, 'r') as f:
+                descriptor = json.load(f)
+            descriptor['image'] = os.path.join(os.path.dirname(os.path.abspath(descriptor_file)),
+                                               descriptor['image'])
+            view_ids = descriptor['slice_ids'] if descriptor['extract_method'] == 'slice' \
+                else descriptor['patch_ids']
+            self.views += [(len(self.descriptors), view_id) for view_id in view_ids]
+            self.descriptors.append(descriptor)
+        self._image = (None, None)
+
+    def __len__(self):
+        return len(self.views)
+
+    def __getitem__(self, idx):
+        descriptor_idx, view_id = self.views[idx]
+        descriptor = self.descriptors[descriptor_idx]
+        image_tensor = self._load_image(descriptor['image'])
+
+        if descriptor['extract_method'] == 'slice':
+            image_tensor = image_tensor.view(image_tensor.shape[1], image_tensor.shape[2], image_tensor.shape[3])
+            return get_slice(image_tensor, descriptor['axis'], view_id, descriptor['slice_mode'])
+        return get_patch(image_tensor, descriptor['patch_size'], descriptor['stride_size'], view_id)
+
+    def get_view_info(self, idx):
+        """Returns (image tensor file, extract_method, view identifier) of a view."""
+        descriptor_idx, view_id = self.views[idx]
+        descriptor = self.descriptors[descriptor_idx]
+        return descriptor['image'], descriptor['extract_method'], view_id
+
+    def _load_image(self, image_file):
+        import torch
+
+        # Consecutive views mostly come from the same image
+        if self._image[0] != image_file:
+            try:
+                image_tensor = torch.load(image_file, mmap=True)
+            except (TypeError, RuntimeError):
+                image_tensor = torch.load(image_file)
+            self._image = (image_file, image_tensor)
+        return self._image[1]
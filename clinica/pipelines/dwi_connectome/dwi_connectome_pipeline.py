@@ -51,86 +51,26 @@ class DwiConnectome(cpe.Pipeline):
         import nipype.interfaces.utility as nutil
         import nipype.pipeline.engine as npe
         from clinica.utils.stream import cprint
-        from clinica.utils.exceptions import ClinicaCAPSError, ClinicaException
-        from clinica.utils.inputs import clinica_file_reader
+        from clinica.utils.exceptions import ClinicaCAPSError
+        from clinica.utils.inputs import clinica_file_reader, clinica_list_of_files_reader
         import clinica.utils.input_files as input_files
         import re
 
-        all_errors = []
-
-        # Inputs from t1-freesurfer pipeline
-        # ==================================
-
-        # White matter segmentation
-        try:
-            wm_mask_files = clinica_file_reader(self.subjects,
-                                                self.sessions,
-                                                self.caps_directory,
-                                                input_files.T1_FS_WM)
-        except ClinicaException as e:
-            all_errors.append(e)
-
-        # Desikan parcellation
-        try:
-            aparc_aseg_files = clinica_file_reader(self.subjects,
-                                                   self.sessions,
-                                                   self.caps_directory,
-                                                   input_files.T1_FS_DESIKAN)
-        except ClinicaException as e:
-            all_errors.append(e)
-
-        # Destrieux parcellation
-        try:
-            aparc_aseg_a2009s_files = clinica_file_reader(self.subjects,
-                                                          self.sessions,
-                                                          self.caps_directory,
-                                                          input_files.T1_FS_DESTRIEUX)
-        except ClinicaException as e:
-            all_errors.append(e)
-
-        # Inputs from dwi-preprocessing pipeline
-        # ======================================
-        # Preprocessed DWI
-        try:
-            dwi_files = clinica_file_reader(self.subjects,
-                                            self.sessions,
-                                            self.caps_directory,
-                                            input_files.DWI_PREPROC_NII)
-        except ClinicaException as e:
-            all_errors.append(e)
-
-        # B0 brainmask
-        try:
-            dwi_brainmask_files = clinica_file_reader(self.subjects,
-                                                      self.sessions,
-                                                      self.caps_directory,
-                                                      input_files.DWI_PREPROC_BRAINMASK)
-        except ClinicaException as e:
-            all_errors.append(e)
-
-        # Preprocessed bvec
-        try:
-            bvec_files = clinica_file_reader(self.subjects,
-                                             self.sessions,
-                                             self.caps_directory,
-                                             input_files.DWI_PREPROC_BVEC)
-        except ClinicaException as e:
-            all_errors.append(e)
-
-        # Preprocessed bval
-        try:
-            bval_files = clinica_file_reader(self.subjects,
-                                             self.sessions,
-                                             self.caps_directory,
-                                             input_files.DWI_PREPROC_BVAL)
-        except ClinicaException as e:
-            all_errors.append(e)
-
-        if len(all_errors) > 0:
-            error_message = 'Clinica faced errors while trying to read files in your BIDS or CAPS directories.\n'
-            for msg in all_errors:
-                error_message += str(msg)
-            raise ClinicaCAPSError(error_message)
+        # Inputs from t1-freesurfer pipeline (white matter segmentation, Desikan and Destrieux parcellations)
+        # and from dwi-preprocessing pipeline (preprocessed DWI, B0 brainmask, preprocessed bvec and bval)
+        # =====================================================================================================
+        (wm_mask_files, aparc_aseg_files, aparc_aseg_a2009s_files,
+         dwi_files, dwi_brainmask_files, bvec_files, bval_files) = clinica_list_of_files_reader(
+            self.subjects,
+            self.sessions,
+            self.caps_directory,
+            [input_files.T1_FS_WM,
+             input_files.T1_FS_DESIKAN,
+             input_files.T1_FS_DESTRIEUX,
+             input_files.DWI_PREPROC_NII,
+             input_files.DWI_PREPROC_BRAINMASK,
+             input_files.DWI_PREPROC_BVEC,
+             input_files.DWI_PREPROC_BVAL])
 
         # Check space of DWI dataset
         dwi_file_spaces = [re.search('.*_space-(.*)_preproc.nii.*', file, re.IGNORECASE).group(1) for file in dwi_files]
@@ -50,7 +50,7 @@ def statistics_on_atlases(in_registered_map, name_map, prefix_file=None):
     from nipype.utils.filemanip import split_filename
     from clinica.utils.atlas import (AtlasAbstract, JHUDTI811mm,
                                      JHUTracts01mm, JHUTracts251mm)
-    from clinica.utils.statistics import statistics_on_atlas
+    from clinica.utils.statistics import statistics_on_atlases as compute_statistics_on_atlases
 
     in_atlas_list = [JHUDTI811mm(),
                      JHUTracts01mm(), JHUTracts251mm()]
@@ -71,10 +71,11 @@ def statistics_on_atlases(in_registered_map, name_map, prefix_file=None):
                         atlas.get_spatial_resolution(), name_map)
 
         out_atlas_statistics = abspath(join(getcwd(), filename))
-
-        statistics_on_atlas(in_registered_map, atlas, out_atlas_statistics)
         atlas_statistics_list.append(out_atlas_statistics)
 
+    # The map is loaded once for all the atlases
+    compute_statistics_on_atlases(in_registered_map, in_atlas_list, atlas_statistics_list)
+
     return atlas_statistics_list
 
 
@@ -256,8 +256,7 @@ class Pipeline(Workflow):
         self.check_not_cross_sectional()
         if not bypass_check:
             self.check_size()
-            plugin_args = self.update_parallelize_info(plugin_args)
-            plugin = 'MultiProc'
+            plugin, plugin_args = self.plan_resources(plugin, plugin_args)
         exec_graph = []
         try:
             exec_graph = Workflow.run(self, plugin, plugin_args, update_hash)
@@ -370,8 +369,6 @@ class Pipeline(Workflow):
         from pandas import read_csv
         from clinica.utils.stream import cprint
         from colorama import Fore
-        import sys
-        import select
 
         SYMBOLS = {
             'customary': ('B', 'K', 'M', 'G', 'T', 'P', 'E', 'Z', 'Y'),
@@ -446,8 +443,6 @@ class Pipeline(Workflow):
                 prefix[s] = 1 << (i + 1) * 10
             return int(num * prefix[letter])
 
-        timeout = 15
-
         # Get the number of sessions
         n_sessions = len(self.subjects)
         try:
@@ -485,100 +480,55 @@ class Pipeline(Workflow):
                                      + bytes2human(space_needed_wd) + ') is greater than what is left on your hard '
                                      + 'drive (' + bytes2human(free_space_wd) + ')\n')
             if error != '':
+                # The pipeline is run anyway: Clinica must not wait for an answer (e.g. in a batch job)
                 cprint(Fore.RED + '[SpaceError] ' + error + Fore.RESET)
-                while True:
-                    cprint('Do you still want to run the pipeline? (yes/no): '
-                           + ' In ' + str(timeout) + ' sec the pipeline will start if you do not answer.')
-                    stdin_answer, __, ___ = select.select([sys.stdin], [], [], timeout)
-                    if stdin_answer:
-                        answer = str(sys.stdin.readline().strip())
-                    # Else: is taken when no answer is given (timeout)
-                    else:
-                        answer = 'yes'
-
-                    if answer.lower() in ['yes', 'no']:
-                        break
-                    else:
-                        cprint('Possible answers are yes or no.\n')
-                if answer.lower() == 'yes':
-                    cprint('Running the pipeline anyway.')
-                if answer.lower() == 'no':
-                    cprint('Exiting clinica...')
-                    sys.exit()
+                cprint(Fore.YELLOW + 'Running the pipeline anyway.' + Fore.RESET)
 
         except KeyError:
             cprint(Fore.RED + 'No info on how much size the pipeline takes. '
                    + 'Running anyway...' + Fore.RESET)
 
-    def update_parallelize_info(self, plugin_args):
-        """ Performs some checks of the number of threads given in parameters,
-        given the number of CPUs of the machine in which clinica is running.
-        We force the use of plugin MultiProc
+    def plan_resources(self, plugin=None, plugin_args=None):
+        """Chooses the Nipype plugin and its arguments without asking the user.
 
-        Author: Arnaud Marcoux"""
-        from clinica.utils.stream import cprint
-        from multiprocessing import cpu_count
-        from colorama import Fore
-        import select
-        import sys
+        The number of processes and the memory of the MultiProc plugin are
+        chosen from the CPUs and the memory allocated to Clinica (CPU affinity,
+        cgroup limits) and from the memory needed by a node of the pipeline
+        (optional 'memory_per_node' key of the `info.json` file). The plan is
+        written in the log as JSON (see clinica.utils.resources.plan_resources).
 
-        # count number of CPUs
-        n_cpu = cpu_count()
-        # timeout value: max time allowed to decide how many thread
-        # to run in parallel (sec)
-        timeout = 15
+        Args:
+            plugin: Nipype plugin given to run() (None for MultiProc).
+            plugin_args: Arguments of the plugin given to run().
 
-        # Use this var to know in the end if we need to ask the user
-        # an other number
-        ask_user = False
+        Returns:
+            (plugin, plugin_args) to give to Workflow.run.
+        """
+        import json
+        import logging
+        from colorama import Fore
+        from clinica.utils.resources import parse_memory_gb, plan_resources
+        from clinica.utils.stream import cprint
 
-        try:
-            # if no --n_procs arg is used, plugin_arg is None
-            # so we need a try / except block
-            n_thread_cmdline = plugin_args['n_procs']
-            if n_thread_cmdline > n_cpu:
-                cprint(Fore.YELLOW + '[Warning] You are trying to run clinica '
-                       + 'with a number of threads (' + str(n_thread_cmdline)
-                       + ') superior to your number of CPUs (' + str(n_cpu)
-                       + ').' + Fore.RESET)
-                ask_user = True
-        except TypeError:
-            cprint(Fore.YELLOW + '\n[Warning] You did not specify the number of '
-                   + 'threads to run in parallel (--n_procs argument).'
-                   + Fore.RESET)
-            cprint(Fore.YELLOW + 'Computation time can be shorten as you have '
-                   + str(n_cpu) + ' CPUs on this computer. We recommend using '
-                   + str(n_cpu - 1) + ' threads.\n' + Fore.RESET)
-            ask_user = True
-
-        if ask_user:
-            while True:
-                # While True allows to ask indefinitely until
-                # user gives a answer that has the correct format
-                # (here, positive integer) or timeout
-                cprint('How many threads do you want to use? If you do not '
-                       + 'answer within ' + str(timeout)
-                       + ' sec, default value of ' + str(n_cpu - 1)
-                       + ' will be taken. Use --n_procs argument if you want to disable this message next time.')
-                stdin_answer, __, ___ = select.select([sys.stdin], [], [], timeout)
-                if stdin_answer:
-                    answer = str(sys.stdin.readline().strip())
-                else:
-                    answer = str(max(n_cpu - 1, 1))
-                if answer.isnumeric():
-                    if int(answer) > 0:
-                        break
-                cprint(Fore.RED + 'Your answer must be a positive integer.'
-                       + Fore.RESET)
-            # If plugin_args is None, create the dictionary
-            # If it already a dict, just update (or create -it is the same
-            # code-) the correct key / value
-            if plugin_args is None:
-                plugin_args = {'n_procs': int(answer)}
-            else:
-                plugin_args['n_procs'] = int(answer)
+        plugin, plugin_args, plan = plan_resources(
+            self.name,
+            len(self.subjects),
+            plugin,
+            plugin_args,
+            parse_memory_gb(self.info.get('memory_per_node'))
+        )
+        for warning in plan['warnings']:
+            cprint(Fore.YELLOW + '[Warning] ' + warning + '.' + Fore.RESET)
+        if plugin == 'MultiProc':
+            cprint('The pipeline will run with %d process(es)%s.' % (
+                plugin_args['n_procs'],
+                ' and %.1f GB of memory' % plugin_args['memory_gb'] if 'memory_gb' in plugin_args else ''))
+        logging.getLogger('nipype.workflow').info('Resource plan: %s' % json.dumps(plan, sort_keys=True))
+        return plugin, plugin_args
 
-        return plugin_args
+    def update_parallelize_info(self, plugin_args):
+        """Returns the arguments of the MultiProc plugin chosen by plan_resources."""
+        return self.plan_resources('MultiProc', plugin_args)[1]
 
     def check_not_cross_sectional(self):
         """
@@ -591,138 +541,10 @@ class Pipeline(Workflow):
         from os.path import join, isdir, dirname, abspath, basename
         from colorama import Fore
         from clinica.utils.stream import cprint
+        from clinica.iotools.utils.data_handling import (convert_cross_sectional,
+                                                         get_cross_sectional_conversion_mode)
         import sys
 
-        def convert_cross_sectional(bids_in,
-                                    bids_out,
-                                    cross_subjects,
-                                    long_subjects):
-            """
-            This function converts a cross-sectional-bids dataset into a
-            longitudinal clinica-compliant dataset
-
-            Args:
-                bids_in: cross sectional bids dataset you want to convert
-                bids_out: converted longitudinal bids dataset
-                cross_subjects: list of subjects in cross sectional form
-                (they need some adjustment)
-                long_subjects: list of subjects in longitudinal form (they
-                just need to be copied)
-
-            Returns:
-                nothing
-            """
-            from os.path import exists, isfile
-            from os import mkdir
-            from shutil import copytree, copy2
-
-            def add_ses(f):
-                """
-                Use this function to transform a cross sectional filename into
-                a longitudinal one.
-                Examples:
-                sub-ADNI001_scans.tsv -> sub-ADNI001_ses-M00_scans.tsv
-                sub-023a_ses-M12_T1w.nii.gz -> sub-023a_ses-M12_T1w.nii.gz (no
-                    modification done if filename already has a session)
-
-                Args:
-                    f: filename
-
-                Returns:
-                    filename with '_ses-M00_ added just after participant_id
-                """
-                import re
-                # If filename contains ses-..., returns the original filename
-                # Regex explication:
-                # ^ start of string
-                # ([a-zA-Z0-9]*) matches any number of characters from a to z,
-                #       A to Z, 0 to 9, and store it in group(1)
-                # (?!ses-[a-zA-Z0-9]) do not match if there is already a 'ses-'
-                # (.*) catches the rest of the string
-                m = re.search(r'(^sub-[a-zA-Z0-9]*)_(?!ses-[a-zA-Z0-9])(.*)',
-                              f)
-                try:
-                    return m.group(1) + '_ses-M00_' + m.group(2)
-                except AttributeError:
-                    # If something goes wrong, we return the original filename
-                    return f
-
-            def copy2_add_ses(src, dst):
-                """
-                copy2_add_ses calls copy2 function from shutil, but modifies
-                the filename of the copied files if they match the regex
-                template described in add_ses() function
-
-                Args:
-                    src: path to the file that needs to be copied
-                    dst: original destination for the copied file
-
-                Returns:
-                    copy2 with modified filename
-                """
-                from shutil import copy2
-                from os.path import join, dirname, basename
-
-                dst_modified = join(dirname(dst), add_ses(basename(src)))
-                return copy2(src, dst_modified)
-
-            if not exists(bids_out):
-                # Create the output folder if it does not exists yet
-                mkdir(bids_out)
-
-            # First part of the algorithm: deal with subjects that does not
-            # have longitudinal (session) information
-            for subj in cross_subjects:
-                # Get list of of files/folders to copy. Remove hidden element
-                # ( if they start with a dot '.')
-                to_copy = [f for f in listdir(join(bids_in, subj)) if
-                           not f.startswith('.')]
-                # Always check that folder are existing, otherwise an exception
-                # is raised even though that does not prevent the function from
-                # working
-                if not exists(join(bids_out, subj)):
-                    mkdir(join(bids_out, subj))
-                if not exists(join(bids_out, subj, 'ses-M00')):
-                    mkdir(join(bids_out, subj, 'ses-M00'))
-                for el in to_copy:
-                    path_el = join(bids_in, subj, el)
-                    if not exists(join(bids_out, subj, 'ses-M00', el)):
-                        # If the element to copy is a folder...
-                        if isdir(path_el):
-                            # Copytree is used with a 'custom' copy function,
-                            # to give a correct filemename to the files inside
-                            # the copied folders
-                            copytree(path_el,
-                                     join(bids_out, subj, 'ses-M00',
-                                          basename(path_el)),
-                                     copy_function=copy2_add_ses)
-                        # If the element to copy is a file...
-                        elif isfile(path_el):
-                            # Modify the filename with add_ses function
-                            new_filename_wo_ses = add_ses(el)
-                            copy2(path_el,
-                                  join(bids_out, subj, 'ses-M00',
-                                       new_filename_wo_ses))
-            # Second part of the algorithm: deal with subjects that do not
-            # have the problem. We only xopy the content of the folder, and no
-            # filename needs to be changed
-            for su in long_subjects:
-                # Do not copy hidden files
-                to_copy = [f for f in listdir(join(bids_in, su))
-                           if not f.startswith('.')]
-                if not exists(join(bids_out, su)):
-                    mkdir(join(bids_out, su))
-                for el in to_copy:
-                    path_el = join(bids_in, su, el)
-                    if not exists(join(bids_out, su, el)):
-                        # 2 possible cases: element to pcopy is a folder or a
-                        # file
-                        if isdir(path_el):
-                            copytree(path_el,
-                                     join(bids_out, su, basename(path_el)))
-                        elif isfile(path_el):
-                            copy2(path_el,
-                                  join(bids_out, su))
         if self.bids_directory is not None:
             bids_dir = abspath(self.bids_directory)
             # Extract all subjects in BIDS directory: element must be a folder and
@@ -776,7 +598,8 @@ class Pipeline(Workflow):
                     convert_cross_sectional(bids_dir,
                                             proposed_bids,
                                             cross_subj,
-                                            long_subj)
+                                            long_subj,
+                                            get_cross_sectional_conversion_mode())
                     cprint(
                         Fore.GREEN + 'Conversion succeeded. Your clinica-compliant'
                         + ' dataset is located here: ' + proposed_bids
@@ -111,6 +111,27 @@ class MLValidation(ABC):
     def validate(self, y):
         pass
 
+    def run_evaluations(self, evaluate_function, list_indices):
+        """Run evaluate_function(train_index, test_index) for each (train_index, test_index) of list_indices.
+
+        The n_threads workers are split between the evaluations and the grid search run by each of them
+        (see ml_executor.split_workers), and evaluations are run with the 'backend' validation parameter.
+
+        Returns: the list of the results of evaluate_function, in the order of list_indices.
+
+        """
+        from clinica.pipelines.machine_learning import ml_executor
+
+        n_outer_workers, n_inner_workers = ml_executor.split_workers(self._validation_params['n_threads'],
+                                                                     len(list_indices))
+        n_threads = self._ml_algorithm.get_n_threads()
+        self._ml_algorithm.set_n_threads(n_inner_workers)
+        try:
+            return ml_executor.run_tasks(evaluate_function, list_indices,
+                                         backend=self._validation_params['backend'], n_workers=n_outer_workers)
+        finally:
+            self._ml_algorithm.set_n_threads(n_threads)
+
     @staticmethod
     @abstractmethod
     def get_default_parameters():
@@ -136,6 +157,12 @@ class MLAlgorithm(ABC):
     def uses_kernel():
         pass
 
+    def get_n_threads(self):
+        return self._algorithm_params['n_threads']
+
+    def set_n_threads(self, n_threads):
+        self._algorithm_params['n_threads'] = n_threads
+
     @abstractmethod
     def evaluate(self, train_index, test_index):
         pass
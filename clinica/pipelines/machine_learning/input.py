@@ -2,6 +2,7 @@
 
 
 import abc
+import os
 import os.path as path
 
 import numpy as np
@@ -46,13 +47,16 @@ class CAPSInput(base.MLInput):
                 else:
                     raise Exception("""Precomputed kernel provided is not in the correct format.
                     It must be a numpy.ndarray object with number of rows and columns equal to the number of subjects,
-                    or a filename to a numpy txt file containing an object with the described format.""")
+                    or a filename to a numpy txt or npy file containing an object with the described format.""")
             elif type(self._input_params['precomputed_kernel'] == str):
-                self._kernel = np.loadtxt(self._input_params['precomputed_kernel'])
+                if self._input_params['precomputed_kernel'].endswith('.npy'):
+                    self._kernel = np.load(self._input_params['precomputed_kernel'])
+                else:
+                    self._kernel = np.loadtxt(self._input_params['precomputed_kernel'])
             else:
                 raise Exception("""Precomputed kernel provided is not in the correct format.
                 It must be a numpy.ndarray object with number of rows and columns equal to the number of subjects,
-                or a filename to a numpy txt file containing an object with the described format.""")
+                or a filename to a numpy txt or npy file containing an object with the described format.""")
 
     @abc.abstractmethod
     def get_images(self):
@@ -94,14 +98,97 @@ class CAPSInput(base.MLInput):
         if self._kernel is not None and not recompute_if_exists:
             return self._kernel
 
+        kernel_file = self.get_kernel_cache_file(kernel_function)
+        if kernel_file is not None and not recompute_if_exists:
+            self._kernel = self._load_cached_kernel(kernel_file, kernel_function)
+            if self._kernel is not None:
+                return self._kernel
+
         if self._x is None:
             self.get_x()
 
         cprint("Computing kernel ...")
-        self._kernel = kernel_function(self._x)
+        if kernel_function is utils.gram_matrix_linear and isinstance(self._x, np.memmap):
+            self._kernel = utils.gram_matrix_linear_blocked(self._x, n_threads=self._input_params['n_threads'])
+        else:
+            self._kernel = kernel_function(self._x)
         cprint("Kernel computed")
+
+        if kernel_file is not None:
+            self._save_cached_kernel(kernel_file)
         return self._kernel
 
+    def get_kernel_cache_file(self, kernel_function=utils.gram_matrix_linear):
+        """
+
+        Returns: the .npy file caching the kernel in kernel_cache_directory, or None if the kernel is not cached.
+        The filename is a hash of the input parameters and of the kernel function. The images of the cached kernel
+        are listed in a text file next to it (see _load_cached_kernel).
+
+        """
+        import hashlib
+        import json
+
+        if self._input_params['kernel_cache_directory'] is None or self.get_images() is None:
+            return None
+
+        # Parameters which do not change the kernel values are not part of the key
+        ignored_parameters = ['subjects_visits_tsv', 'diagnoses_tsv', 'precomputed_kernel',
+                              'kernel_cache_directory', 'memmap_directory', 'n_threads']
+        key = {'parameters': {k: v for k, v in self._input_params.items() if k not in ignored_parameters},
+               'kernel_function': kernel_function.__name__}
+        key_hash = hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+        return path.join(self._input_params['kernel_cache_directory'], 'kernel_%s.npy' % key_hash[:32])
+
+    def _load_cached_kernel(self, kernel_file, kernel_function):
+        """Build the kernel of the images from the cached kernel.
+
+        If all the images are in the cached kernel, the kernel is extracted from it. If only some of them are (e.g.
+        subjects were added to the cohort) and the kernel is linear, only the rows and columns of the new images
+        are computed.
+
+        Returns: a numpy 2d-array, or None if the cached kernel can not be used.
+
+        """
+        signatures_file = kernel_file[:-len('.npy')] + '_images.txt'
+        if not path.exists(kernel_file) or not path.exists(signatures_file):
+            return None
+
+        cached_rows = {signature: i for i, signature in enumerate(utils.load_images_signatures(signatures_file))}
+        indices = [cached_rows.get(signature) for signature in utils.get_images_signatures(self.get_images())]
+        known = [i for i, index in enumerate(indices) if index is not None]
+        new = [i for i, index in enumerate(indices) if index is None]
+        if len(known) == 0 or (len(new) > 0 and kernel_function is not utils.gram_matrix_linear):
+            return None
+
+        cached_kernel = np.load(kernel_file, mmap_mode='r')
+        cached_indices = [indices[i] for i in known]
+        if len(new) == 0:
+            cprint("Loading kernel from cache %s" % kernel_file)
+            return np.array(cached_kernel[np.ix_(cached_indices, cached_indices)])
+
+        cprint("Updating cached kernel with %d new subjects ..." % len(new))
+        if self._x is None:
+            self.get_x()
+        kernel = np.zeros((len(indices), len(indices)))
+        kernel[np.ix_(known, known)] = cached_kernel[np.ix_(cached_indices, cached_indices)]
+        new_rows = utils.gram_matrix_linear_rows(self._x, new, n_threads=self._input_params['n_threads'])
+        kernel[new, :] = new_rows
+        kernel[:, new] = new_rows.transpose()
+        del cached_kernel
+        cprint("Kernel updated")
+
+        self._kernel = kernel
+        self._save_cached_kernel(kernel_file)
+        return kernel
+
+    def _save_cached_kernel(self, kernel_file):
+        os.makedirs(self._input_params['kernel_cache_directory'], exist_ok=True)
+        np.save(kernel_file, self._kernel)
+        utils.save_images_signatures(utils.get_images_signatures(self.get_images()),
+                                     kernel_file[:-len('.npy')] + '_images.txt')
+
     def save_kernel(self, output_dir):
         """
 
@@ -129,7 +216,9 @@ class CAPSInput(base.MLInput):
                            'diagnoses_tsv': None,
                            'group_label': None,
                            'image_type': None,
-                           'precomputed_kernel': None}
+                           'precomputed_kernel': None,
+                           'kernel_cache_directory': None,
+                           'n_threads': 1}
 
         return parameters_dict
 
@@ -146,6 +235,11 @@ class CAPSVoxelBasedInput(CAPSInput):
         if self._input_params['modulated'] not in ['on', 'off']:
             raise Exception("Incorrect modulation parameter. It must be one of the values 'on' or 'off'")
 
+        # The rows of the cached kernel are updated from the voxel features of the previous run, which are kept
+        # next to the kernel unless another folder is given
+        if self._input_params['memmap_directory'] is None and self._input_params['kernel_cache_directory'] is not None:
+            self._input_params['memmap_directory'] = self._input_params['kernel_cache_directory']
+
     def get_images(self):
         """
 
@@ -191,7 +285,15 @@ class CAPSVoxelBasedInput(CAPSInput):
             return self._x
 
         cprint('Loading ' + str(len(self.get_images())) + ' subjects')
-        self._x, self._orig_shape, self._data_mask = vbio.load_data(self._images, mask=self._input_params['mask_zeros'])
+        if self._input_params['memmap_directory'] is None:
+            self._x, self._orig_shape, self._data_mask = vbio.load_data(self._images,
+                                                                        mask=self._input_params['mask_zeros'])
+        else:
+            os.makedirs(self._input_params['memmap_directory'], exist_ok=True)
+            memmap_file = path.join(self._input_params['memmap_directory'], 'voxel_features.npy')
+            self._x, self._orig_shape, self._data_mask = vbio.load_data_memmap(self._images, memmap_file,
+                                                                               mask=self._input_params['mask_zeros'],
+                                                                               n_threads=self._input_params['n_threads'])
         cprint('Subjects loaded')
 
         return self._x
@@ -213,7 +315,8 @@ class CAPSVoxelBasedInput(CAPSInput):
         new_parameters = {'fwhm': 0,
                           'modulated': "on",
                           'pvc': None,
-                          'mask_zeros': True}
+                          'mask_zeros': True,
+                          'memmap_directory': None}
 
         parameters_dict.update(new_parameters)
 
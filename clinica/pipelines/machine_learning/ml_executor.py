@@ -0,0 +1,93 @@
+# coding: utf8
+
+"""
+Execution backends running the evaluations of the ML validations.
+
+Available backends:
+    - 'thread': multiprocessing.pool.ThreadPool (default).
+    - 'process': pool of forked processes. The function to run (e.g. the evaluate method of an algorithm holding
+      the kernel) is inherited by the workers when they are forked, so the kernel is shared copy-on-write and is
+      never pickled. Only the task arguments and the results are sent between processes.
+    - 'loky': joblib loky backend. Numpy arrays larger than 1 MB are memory-mapped and shared between the workers.
+
+Nested parallelism (outer folds x inner grid search) shares a single budget of workers, see split_workers().
+"""
+
+BACKENDS = ['thread', 'process', 'loky']
+
+# Function run by the workers of the 'process' backend, set before forking
+_forked_function = None
+
+
+def _call_forked_function(args):
+    return _forked_function(*args)
+
+
+def split_workers(n_workers, n_outer_tasks):
+    """Split a budget of n_workers between outer tasks and the inner tasks run by each of them.
+
+    Outer tasks (e.g. the folds of a cross-validation) are given as many workers as possible, the remaining
+    workers are used by each outer task for its inner tasks (e.g. the grid search), so that
+    n_outer_workers x n_inner_workers <= n_workers.
+
+    Args:
+        n_workers: total number of workers
+        n_outer_tasks: number of outer tasks
+
+    Returns:
+        n_outer_workers, n_inner_workers
+    """
+    n_outer_workers = max(1, min(n_workers, n_outer_tasks))
+    n_inner_workers = max(1, n_workers // n_outer_workers)
+    return n_outer_workers, n_inner_workers
+
+
+def run_tasks(function, list_args, backend='thread', n_workers=1):
+    """Run function(*args) for each args of list_args.
+
+    Args:
+        function: function to run
+        list_args: list of tuples of arguments
+        backend: one of BACKENDS
+        n_workers: number of workers running the tasks
+
+    Returns:
+        list of the results, in the order of list_args
+    """
+    global _forked_function
+
+    if backend not in BACKENDS:
+        raise ValueError("Unknown execution backend %s. It must be one of the values %s." % (backend, BACKENDS))
+
+    n_workers = min(n_workers, len(list_args))
+    if n_workers <= 1:
+        return [function(*args) for args in list_args]
+
+    if backend == 'thread':
+        from multiprocessing.pool import ThreadPool
+
+        pool = ThreadPool(n_workers)
+        try:
+            results = pool.starmap(function, list_args)
+        finally:
+            pool.close()
+            pool.join()
+
+    elif backend == 'process':
+        import multiprocessing
+
+        _forked_function = function
+        pool = multiprocessing.get_context('fork').Pool(n_workers)
+        try:
+            results = pool.map(_call_forked_function, list_args)
+        finally:
+            pool.close()
+            pool.join()
+            _forked_function = None
+
+    else:
+        from joblib import Parallel, delayed
+
+        results = Parallel(n_jobs=n_workers, backend='loky')(delayed(function)(*args) for args in list_args)
+
+    return results
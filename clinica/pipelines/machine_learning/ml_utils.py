@@ -73,6 +73,113 @@ def gram_matrix_linear(data):
     return np.dot(data, data.transpose())
 
 
+def gram_matrix_linear_blocked(data, block_size=512, feature_block_size=32768, n_threads=1):
+    """Compute the linear kernel data.data^T tile by tile.
+
+    The kernel is split into tiles of block_size x block_size subjects, computed in parallel with n_threads threads.
+    Each tile is accumulated over blocks of feature_block_size features, converted to float64, so that only small
+    parts of data are in memory at the same time. This is suited to a numpy.memmap feature matrix (see
+    voxel_based_io.load_data_memmap).
+
+    Args:
+        data: 2d-array (n_subjects x n_features), possibly memory-mapped
+        block_size: number of subjects (rows) of a tile
+        feature_block_size: number of features (columns) read at once for a tile
+        n_threads: number of threads computing tiles
+
+    Returns:
+        a numpy 2d-array (n_subjects x n_subjects)
+    """
+    from multiprocessing.pool import ThreadPool
+
+    n_subjects, n_features = data.shape
+    kernel = np.zeros((n_subjects, n_subjects))
+    blocks = [(start, min(start + block_size, n_subjects)) for start in range(0, n_subjects, block_size)]
+    tiles = [(blocks[i], blocks[j]) for i in range(len(blocks)) for j in range(i, len(blocks))]
+
+    def compute_tile(tile):
+        (i_start, i_end), (j_start, j_end) = tile
+        for f_start in range(0, n_features, feature_block_size):
+            f_end = min(f_start + feature_block_size, n_features)
+            rows_i = np.asarray(data[i_start:i_end, f_start:f_end], dtype=np.float64)
+            if i_start == j_start:
+                rows_j = rows_i
+            else:
+                rows_j = np.asarray(data[j_start:j_end, f_start:f_end], dtype=np.float64)
+            kernel[i_start:i_end, j_start:j_end] += np.dot(rows_i, rows_j.transpose())
+        kernel[j_start:j_end, i_start:i_end] = kernel[i_start:i_end, j_start:j_end].transpose()
+
+    pool = ThreadPool(n_threads)
+    pool.map(compute_tile, tiles)
+    pool.close()
+    pool.join()
+
+    return kernel
+
+
+def gram_matrix_linear_rows(data, rows, block_size=512, feature_block_size=32768, n_threads=1):
+    """Compute the rows `rows` of the linear kernel of data, i.e. data[rows].data^T.
+
+    Used to update a kernel when subjects are added: only the rows (and by symmetry the columns) of the new
+    subjects are computed. Blocks of block_size subjects are computed in parallel with n_threads threads.
+
+    Args:
+        data: 2d-array (n_subjects x n_features), possibly memory-mapped
+        rows: list of the indices of the rows to compute
+        block_size: number of subjects (columns of the result) of a block
+        feature_block_size: number of features read at once
+        n_threads: number of threads computing blocks
+
+    Returns:
+        a numpy 2d-array (len(rows) x n_subjects)
+    """
+    from multiprocessing.pool import ThreadPool
+
+    n_subjects, n_features = data.shape
+    kernel_rows = np.zeros((len(rows), n_subjects))
+    blocks = [(start, min(start + block_size, n_subjects)) for start in range(0, n_subjects, block_size)]
+
+    def compute_block(block):
+        j_start, j_end = block
+        for f_start in range(0, n_features, feature_block_size):
+            f_end = min(f_start + feature_block_size, n_features)
+            rows_i = np.asarray(data[rows, f_start:f_end], dtype=np.float64)
+            rows_j = np.asarray(data[j_start:j_end, f_start:f_end], dtype=np.float64)
+            kernel_rows[:, j_start:j_end] += np.dot(rows_i, rows_j.transpose())
+
+    pool = ThreadPool(n_threads)
+    pool.map(compute_block, blocks)
+    pool.close()
+    pool.join()
+
+    return kernel_rows
+
+
+def get_images_signatures(images):
+    """Return, for each image, a string identifying its file(s) with their size and modification time.
+
+    An image is a filename or a list of filenames (e.g. both hemispheres of a subject). Signatures are used to
+    reuse cached features or kernel values of images which did not change.
+    """
+    import os
+
+    signatures = []
+    for image in images:
+        files = image if isinstance(image, list) else [image]
+        signatures.append('|'.join('%s:%d:%d' % (f, os.stat(f).st_size, os.stat(f).st_mtime_ns) for f in files))
+    return signatures
+
+
+def save_images_signatures(signatures, filename):
+    with open(filename, 'w') as f:
+        f.write('\n'.join(signatures) + '\n')
+
+
+def load_images_signatures(filename):
+    with open(filename, 'r') as f:
+        return [line.rstrip('\n') for line in f if line.strip()]
+
+
 def evaluate_prediction_multiclass(y, y_hat):
 
     balanced_accuracy = balanced_accuracy_score(y, y_hat)
@@ -10,7 +10,8 @@ class VoxelBasedKFoldDualSVM(base.MLWorkflow):
 
     def __init__(self, caps_directory, subjects_visits_tsv, diagnoses_tsv, group_label, image_type, output_dir, fwhm=0,
                  modulated="on", pvc=None, precomputed_kernel=None, mask_zeros=True, n_threads=15, n_folds=10,
-                 grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17), splits_indices=None):
+                 grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17), splits_indices=None,
+                 memmap_directory=None, kernel_cache_directory=None, backend='thread'):
 
         super(VoxelBasedKFoldDualSVM, self).__init__(input.CAPSVoxelBasedInput,
                                                      validation.KFoldCV,
@@ -23,7 +24,8 @@ class VoxelBasedRepKFoldDualSVM(base.MLWorkflow):
 
     def __init__(self, caps_directory, subjects_visits_tsv, diagnoses_tsv, group_label, image_type, output_dir, fwhm=0,
                  modulated="on", pvc=None, precomputed_kernel=None, mask_zeros=True, n_threads=15, n_iterations=100,
-                 n_folds=10, grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17), splits_indices=None):
+                 n_folds=10, grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17), splits_indices=None,
+                 memmap_directory=None, kernel_cache_directory=None, backend='thread'):
 
         super(VoxelBasedRepKFoldDualSVM, self).__init__(input.CAPSVoxelBasedInput,
                                                         validation.RepeatedKFoldCV,
@@ -37,7 +39,7 @@ class VoxelBasedRepHoldOutDualSVM(base.MLWorkflow):
     def __init__(self, caps_directory, subjects_visits_tsv, diagnoses_tsv, group_label, image_type, output_dir, fwhm=0,
                  modulated="on", pvc=None, precomputed_kernel=None, mask_zeros=True, n_threads=15, n_iterations=100,
                  test_size=0.3, grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17),
-                 splits_indices=None):
+                 splits_indices=None, memmap_directory=None, kernel_cache_directory=None, backend='thread'):
 
         super().__init__(input.CAPSVoxelBasedInput,
                          validation.RepeatedHoldOut,
@@ -50,7 +52,7 @@ class VertexBasedRepHoldOutDualSVM(base.MLWorkflow):
 
     def __init__(self, caps_directory, subjects_visits_tsv, diagnoses_tsv, group_label, output_dir, image_type='fdg', fwhm=20,
                  precomputed_kernel=None, n_threads=15, n_iterations=100, test_size=0.3, grid_search_folds=10,
-                 balanced=True, c_range=np.logspace(-10, 2, 1000), splits_indices=None):
+                 balanced=True, c_range=np.logspace(-10, 2, 1000), splits_indices=None, backend='thread'):
 
         super(VertexBasedRepHoldOutDualSVM, self).__init__(input.CAPSVertexBasedInput,
                                                            validation.RepeatedHoldOut,
@@ -63,7 +65,8 @@ class RegionBasedRepHoldOutDualSVM(base.MLWorkflow):
 
     def __init__(self, caps_directory, subjects_visits_tsv, diagnoses_tsv, group_label, image_type,  atlas,
                  output_dir, pvc=None, n_threads=15, n_iterations=100, test_size=0.3,
-                 grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17), splits_indices=None):
+                 grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17), splits_indices=None,
+                 backend='thread'):
 
         super(RegionBasedRepHoldOutDualSVM, self).__init__(input.CAPSRegionBasedInput,
                                                            validation.RepeatedHoldOut,
@@ -76,7 +79,8 @@ class RegionBasedRepHoldOutLogisticRegression(base.MLWorkflow):
 
     def __init__(self, caps_directory, subjects_visits_tsv, diagnoses_tsv, group_label, image_type, atlas,
                  output_dir, pvc=None, n_threads=15, n_iterations=100, test_size=0.3,
-                 grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17), splits_indices=None):
+                 grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17), splits_indices=None,
+                 backend='thread'):
 
         super(RegionBasedRepHoldOutLogisticRegression, self).__init__(input.CAPSRegionBasedInput,
                                                                       validation.RepeatedHoldOut,
@@ -91,7 +95,7 @@ class RegionBasedRepHoldOutRandomForest(base.MLWorkflow):
                  output_dir, pvc=None, n_threads=15, n_iterations=100, test_size=0.3,
                  grid_search_folds=10, balanced=True, n_estimators_range=(100, 200, 400),
                  max_depth_range=[None], min_samples_split_range=[2],
-                 max_features_range=('auto', 0.25, 0.5), splits_indices=None):
+                 max_features_range=('auto', 0.25, 0.5), splits_indices=None, backend='thread'):
 
         super(RegionBasedRepHoldOutRandomForest, self).__init__(input.CAPSRegionBasedInput,
                                                                 validation.RepeatedHoldOut,
@@ -104,7 +108,8 @@ class RegionBasedLearningCurveRepHoldOutDualSVM(base.MLWorkflow):
 
     def __init__(self, caps_directory, subjects_visits_tsv, diagnoses_tsv, group_label, image_type,  atlas,
                  output_dir, pvc=None, precomputed_kernel=None, n_threads=15, n_iterations=100, test_size=0.3,
-                 n_learning_points=10, grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17)):
+                 n_learning_points=10, grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17),
+                 backend='thread'):
 
         super(RegionBasedLearningCurveRepHoldOutDualSVM, self).__init__(input.CAPSRegionBasedInput,
                                                                         validation.LearningCurveRepeatedHoldOut,
@@ -118,7 +123,7 @@ class VoxelBasedLearningCurveRepHoldOutDualSVM(base.MLWorkflow):
     def __init__(self, caps_directory, subjects_visits_tsv, diagnoses_tsv, group_label, image_type, output_dir, fwhm=0,
                  modulated="on", pvc=None, precomputed_kernel=None, mask_zeros=True, n_threads=15, n_iterations=100,
                  test_size=0.3, n_learning_points=10, grid_search_folds=10, balanced=True,
-                 c_range=np.logspace(-6, 2, 17)):
+                 c_range=np.logspace(-6, 2, 17), memmap_directory=None, kernel_cache_directory=None, backend='thread'):
 
         super(VoxelBasedLearningCurveRepHoldOutDualSVM, self).__init__(input.CAPSVoxelBasedInput,
                                                                        validation.LearningCurveRepeatedHoldOut,
@@ -131,7 +136,8 @@ class RegionBasedRepKFoldDualSVM(base.MLWorkflow):
 
     def __init__(self, caps_directory, subjects_visits_tsv, diagnoses_tsv, group_label, image_type,  atlas,
                  output_dir, pvc=None, n_threads=15, n_iterations=100, test_size=0.3, n_folds=10,
-                 grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17), splits_indices=None):
+                 grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17), splits_indices=None,
+                 backend='thread'):
 
         super(RegionBasedRepKFoldDualSVM, self).__init__(input.CAPSRegionBasedInput,
                                                          validation.RepeatedKFoldCV,
@@ -144,7 +150,8 @@ class CAPSTsvRepHoldOutDualSVM(base.MLWorkflow):
 
     def __init__(self, caps_directory, subjects_visits_tsv, diagnoses_tsv, group_label, image_type,  atlas, dataset,
                  output_dir, pvc=None, n_threads=15, n_iterations=100, test_size=0.3,
-                 grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17), splits_indices=None):
+                 grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17), splits_indices=None,
+                 backend='thread'):
 
         super(CAPSTsvRepHoldOutDualSVM, self).__init__(input.CAPSTSVBasedInput,
                                                        validation.RepeatedHoldOut,
@@ -158,7 +165,7 @@ class CAPSTsvRepHoldOutRandomForest(base.MLWorkflow):
                  output_dir, pvc=None, n_threads=15, n_iterations=100, test_size=0.3,
                  grid_search_folds=10, balanced=True, n_estimators_range=(100, 200, 400),
                  max_depth_range=[None], min_samples_split_range=[2],
-                 max_features_range=('auto', 0.25, 0.5), splits_indices=None):
+                 max_features_range=('auto', 0.25, 0.5), splits_indices=None, backend='thread'):
 
         super(CAPSTsvRepHoldOutRandomForest, self).__init__(input.CAPSTSVBasedInput,
                                                             validation.RepeatedHoldOut,
@@ -175,7 +182,7 @@ class VoxelBasedREGRepKFoldDualSVM(base.MLWorkflow):
                  modulated="on", pvc=None, precomputed_kernel=None, mask_zeros=True, n_threads=15, n_iterations=100,
                  n_folds=10,
                  test_size=0.1, grid_search_folds=10, balanced=True, c_range=np.logspace(-6, 2, 17),
-                 splits_indices=None):
+                 splits_indices=None, backend='thread'):
 
         super(VoxelBasedREGRepKFoldDualSVM, self).__init__(input.CAPSTSVBasedInput,
                                                            validation.RepeatedKFoldCV,
@@ -191,7 +198,7 @@ class TsvRepHoldOutRandomForest(base.MLWorkflow):
     def __init__(self, data_tsv, columns, output_dir, n_threads=20, n_iterations=250, test_size=0.2,
                  grid_search_folds=10, balanced=True, n_estimators_range=(100, 200, 400), max_depth_range=[None],
                  min_samples_split_range=[2], max_features_range=('auto', 0.25, 0.5), splits_indices=None,
-                 inner_cv=False):
+                 inner_cv=False, backend='thread'):
 
         super(TsvRepHoldOutRandomForest, self).__init__(input.TsvInput,
                                                         validation.RepeatedHoldOut,
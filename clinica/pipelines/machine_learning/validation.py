@@ -18,19 +18,8 @@ class KFoldCV(base.MLValidation):
             skf = StratifiedKFold(n_splits=self._validation_params['n_folds'], shuffle=True)
             self._validation_params['splits_indices'] = list(skf.split(np.zeros(len(y)), y))
 
-        async_pool = ThreadPool(self._validation_params['n_threads'])
-        async_result = {}
-
-        for i in range(self._validation_params['n_folds']):
-
-            train_index, test_index = self._validation_params['splits_indices'][i]
-            async_result[i] = async_pool.apply_async(self._ml_algorithm.evaluate, (train_index, test_index))
-
-        async_pool.close()
-        async_pool.join()
-
-        for i in range(self._validation_params['n_folds']):
-            self._validation_results.append(async_result[i].get())
+        self._validation_results = self.run_evaluations(
+            self._ml_algorithm.evaluate, self._validation_params['splits_indices'][:self._validation_params['n_folds']])
 
         self._classifier, self._best_params = self._ml_algorithm.apply_best_parameters(self._validation_results)
 
@@ -97,6 +86,7 @@ class KFoldCV(base.MLValidation):
 
         parameters_dict = {'n_folds': 10,
                            'n_threads': 15,
+                           'backend': 'thread',
                            'splits_indices': None,
                            'inner_cv': True}
 
@@ -114,32 +104,14 @@ class RepeatedKFoldCV(base.MLValidation):
                 skf = StratifiedKFold(n_splits=self._validation_params['n_folds'], shuffle=True)
                 self._validation_params['splits_indices'].append(list(skf.split(np.zeros(len(y)), y)))
 
-        async_pool = ThreadPool(self._validation_params['n_threads'])
-        async_result = {}
-
-        for i in range(self._validation_params['n_iterations']):
-
-            train_index, test_index = self._validation_params['splits_indices'][i]
-            async_result[i] = async_pool.apply_async(self._ml_algorithm.evaluate, (train_index, test_index))
-
-        for r in range(self._validation_params['n_iterations']):
-
-            async_result[r] = {}
-            self._validation_results.append([])
-
-            for i in range(self._validation_params['n_folds']):
-
-                train_index, test_index = self._validation_params['splits_indices'][r][i]
-                async_result[r][i] = async_pool.apply_async(self._ml_algorithm.evaluate, (train_index, test_index))
-
-        async_pool.close()
-        async_pool.join()
-        for r in range(self._validation_params['n_iterations']):
-            for i in range(self._validation_params['n_folds']):
-                self._validation_results[r].append(async_result[r][i].get())
+        n_iterations = self._validation_params['n_iterations']
+        n_folds = self._validation_params['n_folds']
+        flat_results = self.run_evaluations(self._ml_algorithm.evaluate,
+                                            [self._validation_params['splits_indices'][r][i]
+                                             for r in range(n_iterations) for i in range(n_folds)])
+        self._validation_results = [flat_results[r * n_folds:(r + 1) * n_folds] for r in range(n_iterations)]
 
         # TODO Find a better way to estimate best parameter
-        flat_results = [result for fold in self._validation_results for result in fold]
         self._classifier, self._best_params = self._ml_algorithm.apply_best_parameters(flat_results)
 
         return self._classifier, self._best_params, self._validation_results
@@ -231,6 +203,7 @@ class RepeatedKFoldCV(base.MLValidation):
         parameters_dict = {'n_iterations': 100,
                            'n_folds': 10,
                            'n_threads': 15,
+                           'backend': 'thread',
                            'splits_indices': None,
                            'inner_cv': True}
 
@@ -246,22 +219,12 @@ class RepeatedHoldOut(base.MLValidation):
                                             test_size=self._validation_params['test_size'])
             self._validation_params['splits_indices'] = list(splits.split(np.zeros(len(y)), y))
 
-        async_pool = ThreadPool(self._validation_params['n_threads'])
-        async_result = {}
-
-        for i in range(self._validation_params['n_iterations']):
-
-            train_index, test_index = self._validation_params['splits_indices'][i]
-            if self._validation_params['inner_cv']:
-                async_result[i] = async_pool.apply_async(self._ml_algorithm.evaluate, (train_index, test_index))
-            else:
-                async_result[i] = async_pool.apply_async(self._ml_algorithm.evaluate_no_cv, (train_index, test_index))
-
-        async_pool.close()
-        async_pool.join()
-
-        for i in range(self._validation_params['n_iterations']):
-            self._validation_results.append(async_result[i].get())
+        if self._validation_params['inner_cv']:
+            evaluate_function = self._ml_algorithm.evaluate
+        else:
+            evaluate_function = self._ml_algorithm.evaluate_no_cv
+        self._validation_results = self.run_evaluations(
+            evaluate_function, self._validation_params['splits_indices'][:self._validation_params['n_iterations']])
 
         self._classifier, self._best_params = self._ml_algorithm.apply_best_parameters(self._validation_results)
         return self._classifier, self._best_params, self._validation_results
@@ -348,6 +311,7 @@ class RepeatedHoldOut(base.MLValidation):
         parameters_dict = {'n_iterations': 100,
                            'test_size': 0.2,
                            'n_threads': 15,
+                           'backend': 'thread',
                            'splits_indices': None,
                            'inner_cv': True}
 
@@ -363,31 +327,23 @@ class LearningCurveRepeatedHoldOut(base.MLValidation):
                                             test_size=self._validation_params['test_size'])
             self._validation_params['splits_indices'] = list(splits.split(np.zeros(len(y)), y))
 
-        async_pool = ThreadPool(self._validation_params['n_threads'])
-        async_result = {}
-
-        for i in range(self._validation_params['n_iterations']):
+        n_iterations = self._validation_params['n_iterations']
+        n_learning_points = self._validation_params['n_learning_points']
+        list_indices = []
+        for i in range(n_iterations):
             train_index, test_index = self._validation_params['splits_indices'][i]
-            async_result[i] = {}
 
-            skf = StratifiedKFold(n_splits=self._validation_params['n_learning_points'], shuffle=False)
+            skf = StratifiedKFold(n_splits=n_learning_points, shuffle=False)
             inner_cv_splits = list(skf.split(np.zeros(len(y[train_index])), y[train_index]))
 
-            for j in range(self._validation_params['n_learning_points']):
+            for j in range(n_learning_points):
                 inner_train_index = np.concatenate([indexes[1] for indexes in
                                                     inner_cv_splits[:j + 1]]).ravel()
-                async_result[i][j] = async_pool.apply_async(self._ml_algorithm.evaluate,
-                                                            (train_index[inner_train_index], test_index))
-
-        async_pool.close()
-        async_pool.join()
-
-        for j in range(self._validation_params['n_learning_points']):
-            learning_point_results = []
-            for i in range(self._validation_params['n_iterations']):
-                learning_point_results.append(async_result[i][j].get())
+                list_indices.append((train_index[inner_train_index], test_index))
 
-            self._validation_results.append(learning_point_results)
+        flat_results = self.run_evaluations(self._ml_algorithm.evaluate, list_indices)
+        for j in range(n_learning_points):
+            self._validation_results.append([flat_results[i * n_learning_points + j] for i in range(n_iterations)])
 
         self._classifier = []
         self._best_params = []
@@ -465,6 +421,7 @@ class LearningCurveRepeatedHoldOut(base.MLValidation):
                            'test_size': 0.2,
                            'n_learning_points': 10,
                            'n_threads': 15,
+                           'backend': 'thread',
                            'splits_indices': None,
                            'inner_cv': True}
 
@@ -75,6 +75,102 @@ def load_data(image_list, mask=True):
     return data, shape, data_mask
 
 
+def load_data_memmap(image_list, memmap_file, mask=True, n_threads=1):
+    """Load images into a float32 matrix memory-mapped on disk.
+
+    Contrary to load_data, the unmasked data of all the images are never held in memory: a first pass over the
+    images computes the mask of the voxels which are non-zero in at least one image, then a second pass writes
+    the masked images row by row into a .npy file opened as a numpy.memmap. Peak memory is a few images
+    whatever the number of subjects.
+
+    The matrix is updated incrementally: the signatures of the images (see ml_utils.get_images_signatures) and the
+    mask are saved next to memmap_file, and the rows of images already present in a previous memmap_file are copied
+    from it instead of loading the NIfTI files again. In this case, the mask is the union of the previous mask and of
+    the mask of the new images.
+
+    Args:
+        image_list: list of NIfTI filenames
+        memmap_file: .npy file where the (n_images x n_features) matrix is written
+        mask: if True, voxels which are zero in all the images are removed
+        n_threads: number of threads used to load the images
+
+    Returns:
+        data: numpy.memmap of shape (n_images x n_features)
+        shape: shape of the images
+        data_mask: 1d boolean array of the voxels kept (None if mask is False)
+    """
+    import os
+    from multiprocessing.pool import ThreadPool
+    from clinica.pipelines.machine_learning.ml_utils import get_images_signatures, load_images_signatures, \
+        save_images_signatures
+
+    def load_image(image):
+        return np.nan_to_num(np.asarray(nib.load(image).dataobj, dtype=np.float32).flatten())
+
+    shape = nib.load(image_list[0]).shape
+    data_mask = None
+    n_features = int(np.prod(shape))
+
+    signatures_file = memmap_file[:-len('.npy')] + '_images.txt'
+    mask_file = memmap_file[:-len('.npy')] + '_mask.npy'
+    signatures = get_images_signatures(image_list)
+
+    # Rows of the images already present in a previous matrix
+    previous_rows = {}
+    previous_data = None
+    previous_mask = None
+    if os.path.exists(memmap_file) and os.path.exists(signatures_file) and os.path.exists(mask_file) == mask:
+        previous_rows = {signature: i for i, signature in enumerate(load_images_signatures(signatures_file))}
+        previous_data = np.load(memmap_file, mmap_mode='r')
+        if mask:
+            previous_mask = np.load(mask_file)
+        if previous_data.shape[0] != len(previous_rows) or \
+                (mask and previous_mask.shape[0] != n_features) or \
+                (not mask and previous_data.shape[1] != n_features):
+            previous_rows, previous_data, previous_mask = {}, None, None
+    new_images = [image for image, signature in zip(image_list, signatures) if signature not in previous_rows]
+
+    pool = ThreadPool(n_threads)
+    try:
+        if mask:
+            data_mask = np.zeros(n_features, dtype=bool) if previous_mask is None else previous_mask.copy()
+            for subj_data in pool.imap(load_image, new_images):
+                data_mask |= subj_data != 0
+            n_features = int(data_mask.sum())
+            if previous_mask is not None:
+                # Position of the previous features among the new ones
+                previous_columns = np.searchsorted(np.flatnonzero(data_mask), np.flatnonzero(previous_mask))
+
+        tmp_file = memmap_file[:-len('.npy')] + '_tmp.npy'
+        data = np.lib.format.open_memmap(tmp_file, mode='w+', dtype=np.float32,
+                                         shape=(len(image_list), n_features))
+        new_data = pool.imap(load_image, new_images)
+        for i, signature in enumerate(signatures):
+            if signature in previous_rows:
+                if mask:
+                    data[i, :] = 0
+                    data[i, previous_columns] = previous_data[previous_rows[signature]]
+                else:
+                    data[i, :] = previous_data[previous_rows[signature]]
+            else:
+                subj_data = next(new_data)
+                data[i, :] = subj_data[data_mask] if mask else subj_data
+        data.flush()
+    finally:
+        pool.close()
+        pool.join()
+
+    del data, previous_data
+    os.replace(tmp_file, memmap_file)
+    save_images_signatures(signatures, signatures_file)
+    if mask:
+        np.save(mask_file, data_mask)
+    elif os.path.exists(mask_file):
+        os.remove(mask_file)
+
+    return np.load(memmap_file, mmap_mode='r'), shape, data_mask
+
+
 def revert_mask(weights, mask, shape):
     """
 
@@ -63,6 +63,7 @@ class SpatialSVMCLI(ce.CmdParser):
             'pet_tracer': args.pet_tracer,
             'no_pvc': args.no_pvc,
             'fwhm': args.fwhm,
+            'n_procs': args.n_procs,
         }
         pipeline = SpatialSVM(
             caps_directory=self.absolute_path(args.caps_directory),
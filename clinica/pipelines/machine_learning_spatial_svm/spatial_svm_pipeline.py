@@ -15,6 +15,7 @@ class SpatialSVM(cpe.Pipeline):
     def check_pipeline_parameters(self):
         """Check pipeline parameters."""
         from clinica.utils.group import check_group_label
+        from clinica.utils.resources import get_available_cpus, get_default_n_procs
 
         if 'group_label' not in self.parameters.keys():
             raise KeyError('Missing compulsory group_label key in pipeline parameter.')
@@ -26,6 +27,10 @@ class SpatialSVM(cpe.Pipeline):
             self.parameters['pet_tracer'] = 'fdg'
         if 'no_pvc' not in self.parameters.keys():
             self.parameters['no_pvc'] = False
+        if self.parameters.get('n_procs') is None:
+            self.parameters['n_procs'] = get_default_n_procs()
+        # The images are diffused by n_procs processes, which cannot be more than the CPUs given to Clinica
+        self.parameters['n_procs'] = max(min(self.parameters['n_procs'], get_available_cpus()), 1)
 
         check_group_label(self.parameters['group_label'])
 
@@ -141,30 +146,37 @@ class SpatialSVM(cpe.Pipeline):
         """Build and connect the core nodes of the pipeline.
         """
 
+        import os
         import clinica.pipelines.machine_learning_spatial_svm.spatial_svm_utils as utils
         import nipype.interfaces.utility as nutil
         import nipype.pipeline.engine as npe
         import nipype.interfaces.io as nio
 
-        fisher_tensor_generation = npe.Node(name="obtain_g_fisher_tensor",
-                                            interface=nutil.Function(input_names=['dartel_input', 'FWHM'],
-                                                                     output_names=['fisher_tensor', 'fisher_tensor_path'],
-                                                                     function=utils.obtain_g_fisher_tensor))
-        fisher_tensor_generation.inputs.FWHM = self.parameters['fwhm']
-
-        time_step_generation = npe.Node(name='estimation_time_step',
-                                        interface=nutil.Function(input_names=['dartel_input', 'FWHM', 'g'],
-                                                                 output_names=['t_step', 'json_file'],
-                                                                 function=utils.obtain_time_step_estimation))
-        time_step_generation.inputs.FWHM = self.parameters['fwhm']
-
-        heat_solver_equation = npe.MapNode(name='heat_solver_equation',
-                                           interface=nutil.Function(input_names=['input_image', 'g',
-                                                                                 'FWHM', 't_step', 'dartel_input'],
-                                                                    output_names=['regularized_image'],
-                                                                    function=utils.heat_solver_equation),
-                                           iterfield=['input_image'])
+        # The Fisher tensor, the heat operator and the time step only depend on the DARTEL template and the FWHM:
+        # they are computed once per group, and reused from the CAPS group folder by the next runs
+        heat_operator = npe.Node(name="obtain_heat_operator",
+                                 interface=nutil.Function(input_names=['dartel_input', 'FWHM',
+                                                                       'cache_directory', 'cache_prefix'],
+                                                          output_names=['fisher_tensor_path', 'detg_path',
+                                                                        'ginv_path', 't_step', 'json_file'],
+                                                          function=utils.obtain_heat_operator))
+        heat_operator.inputs.FWHM = self.parameters['fwhm']
+        heat_operator.inputs.cache_directory = os.path.join(self.caps_directory, 'groups',
+                                                            'group-' + self.parameters['group_label'],
+                                                            'machine_learning', 'input_spatial_svm')
+        heat_operator.inputs.cache_prefix = 'group-' + self.parameters['group_label'] + '_space-Ixi549Space'
+
+        # All the images are diffused by batched time-stepping loops, split across n_procs processes
+        heat_solver_equation = npe.Node(name='heat_solver_equation',
+                                        interface=nutil.Function(input_names=['input_image', 'detg_path',
+                                                                              'ginv_path', 'FWHM', 't_step',
+                                                                              'dartel_input', 'n_procs'],
+                                                                 output_names=['regularized_image'],
+                                                                 function=utils.heat_solver_equation_batch))
         heat_solver_equation.inputs.FWHM = self.parameters['fwhm']
+        heat_solver_equation.inputs.n_procs = self.parameters['n_procs']
+        # MultiProc accounts for the processes forked by the node
+        heat_solver_equation.n_procs = self.parameters['n_procs']
 
         datasink = npe.Node(nio.DataSink(),
                             name='sinker')
@@ -172,7 +184,7 @@ class SpatialSVM(cpe.Pipeline):
         datasink.inputs.parameterization = True
         if self.parameters['orig_input_data'] == 't1-volume':
             datasink.inputs.regexp_substitutions = [
-                (r'(.*)/regularized_image/.*/(.*(sub-(.*)_ses-(.*))_T1w(.*)_probability(.*))$',
+                (r'(.*)/regularized_image/(?:.*/)?(.*(sub-(.*)_ses-(.*))_T1w(.*)_probability(.*))$',
                  r'\1/subjects/sub-\4/ses-\5/machine_learning/input_spatial_svm/group-' + self.parameters[
                      'group_label'] + r'/\3_T1w\6_spatialregularization\7'),
 
@@ -187,7 +199,7 @@ class SpatialSVM(cpe.Pipeline):
 
         elif self.parameters['orig_input_data'] == 'pet-volume':
             datasink.inputs.regexp_substitutions = [
-                (r'(.*)/regularized_image/.*/(.*(sub-(.*)_ses-(.*))_(task.*)_pet(.*))$',
+                (r'(.*)/regularized_image/(?:.*/)?(.*(sub-(.*)_ses-(.*))_(task.*)_pet(.*))$',
                  r'\1/subjects/sub-\4/ses-\5/machine_learning/input_spatial_svm/group-' + self.parameters[
                      'group_label'] + r'/\3_\6_spatialregularization\7'),
                 (r'(.*)json_file/(output_data.json)$',
@@ -201,16 +213,15 @@ class SpatialSVM(cpe.Pipeline):
         # Connection
         # ==========
         self.connect([
-            (self.input_node,      fisher_tensor_generation,    [('dartel_input',    'dartel_input')]),
-            (fisher_tensor_generation,      time_step_generation,    [('fisher_tensor',    'g')]),
+            (self.input_node, heat_operator, [('dartel_input', 'dartel_input')]),
 
-            (self.input_node, time_step_generation, [('dartel_input', 'dartel_input')]),
             (self.input_node, heat_solver_equation, [('input_image', 'input_image')]),
-            (fisher_tensor_generation, heat_solver_equation, [('fisher_tensor', 'g')]),
-            (time_step_generation, heat_solver_equation, [('t_step', 't_step')]),
+            (heat_operator, heat_solver_equation, [('detg_path', 'detg_path')]),
+            (heat_operator, heat_solver_equation, [('ginv_path', 'ginv_path')]),
+            (heat_operator, heat_solver_equation, [('t_step', 't_step')]),
             (self.input_node, heat_solver_equation, [('dartel_input', 'dartel_input')]),
 
-            (fisher_tensor_generation, datasink, [('fisher_tensor_path', 'fisher_tensor_path')]),
-            (time_step_generation, datasink, [('json_file', 'json_file')]),
+            (heat_operator, datasink, [('fisher_tensor_path', 'fisher_tensor_path')]),
+            (heat_operator, datasink, [('json_file', 'json_file')]),
             (heat_solver_equation, datasink, [('regularized_image', 'regularized_image')])
         ])
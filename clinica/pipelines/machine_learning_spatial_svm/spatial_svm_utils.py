@@ -88,21 +88,14 @@ def rescaleImage(image1, p):
 def tensor_scalar_product(sc, g1):
     """
 
-    :param sc: scalar
+    :param sc: scalar, or scalar field of the dimension of the tensor field (xg*yg*zg)
     :param g1: 3 * 3 tensor
     :return: product between the tensor and the scalar
     """
     import numpy as np
-    # we define the scalar and the tensor as complex
 
-    sc = np.array(sc, dtype=np.complex128)
-    g1 = np.array(g1, dtype=np.complex128)
-    g = np.zeros(g1.shape, dtype=np.complex128)  # new vector
-
-    for i in range(g1.shape[0]):
-        for j in range(g1.shape[1]):
-            for k in range(g1.shape[0]):
-                g[i][j] = g1[i][j] * sc
+    # the scalar (field) is broadcast on each component of the tensor, the dtype of the inputs is kept
+    g = np.asarray(g1) * np.asarray(sc)
 
     # g is the final tensor
     return g
@@ -148,18 +141,10 @@ def tensor_product(g1, g2):
     :return: product between the two tensors
     """
     import numpy as np
-    g1 = np.array(g1)
-    g2 = np.array(g2)
-
-    g = np.zeros(g1.shape)
 
-    for i in range(g1.shape[0]):
-        for j in range(g2.shape[0]):
-            g[i][j] = 0
-            for k in range(g1.shape[0]):
-                g[i][j] = g[i][j] + np.multiply(g1[i][k], g2[k][j])
+    # g = g1 * g2 (dim of the tensor: 3*3*xg*yg*zg), matrix product at each voxel
+    g = np.einsum('ik...,kj...->ij...', np.asarray(g1), np.asarray(g2))
 
-    # g = g1 * g2 (dim of the tensor: 3*3*xg*yg*zg)
     return g
 
 
@@ -170,50 +155,23 @@ def tensor_determinant(g):
     :return: determinant of the tensor dim = xg*yg*zg
     """
     import numpy as np
-    import clinica.pipelines.machine_learning_spatial_svm.spatial_svm_utils as utils
 
-    g = np.array(g)
-    d = 0
+    g = np.asarray(g)
     s = g.shape
-    # recursive function we have a matrix of 3*3 and then we divide it in different blocks of 2*2 and we calculate the determinant
-    # of them making a um of the different determinants. The resulting determinant it's a sum of the different blocks.
+    # closed-form determinant computed at each voxel
     if s[0] == 3:
-        # if the tensor is 3*3
-
-        for i in range(s[0]):
-
-            if np.mod(i, 2) == 0:
-                epsilon = 1
-            else:
-                epsilon = -1
-
-            if i == 0:
-                g1 = [[g[1][1], g[1][2]], [g[2][1], g[2][2]]]
-            elif i == 1:
-                g1 = [[g[0][1], g[0][2]], [g[2][1], g[2][2]]]
-            else:
-                g1 = [[g[0][1], g[0][2]], [g[1][1], g[1][2]]]
-            # it's a recursive function
-            prod = epsilon * g[i][0] * utils.tensor_determinant(g1)
-            d = d + prod
+        # if the tensor is 3*3, expansion along the first column
+        d = (g[0, 0] * (g[1, 1] * g[2, 2] - g[1, 2] * g[2, 1])
+             - g[1, 0] * (g[0, 1] * g[2, 2] - g[0, 2] * g[2, 1])
+             + g[2, 0] * (g[0, 1] * g[1, 2] - g[0, 2] * g[1, 1]))
 
     elif s[0] == 2:
         # if the tensor is 2*2
-        for i in range(s[0]):
-            if np.mod(i, 2) == 0:
-                epsilon = 1
-            else:
-                epsilon = -1
-            if i == 0:
-                g1 = [g[1][1]]
-            elif i == 1:
-                g1 = [g[0][1]]
-            prod = epsilon * g[i][0] * utils.tensor_determinant(g1)
-            d = d + prod
-
-    elif s[0] == 1:
+        d = g[0, 0] * g[1, 1] - g[1, 0] * g[0, 1]
+
+    else:
         # if the tensor is 1 matrix
-        d = [g[0]]
+        d = g[0]
     return d
 
 
@@ -307,39 +265,20 @@ def roots_poly(C):
 def tensor_eigenvalues(g):
     """
 
-    :param g: tensor
+    :param g: symmetric tensor
     :return: eigenvalues of the tensor
 
     """
     import numpy as np
-    import clinica.pipelines.machine_learning_spatial_svm.spatial_svm_utils as utils
-    g = np.array(g)
 
-    if g.shape[0] < 4:
-        # condition if we have a tensor
+    g = np.real(np.asarray(g))
 
-        C1 = np.ones(len(np.ravel(g[0][0])))
-        buff = -utils.tensor_trace(g)
-        C2 = buff.flatten('F')
-        buff = utils.tensor_trace(utils.tensor_product(g, g))
-        buff = (- 0.5 * (buff.flatten('F') - np.multiply(C2, C2)))
-        C3 = buff.flatten('F')
-        buff = -utils.tensor_determinant(g)
-        C4 = buff.flatten('F')
-
-        C = np.array([C1, C2, C3, C4])
-        rts = utils.roots_poly(C)
-
-    else:
+    if g.shape[0] >= 4:
         print('Degree too big : not still implemented')
 
-    rts2 = rts.real.copy()
-    rts2.sort()
-
-    lamb = np.zeros(shape=(g.shape[0], g.shape[2], g.shape[3], g.shape[4]), dtype='complex128')
-
-    for i in range(g.shape[0]):
-        lamb[i, :, :, :] = rts2[:, i].reshape(g.shape[2], g.shape[3], g.shape[4], order='F')
+    # eigenvalues of the symmetric matrix of each voxel, sorted in ascending order
+    lamb = np.linalg.eigvalsh(np.moveaxis(g, [0, 1], [-2, -1]))
+    lamb = np.moveaxis(lamb, -1, 0)
 
     # lamb[0] is the smallest eigenvalues, lamb[2] is the biggest
     return lamb
@@ -353,12 +292,8 @@ def tensor_transpose(g):
     """
     import numpy as np
 
-    g = np.array(g)
-    tg = np.array(g)
-    for i in range(g.shape[0]):
-        for j in range(g.shape[0]):
-            tg[i][j] = g[j][i]
     # tg is the transposed tensor
+    tg = np.array(np.swapaxes(np.asarray(g), 0, 1))
     return tg
 
 
@@ -368,52 +303,17 @@ def tensor_commatrix(g):
     :param g: tensor
     :return: commatrix of the tensor
     """
-    import clinica.pipelines.machine_learning_spatial_svm.spatial_svm_utils as utils
-
     import numpy as np
-    g = np.array(g)
-    g_com = []
 
-    for i in range(g.shape[0]):
-        for j in range(g.shape[0]):
-            if np.mod(i + j, 2) == 0:
-                epsilon = 1
-            else:
-                epsilon = -1
-            if i == 0:
-                if j == 0:
-                    n = [[g[1][1], g[1][2]], [g[2][1], g[2][2]]]
-                    a0 = epsilon * utils.tensor_determinant(n)
-                elif j == 1:
-                    n = [[g[1][0], g[1][2]], [g[2][0], g[2][2]]]
-                    a1 = epsilon * utils.tensor_determinant(n)
-                else:
-                    n = [[g[1][0], g[1][1]], [g[2][0], g[2][1]]]
-                    a2 = epsilon * utils.tensor_determinant(n)
-            elif i == 1:
-                if j == 0:
-                    n = [[g[0][1], g[0][2]], [g[2][1], g[2][2]]]
-                    b0 = epsilon * utils.tensor_determinant(n)
-                elif j == 1:
-                    n = [[g[0][0], g[0][2]], [g[2][0], g[2][2]]]
-                    b1 = epsilon * utils.tensor_determinant(n)
-                else:
-                    n = [[g[0][0], g[0][1]], [g[2][0], g[2][1]]]
-                    b2 = epsilon * utils.tensor_determinant(n)
-            else:
-                if j == 0:
-                    n = [[g[0][1], g[0][2]], [g[1][1], g[1][2]]]
-                    c0 = epsilon * utils.tensor_determinant(n)
-                elif j == 1:
-                    n = [[g[0][0], g[0][2]], [g[1][0], g[1][2]]]
-                    c1 = epsilon * utils.tensor_determinant(n)
-                else:
-                    n = [[g[0][0], g[0][1]], [g[1][0], g[1][1]]]
-                    c2 = epsilon * utils.tensor_determinant(n)
-    g_com = [[a0, a1, a2], [b0, b1, b2], [c0, c1, c2]]
-    g_com = np.array(g_com)
-    if len(g_com.shape) == 6:
-        g_com = g_com[:, :, 0, :, :, :]
+    g = np.asarray(g)
+    g_com = np.empty_like(g)
+
+    # with cyclic indices, the sign (-1)^(i+j) of the cofactor is given by the order of the rows and columns
+    for i in range(3):
+        i1, i2 = (i + 1) % 3, (i + 2) % 3
+        for j in range(3):
+            j1, j2 = (j + 1) % 3, (j + 2) % 3
+            g_com[i, j] = g[i1, j1] * g[i2, j2] - g[i1, j2] * g[i2, j1]
 
     return g_com
 
@@ -427,31 +327,19 @@ def create_fisher_tensor(atlas):
 
     # create tensor for fisher metrics
     import numpy as np
-    import math
 
     upper_bound = 0.999  # probabibilty limits to avoid log(0) and log(1)
     lower_bound = 0.001  # probability limits to avoid log(0) and log(1)
     epsilon = 1e-6  # regularization
 
-    n = atlas[0].shape
-
-    a = np.ones(atlas[0].shape)
-    b = np.zeros(atlas[0].shape)
-    X = [np.dot(a, epsilon), b, b]
-    Y = [b, np.dot(a, epsilon), b]
-    Z = [b, b, np.dot(a, epsilon)]
-
-    g = [X, Y, Z]
+    g = epsilon * np.array(tensor_eye(atlas))
 
     for i in range(3):  # for for each component of the tensor
-        proba = 1
-        proba = (proba * atlas[i])
-        proba = np.maximum(np.minimum(proba, upper_bound), lower_bound)
+        proba = np.maximum(np.minimum(atlas[i], upper_bound), lower_bound)
         gr = np.array(np.gradient(np.log(proba)))
 
-        for x in range(3):
-            for y in range(3):
-                g[x][y] = (g[x][y] + (proba * gr[x] * gr[y]))
+        # g[x][y] += proba * gr[x] * gr[y]
+        g += np.einsum('x...,y...->xy...', gr, gr) * proba
 
     return g
 
@@ -459,7 +347,7 @@ def create_fisher_tensor(atlas):
 def tensor_helmholtz(x, h, detg, k):
     """
 
-    :param x: 3D Array
+    :param x: 3D Array, or stack of 3D arrays (the last 3 axes are the spatial axes)
     :param h: sqrt(det(g)) * inverse(g)^2 -> g is he metric tensor of the 3D manifold M
     :param detg: sqrt(det(g))
     :param k: constant( 0 - gives laplacian)
@@ -468,7 +356,7 @@ def tensor_helmholtz(x, h, detg, k):
     """
 
     import numpy as np
-    detg = np.array(detg)
+    detg = np.asarray(detg)
     if len(detg.shape) == 3:
         detg_ = detg
     else:
@@ -495,7 +383,7 @@ def tensor_helmholtz(x, h, detg, k):
     weight = weight + 0.5 * mat_3[1:-1, 1:-1, :-2]
     weight = weight + 0.5 * mat_3[1:-1, 1:-1, 2:]
 
-    y0 = (weight * x[1:-1, 1:-1, 1:-1])
+    y0 = (weight * x[..., 1:-1, 1:-1, 1:-1])
 
     mat1 = h_[0][1]
     mat2 = h_[1][0]
@@ -504,25 +392,25 @@ def tensor_helmholtz(x, h, detg, k):
     mat5 = h_[0][2]
     mat6 = h_[2][0]
 
-    y0 = y0 + (-1 * -1 * -0.25) * (mat1[:-2, 1:-1, 1: -1] + mat2[1:-1, :-2, 1:-1]) * x[:-2, :-2, 1:-1]
-    y0 = y0 + (-1 * -1 * -0.25) * (mat3[1:-1, :-2, 1: -1] + mat4[1:-1, 1:-1, :-2]) * x[1:-1, :-2, :-2]
-    y0 = y0 + (-1 * -1 * -0.25) * (mat5[:-2, 1:-1, 1: -1] + mat6[1:-1, 1:-1, :-2]) * x[:-2, 1:-1, :-2]
-    y0 = y0 + (-1 * +1 * -0.25) * (mat1[:-2, 1:-1, 1: -1] + mat2[1:-1, 2:, 1:-1]) * x[:-2, 2:, 1:-1]
-    y0 = y0 + (-1 * +1 * -0.25) * (mat3[1:-1, :-2, 1: -1] + mat4[1:-1, 1:-1, 2:]) * x[1:-1, :-2, 2:]
-    y0 = y0 + (-1 * +1 * -0.25) * (mat5[:-2, 1:-1, 1: -1] + mat6[1:-1, 1:-1, 2:]) * x[:-2, 1:-1, 2:]
-    y0 = y0 + (+1 * -1 * -0.25) * (mat1[2:, 1:-1, 1: -1] + mat2[1:-1, :-2, 1:-1]) * x[2:, :-2, 1:-1]
-    y0 = y0 + (+1 * -1 * -0.25) * (mat3[1:-1, 2:, 1: -1] + mat4[1:-1, 1:-1, :-2]) * x[1:-1, 2:, :-2]
-    y0 = y0 + (+1 * -1 * -0.25) * (mat5[2:, 1:-1, 1: -1] + mat6[1:-1, 1:-1, :-2]) * x[2:, 1:-1, :-2]
-    y0 = y0 + (+1 * +1 * -0.25) * (mat1[2:, 1:-1, 1: -1] + mat2[1:-1, 2:, 1:-1]) * x[2:, 2:, 1:-1]
-    y0 = y0 + (+1 * +1 * -0.25) * (mat3[1:-1, 2:, 1: -1] + mat4[1:-1, 1:-1, 2:]) * x[1:-1, 2:, 2:]
-    y0 = y0 + (+1 * +1 * -0.25) * (mat5[2:, 1:-1, 1: -1] + mat6[1:-1, 1:-1, 2:]) * x[2:, 1:-1, 2:]
-
-    y0 = y0 + (-0.5) * (mat_1[1:-1, 1:-1, 1:-1] + mat_1[:-2, 1:-1, 1:-1]) * x[:-2, 1:-1, 1:-1]
-    y0 = y0 + (-0.5) * (mat_1[1:-1, 1:-1, 1:-1] + mat_1[2:, 1:-1, 1:-1]) * x[2:, 1:-1, 1:-1]
-    y0 = y0 + (-0.5) * (mat_2[1:-1, 1:-1, 1:-1] + mat_2[1:-1, :-2, 1:-1]) * x[1:-1, :-2, 1:-1]
-    y0 = y0 + (-0.5) * (mat_2[1:-1, 1:-1, 1:-1] + mat_2[1:-1, 2:, 1:-1]) * x[1:-1, 2:, 1:-1]
-    y0 = y0 + (-0.5) * (mat_3[1:-1, 1:-1, 1:-1] + mat_3[1:-1, 1:-1, :-2]) * x[1:-1, 1:-1, :-2]
-    y0 = y0 + (-0.5) * (mat_3[1:-1, 1:-1, 1:-1] + mat_3[1:-1, 1:-1, 2:]) * x[1:-1, 1:-1, 2:]
+    y0 = y0 + (-1 * -1 * -0.25) * (mat1[:-2, 1:-1, 1: -1] + mat2[1:-1, :-2, 1:-1]) * x[..., :-2, :-2, 1:-1]
+    y0 = y0 + (-1 * -1 * -0.25) * (mat3[1:-1, :-2, 1: -1] + mat4[1:-1, 1:-1, :-2]) * x[..., 1:-1, :-2, :-2]
+    y0 = y0 + (-1 * -1 * -0.25) * (mat5[:-2, 1:-1, 1: -1] + mat6[1:-1, 1:-1, :-2]) * x[..., :-2, 1:-1, :-2]
+    y0 = y0 + (-1 * +1 * -0.25) * (mat1[:-2, 1:-1, 1: -1] + mat2[1:-1, 2:, 1:-1]) * x[..., :-2, 2:, 1:-1]
+    y0 = y0 + (-1 * +1 * -0.25) * (mat3[1:-1, :-2, 1: -1] + mat4[1:-1, 1:-1, 2:]) * x[..., 1:-1, :-2, 2:]
+    y0 = y0 + (-1 * +1 * -0.25) * (mat5[:-2, 1:-1, 1: -1] + mat6[1:-1, 1:-1, 2:]) * x[..., :-2, 1:-1, 2:]
+    y0 = y0 + (+1 * -1 * -0.25) * (mat1[2:, 1:-1, 1: -1] + mat2[1:-1, :-2, 1:-1]) * x[..., 2:, :-2, 1:-1]
+    y0 = y0 + (+1 * -1 * -0.25) * (mat3[1:-1, 2:, 1: -1] + mat4[1:-1, 1:-1, :-2]) * x[..., 1:-1, 2:, :-2]
+    y0 = y0 + (+1 * -1 * -0.25) * (mat5[2:, 1:-1, 1: -1] + mat6[1:-1, 1:-1, :-2]) * x[..., 2:, 1:-1, :-2]
+    y0 = y0 + (+1 * +1 * -0.25) * (mat1[2:, 1:-1, 1: -1] + mat2[1:-1, 2:, 1:-1]) * x[..., 2:, 2:, 1:-1]
+    y0 = y0 + (+1 * +1 * -0.25) * (mat3[1:-1, 2:, 1: -1] + mat4[1:-1, 1:-1, 2:]) * x[..., 1:-1, 2:, 2:]
+    y0 = y0 + (+1 * +1 * -0.25) * (mat5[2:, 1:-1, 1: -1] + mat6[1:-1, 1:-1, 2:]) * x[..., 2:, 1:-1, 2:]
+
+    y0 = y0 + (-0.5) * (mat_1[1:-1, 1:-1, 1:-1] + mat_1[:-2, 1:-1, 1:-1]) * x[..., :-2, 1:-1, 1:-1]
+    y0 = y0 + (-0.5) * (mat_1[1:-1, 1:-1, 1:-1] + mat_1[2:, 1:-1, 1:-1]) * x[..., 2:, 1:-1, 1:-1]
+    y0 = y0 + (-0.5) * (mat_2[1:-1, 1:-1, 1:-1] + mat_2[1:-1, :-2, 1:-1]) * x[..., 1:-1, :-2, 1:-1]
+    y0 = y0 + (-0.5) * (mat_2[1:-1, 1:-1, 1:-1] + mat_2[1:-1, 2:, 1:-1]) * x[..., 1:-1, 2:, 1:-1]
+    y0 = y0 + (-0.5) * (mat_3[1:-1, 1:-1, 1:-1] + mat_3[1:-1, 1:-1, :-2]) * x[..., 1:-1, 1:-1, :-2]
+    y0 = y0 + (-0.5) * (mat_3[1:-1, 1:-1, 1:-1] + mat_3[1:-1, 1:-1, 2:]) * x[..., 1:-1, 1:-1, 2:]
 
     return y0
 
@@ -533,13 +421,13 @@ def tensor_inverse(g):
     :param g: tensor
     :return: inverse of the tensor
     """
-    import clinica.pipelines.machine_learning_spatial_svm.spatial_svm_utils as utils
     import numpy as np
 
-    h = utils.tensor_transpose(utils.tensor_commatrix(g))
-    detg = utils.tensor_determinant(g)
+    h = tensor_transpose(tensor_commatrix(g))
+    detg = tensor_determinant(g)
 
-    h = h * (1 / (detg))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        h = h / detg
     mask = np.isnan(h)
     h[mask] = 0
     return h
@@ -548,7 +436,7 @@ def tensor_inverse(g):
 def operateur(x, ginv, detg):
     """
 
-    :param x:
+    :param x: 3D array, or stack of 3D arrays (e.g. subjects * xg * yg * zg)
     :param ginv:
     :param detg:
     :return:
@@ -556,11 +444,9 @@ def operateur(x, ginv, detg):
     import clinica.pipelines.machine_learning_spatial_svm.spatial_svm_utils as utils
     import numpy as np
 
-    if len(x.shape) == 4:
-        x = x[0, :, :, :]
-    y = np.zeros([x.shape[0] + 2, x.shape[1] + 2, x.shape[2] + 2])
-    y = np.array(y, dtype=np.complex_)
-    y[1:-1, 1:-1, 1:-1] = x
+    s = x.shape
+    y = np.zeros(s[:-3] + (s[-3] + 2, s[-2] + 2, s[-1] + 2), dtype=np.result_type(x, ginv))
+    y[..., 1:-1, 1:-1, 1:-1] = x
     y = utils.tensor_helmholtz(y, ginv, detg, 0)
 
     return y
@@ -578,7 +464,6 @@ def largest_eigenvalue_heat_3D_tensor2(g, h, epsilon):
     import clinica.pipelines.machine_learning_spatial_svm.spatial_svm_utils as utils
 
     import numpy as np
-    import cmath
 
     # parameters
     if epsilon is None:
@@ -586,45 +471,51 @@ def largest_eigenvalue_heat_3D_tensor2(g, h, epsilon):
     erreur = 1 + epsilon
 
     # tensors
-
-    detg = utils.tensor_determinant(g)
-    detg = np.array(detg, dtype=np.complex128)  # complex tensor
-    detg = np.sqrt(detg)
-    detg = detg[0]
-    ginv = utils.tensor_inverse(g)
-
-    if len(ginv.shape) == 6:
-        ginv = ginv[:, :, 0, :, :, :]
-
-    ginv = utils.tensor_scalar_product(detg, ginv)
+    g = np.real(np.asarray(g))
+    detg, ginv = utils.heat_tensors(g)
     detg2 = detg[1:-1, 1:-1, 1:-1]  # 141*121*141
-    detg2[np.isnan(detg2)] = 0
-    detg[np.isnan(detg)] = 0
-    ginv[np.isnan(ginv)] = 0
 
     # initialisation
 
     s = [g[0][0].shape[0] - 2, g[0][0].shape[1] - 2, g[0][0].shape[2] - 2]
     b1 = np.ones([s[0], s[1], s[2]])
-
-    b1 = np.divide(b1, np.array(cmath.sqrt(np.dot(b1.flatten('F').transpose(), b1.flatten('F'))), dtype=np.complex128))
+    b1 = b1 / np.linalg.norm(b1)
 
     print("Computation of the largest eigenvalue ...")
     while erreur > epsilon:
         b0 = b1
-        b2 = np.array(np.divide(np.array(utils.operateur(b1, ginv, detg)) * h, detg2) / h / h / h, dtype=np.complex128)
-        b1 = np.divide(b2, np.array(cmath.sqrt(np.dot(b2.flatten('F').transpose(), b2.flatten('F')))),
-                       dtype=np.complex128)
+        b2 = np.divide(utils.operateur(b1, ginv, detg) * h, detg2) / h / h / h
+        b1 = b2 / np.linalg.norm(b2)
 
-        erreur = np.linalg.norm(b1.flatten('F') - b0.flatten('F'))
+        erreur = np.linalg.norm(b1 - b0)
 
     print("done")
 
-    lam = (cmath.sqrt(np.dot(b2.flatten('F').transpose(), b2.flatten('F'))))
+    lam = np.linalg.norm(b2)
 
     return lam
 
 
+def heat_tensors(g, dtype=None):
+    """
+
+    :param g: metric tensor (3*3*xg*yg*zg)
+    :param dtype: dtype of the outputs (dtype of g if None)
+    :return: detg = sqrt(det(g)) and ginv = sqrt(det(g)) * inverse(g), the tensors used by the heat equation
+    """
+    import clinica.pipelines.machine_learning_spatial_svm.spatial_svm_utils as utils
+    import numpy as np
+
+    g = np.real(np.asarray(g))
+    detg = np.sqrt(utils.tensor_determinant(g))
+    ginv = utils.tensor_scalar_product(detg, utils.tensor_inverse(g))
+    if dtype is not None:
+        detg = detg.astype(dtype)
+        ginv = ginv.astype(dtype)
+
+    return detg, ginv
+
+
 def heat_finite_elt_3D_tensor2(x0, t_final, t_step, h, g):
     """
 
@@ -635,36 +526,49 @@ def heat_finite_elt_3D_tensor2(x0, t_final, t_step, h, g):
     :param g: metric tensor
     :return: vector x (at t = t_final)
 
+    The computation is done in the dtype of x0 (e.g. float32).
+
     """
     import clinica.pipelines.machine_learning_spatial_svm.spatial_svm_utils as utils
 
-    import numpy as np
     if len(x0.shape) == 4:
         x0 = x0[0, :, :, :]
 
+    # tensors
+    detg, ginv = utils.heat_tensors(g, dtype=x0.dtype)
+
+    return utils.heat_finite_elt_3D_batch(x0, t_final, t_step, h, detg, ginv)
+
+
+def heat_finite_elt_3D_batch(x0, t_final, t_step, h, detg, ginv):
+    """
+
+    :param x0: vector x (at t = 0), 3D array or stack of 3D arrays (subjects * xg * yg * zg)
+    :param t_final: time
+    :param t_step: time step (must satisfy the CFL max(lambda) < 2)
+    :param h:
+    :param detg: sqrt(det(g)) (see heat_tensors)
+    :param ginv: sqrt(det(g)) * inverse(g) (see heat_tensors)
+    :return: vector x (at t = t_final)
+
+    All the images of the stack are diffused by the same time-stepping loop.
+
+    """
+    import clinica.pipelines.machine_learning_spatial_svm.spatial_svm_utils as utils
+
+    import numpy as np
+
     # parameters
     nb_step = np.ceil(t_final / t_step)  # number of time step
     nb_step = nb_step.astype(int)
     t_step = t_final / nb_step
 
-    # tensors
-    detg = utils.tensor_determinant(g)
-    detg = np.sqrt(detg)
-    ginv = utils.tensor_inverse(g)
-    ginv = utils.tensor_scalar_product(detg, ginv)
-    detg2 = detg[:, 1:-1, 1:-1, 1:-1]
-    if len(ginv.shape) == 6:
-        ginv = ginv[:, :, 0, :, :, :]
-    if len(detg.shape) == 4:
-        detg = detg[0, :, :, :]
-    ginv = np.array(ginv.real, dtype='float64')
-    detg = np.array(detg.real, dtype='float64')
-    detg2 = np.array(detg2.real, dtype='float64')
+    detg2 = detg[1:-1, 1:-1, 1:-1]
 
     # LOOP
     x = x0
     for i in range(nb_step):
-        x = np.array(x - t_step * (np.divide(np.array(utils.operateur(x, ginv, detg)) * h, detg2)) / h / h / h)
+        x = x - t_step * (np.divide(utils.operateur(x, ginv, detg) * h, detg2)) / h / h / h
 
     return x
 
@@ -916,13 +820,126 @@ def obtain_time_step_estimation(dartel_input, FWHM, g):
     return t_step, os.path.abspath('./output_data.json')
 
 
-def heat_solver_equation(input_image, g, FWHM, t_step, dartel_input):
+def obtain_heat_operator(dartel_input, FWHM, cache_directory=None, cache_prefix=None):
+    """
+    Group-level quantities of the heat regularization (they only depend on the DARTEL template and the FWHM)
+    :param dartel_input: dartel template in MNI space
+    :param FWHM: mm of smoothing, defined by the user, default value = 4
+    :param cache_directory: folder where a previous run stored the fisher tensor and the json file of parameters
+    (input_spatial_svm folder of the CAPS group), None to always compute them
+    :param cache_prefix: prefix of these files (e.g. group-<label>_space-Ixi549Space)
+    :return: paths to the fisher tensor, to sqrt(det(g)) and to sqrt(det(g)) * inverse(g), the time step and the path
+    to the json file of parameters
+
+    The fisher tensor and the time step of a previous run are reused if they were computed with the same FWHM after
+    the last modification of the DARTEL template. All the quantities are written in the working directory of the node.
+    """
+    import clinica.pipelines.machine_learning_spatial_svm.spatial_svm_utils as utils
+
+    import json
     import math
+    import os
+    import shutil
+    import numpy as np
+
+    g = None
+    if cache_directory is not None:
+        cached_tensor = os.path.join(cache_directory, cache_prefix + '_gram.npy')
+        cached_json = os.path.join(cache_directory, cache_prefix + '_parameters.json')
+        if os.path.isfile(cached_tensor) and os.path.isfile(cached_json):
+            with open(cached_json, 'r') as f:
+                parameters = json.load(f)
+            template_mtime = os.stat(dartel_input).st_mtime
+            if (float(parameters.get('FWHM', -1)) == float(FWHM) and 'TimeStepMax' in parameters
+                    and min(os.stat(cached_tensor).st_mtime, os.stat(cached_json).st_mtime) >= template_mtime):
+                print("Reusing the fisher tensor and the time step of " + cache_directory)
+                fisher_tensor_path = os.path.abspath('./output_fisher_tensor.npy')
+                json_file = os.path.abspath('./output_data.json')
+                shutil.copyfile(cached_tensor, fisher_tensor_path)
+                shutil.copyfile(cached_json, json_file)
+                g = np.load(fisher_tensor_path)
+
+                # same time step as obtain_time_step_estimation
+                sigma = FWHM / (2 * math.sqrt(2 * math.log(2)))  # sigma of voxels
+                beta = sigma ** 2 / 2
+                t_step = parameters.get('Alpha', 0.9) * parameters['TimeStepMax']
+                t_step = beta / np.ceil(beta / t_step)
+
+    if g is None:
+        g, fisher_tensor_path = utils.obtain_g_fisher_tensor(dartel_input, FWHM)
+        t_step, json_file = utils.obtain_time_step_estimation(dartel_input, FWHM, g)
+    detg, ginv = utils.heat_tensors(g, dtype='float32')
+
+    detg_path = os.path.abspath('./output_detg.npy')
+    ginv_path = os.path.abspath('./output_ginv.npy')
+    np.save(detg_path, detg)
+    np.save(ginv_path, ginv)
+
+    return fisher_tensor_path, detg_path, ginv_path, float(t_step), json_file
+
+
+def heat_solver_batch(input_images, detg_path, ginv_path, beta, h, t_step, output_directory, batch_size=8):
+    """
+    Regularize a list of images, the images of each batch are stacked and diffused together
+    :param input_images: list of paths to the images (same dimensions as the DARTEL template)
+    :param detg_path: path to sqrt(det(g)) (see obtain_heat_operator)
+    :param ginv_path: path to sqrt(det(g)) * inverse(g) (see obtain_heat_operator)
+    :param beta: time of the diffusion
+    :param h: voxel size
+    :param t_step: time step
+    :param output_directory: folder where the regularized images are written
+    :param batch_size: number of images diffused together
+    :return: list of paths to the regularized images
+    """
     import clinica.pipelines.machine_learning_spatial_svm.spatial_svm_utils as utils
+
     import nibabel as nib
     import numpy as np
     import os
 
+    # memory-mapped: the pages are shared between the processes regularizing the images
+    detg = np.load(detg_path, mmap_mode='r')
+    ginv = np.load(ginv_path, mmap_mode='r')
+
+    regularized_images = []
+    for i in range(0, len(input_images), batch_size):
+        batch = input_images[i:i + batch_size]
+        f = np.stack([np.array(nib.load(input_image).get_data(), dtype='float32') for input_image in batch])
+
+        # rigidity matrix (the boundary values are 0)
+        b_h = f[:, 1:-1, 1:-1, 1:-1] * (h * h * h)
+        U_h = utils.heat_finite_elt_3D_batch(b_h, beta, t_step, h, detg, ginv)
+
+        u = np.zeros(f.shape, dtype=f.dtype)
+        u[:, 1:-1, 1:-1, 1:-1] = U_h
+
+        for input_image, u_image in zip(batch, u):
+            img = utils.spm_write_vol(input_image, u_image)
+            regularized_image = os.path.join(output_directory, 'regularized_' + os.path.basename(input_image))
+            nib.save(img, regularized_image)
+            regularized_images.append(regularized_image)
+
+    return regularized_images
+
+
+def heat_solver_equation_batch(input_image, detg_path, ginv_path, FWHM, t_step, dartel_input, n_procs):
+    """
+    Regularize all the images of the group, the list of images is split across n_procs processes
+    :param input_image: list of paths to the images
+    :param detg_path: path to sqrt(det(g)) (see obtain_heat_operator)
+    :param ginv_path: path to sqrt(det(g)) * inverse(g) (see obtain_heat_operator)
+    :param FWHM: mm of smoothing, defined by the user, default value = 4
+    :param t_step: time step
+    :param dartel_input: dartel template in MNI space
+    :param n_procs: number of processes
+    :return: list of paths to the regularized images, in the order of input_image
+    """
+    import math
+    import clinica.pipelines.machine_learning_spatial_svm.spatial_svm_utils as utils
+    import nibabel as nib
+    import os
+    from multiprocessing import Pool
+
     # obtain voxel size with dartel_input
     head = nib.load(dartel_input)
     head_ = head.header
@@ -933,14 +950,23 @@ def heat_solver_equation(input_image, g, FWHM, t_step, dartel_input):
     sigma = FWHM / (2 * math.sqrt(2 * math.log(2)))  # sigma of voxels
     beta = sigma ** 2 / 2
 
-    input_image_read = nib.load(input_image)
-    input_image_data = input_image_read.get_data()
-    input_image_data = np.array(input_image_data, dtype='float32')
-
-    u = utils.heat_solver_tensor_3D_P1_grad_conj(input_image_data, g, beta, h, t_step, CL_value=None, epsilon=None)
+    n_procs = max(1, min(n_procs or 1, len(input_image)))
+    chunks = [input_image[i::n_procs] for i in range(n_procs)]
+    list_args = [(chunk, detg_path, ginv_path, beta, h, t_step, os.path.abspath('.')) for chunk in chunks]
 
-    img = utils.spm_write_vol(input_image, u)
-
-    nib.save(img, './regularized_' + os.path.basename(input_image))
-
-    return os.path.abspath('./regularized_' + os.path.basename(input_image))
+    if n_procs == 1:
+        results = [utils.heat_solver_batch(*args) for args in list_args]
+    else:
+        pool = Pool(n_procs)
+        try:
+            results = pool.starmap(utils.heat_solver_batch, list_args)
+        finally:
+            pool.close()
+            pool.join()
+
+    # chunks were built with a stride of n_procs
+    regularized_images = [None] * len(input_image)
+    for i, chunk_results in enumerate(results):
+        regularized_images[i::n_procs] = chunk_results
+
+    return regularized_images
@@ -160,7 +160,8 @@ class PetSurface(cpe.Pipeline):
                                                                   self.parameters['acq_label'].upper() + ' PET',
                                                                   read_parameters_node.inputs.pet,
                                                                   self.bids_directory,
-                                                                  self.parameters['acq_label'].lower())
+                                                                  self.parameters['acq_label'].lower(),
+                                                                  cache_dir=self.base_dir)
 
         self.connect([
             (read_parameters_node, self.input_node, [('pet', 'pet'),
@@ -262,7 +263,8 @@ class PetSurface(cpe.Pipeline):
         check_relative_volume_location_in_world_coordinate_system('T1w-MRI (orig_nu.mgz)', read_parameters_node.inputs.orig_nu,
                                                                   self.parameters['acq_label'].upper() + ' PET', read_parameters_node.inputs.pet,
                                                                   self.bids_directory,
-                                                                  self.parameters['acq_label'].lower())
+                                                                  self.parameters['acq_label'].lower(),
+                                                                  cache_dir=self.base_dir)
 
         self.connect([
             (read_parameters_node, self.input_node, [('pet',                 'pet'),
@@ -665,6 +665,35 @@ def reformat_surfname(hemi, left_surface, right_surface):
     return res
 
 
+# Parsed annotation files, indexed by (path, size, mtime) of the annotation file
+_annot_cache = {}
+
+
+def read_annot_labels(annot_file):
+    """read_annot_labels reads an annotation file from Freesurfer. Parsed files are cached so that the annotation
+    files of the fsaverage atlases are read only once for all the subjects processed by the same process.
+
+        Args:
+            (string) annot_file  : path to the annotation file
+
+        Returns:
+            (numpy.ndarray) labels  : region index of each vertex (unlabeled vertices are in region 0)
+            (list) names  : names of the regions
+        """
+    import os
+    import nibabel as nib
+    import numpy as np
+
+    file_stat = os.stat(annot_file)
+    key = (os.path.abspath(annot_file), file_stat.st_size, file_stat.st_mtime_ns)
+    if key not in _annot_cache:
+        labels, _, names = nib.freesurfer.io.read_annot(annot_file, orig_ids=False)
+        labels = np.array(labels, dtype=np.int64)
+        labels[labels == -1] = 0
+        _annot_cache[key] = (labels, [name.astype(str) for name in names])
+    return _annot_cache[key]
+
+
 def produce_tsv(pet, atlas_files):
     """produce_tsv computes the average of PET signal based on annot files from Freesurfer. Those files describes the
     brain according to known atlases.
@@ -674,13 +703,15 @@ def produce_tsv(pet, atlas_files):
             (string) atlas_files  : Dictionnary containing path to lh and rh annotation files for any number of atlases.
 
         Returns:
-            (string) tsv  : path to the tsv containing average PET values
+            (string) tsv  : path to the tsv containing average PET values (with the standard deviation and the number
+            of vertices of each region)
         """
+    import clinica.pipelines.pet_surface.pet_surface_utils as utils
+    from clinica.utils.statistics import label_statistics
     import nibabel as nib
     import numpy as np
     import pandas as pds
     import os
-    from clinica.utils.stream import cprint
 
     # Extract data from projected PET data
     lh_pet_mgh = np.squeeze(nib.load(pet[0]).get_data())
@@ -689,43 +720,29 @@ def produce_tsv(pet, atlas_files):
     filename_tsv = []
     for atlas in atlas_files:
 
-        annot_atlas_left = nib.freesurfer.io.read_annot(atlas_files[atlas]['lh'], orig_ids=False)
-        annot_atlas_left[0][annot_atlas_left[0] == -1] = 0
-        annot_atlas_right = nib.freesurfer.io.read_annot(atlas_files[atlas]['rh'], orig_ids=False)
-        annot_atlas_right[0][annot_atlas_right[0] == -1] = 0
+        labels_left, names = utils.read_annot_labels(atlas_files[atlas]['lh'])
+        labels_right, _ = utils.read_annot_labels(atlas_files[atlas]['rh'])
+        regions = range(len(names))
 
-        average_region = []
-        region_names = []
-        for r in range(len(annot_atlas_left[2])):
-            cprint(annot_atlas_left[2][r])
-            region_names.append(annot_atlas_left[2][r].astype(str) + '_lh')
-            region_names.append(annot_atlas_left[2][r].astype(str) + '_rh')
-
-            mask_left = annot_atlas_left[0] == r
-            mask_left = np.uint(mask_left)
-
-            masked_data_left = mask_left * lh_pet_mgh
-            if np.sum(mask_left) == 0:
-                average_region.append(np.nan)
-            else:
-                average_region.append(np.sum(masked_data_left) / np.sum(mask_left))
-
-            mask_right = annot_atlas_right[0] == r
-            mask_right = np.uint(mask_right)
-            masked_data_right = mask_right * rh_pet_mgh
-            if np.sum(mask_right) == 0:
-                average_region.append(np.nan)
-            else:
-                average_region.append(np.sum(masked_data_right) / np.sum(mask_right))
+        # one bincount per hemisphere, regions are interleaved (region_lh, region_rh)
+        statistics_left = label_statistics(lh_pet_mgh, labels_left, regions)
+        statistics_right = label_statistics(rh_pet_mgh, labels_right, regions)
+        mean_region, std_region, count_region = [np.ravel(np.column_stack([left, right]))
+                                                 for left, right in zip(statistics_left, statistics_right)]
+        region_names = [name + hemi for name in names for hemi in ['_lh', '_rh']]
 
         final_tsv = pds.DataFrame({'index': range(len(region_names)),
                                    'label_name': region_names,
-                                   'mean_scalar': list(average_region)})
+                                   'mean_scalar': mean_region,
+                                   'std_scalar': std_region,
+                                   'number_of_vertices': count_region})
         filename_atlas_tsv = './' + atlas + '.tsv'
         filename_tsv.append(filename_atlas_tsv)
         final_tsv.to_csv(filename_atlas_tsv, sep='\t', index=False, columns=['index',
                                                                              'label_name',
-                                                                             'mean_scalar'])
+                                                                             'mean_scalar',
+                                                                             'std_scalar',
+                                                                             'number_of_vertices'])
     return os.path.abspath(filename_tsv[0]), os.path.abspath(filename_tsv[1])
 
 
@@ -88,7 +88,7 @@ class PETVolume(cpe.Pipeline):
         from colorama import Fore
         import nipype.interfaces.utility as nutil
         import nipype.pipeline.engine as npe
-        from clinica.utils.inputs import clinica_file_reader, clinica_group_reader
+        from clinica.utils.inputs import clinica_list_of_files_reader, clinica_group_reader
         from clinica.utils.input_files import (t1_volume_final_group_template,
                                                t1_volume_native_tpm,
                                                t1_volume_native_tpm_in_mni,
@@ -117,35 +117,43 @@ class PETVolume(cpe.Pipeline):
         # Grab reference mask
         reference_mask_file = get_suvr_mask(self.parameters['suvr_reference_region'])
 
-        # PET from BIDS directory
+        # PET and native T1w-MRI from BIDS directory
         try:
-            pet_bids = clinica_file_reader(self.subjects,
-                                           self.sessions,
-                                           self.bids_directory,
-                                           bids_pet_nii(self.parameters['acq_label']))
+            pet_bids, t1w_bids = clinica_list_of_files_reader(self.subjects,
+                                                              self.sessions,
+                                                              self.bids_directory,
+                                                              [bids_pet_nii(self.parameters['acq_label']),
+                                                               T1W_NII])
         except ClinicaException as e:
             all_errors.append(e)
 
-        # Native T1w-MRI
+        if self.parameters['pvc_psf_tsv'] is not None:
+            iterables_psf = read_psf_information(self.parameters['pvc_psf_tsv'], self.subjects, self.sessions)
+            self.parameters['apply_pvc'] = True
+        else:
+            iterables_psf = [[]] * len(self.subjects)
+            self.parameters['apply_pvc'] = False
+
+        # mask_tissues, flowfields and pvc tissues from CAPS directory (all read in a single pass)
+        caps_information = [t1_volume_native_tpm_in_mni(tissue_number, False)
+                            for tissue_number in self.parameters['mask_tissues']]
+        caps_information.append(t1_volume_deformation_to_template(self.parameters['group_label']))
+        if self.parameters['apply_pvc']:
+            caps_information += [t1_volume_native_tpm(tissue_number)
+                                 for tissue_number in self.parameters['pvc_mask_tissues']]
         try:
-            t1w_bids = clinica_file_reader(self.subjects,
-                                           self.sessions,
-                                           self.bids_directory,
-                                           T1W_NII)
+            caps_files = clinica_list_of_files_reader(self.subjects,
+                                                      self.sessions,
+                                                      self.caps_directory,
+                                                      caps_information)
         except ClinicaException as e:
             all_errors.append(e)
+            caps_files = [[]] * len(caps_information)
+        n_mask_tissues = len(self.parameters['mask_tissues'])
+        tissues_input = caps_files[:n_mask_tissues]
+        flowfields_caps = caps_files[n_mask_tissues]
+        pvc_tissues_input = caps_files[n_mask_tissues + 1:]
 
-        # mask_tissues
-        tissues_input = []
-        for tissue_number in self.parameters['mask_tissues']:
-            try:
-                current_file = clinica_file_reader(self.subjects,
-                                                   self.sessions,
-                                                   self.caps_directory,
-                                                   t1_volume_native_tpm_in_mni(tissue_number, False))
-                tissues_input.append(current_file)
-            except ClinicaException as e:
-                all_errors.append(e)
         # Tissues_input has a length of len(self.parameters['mask_tissues']). Each of these elements has a size of
         # len(self.subjects). We want the opposite: a list of size len(self.subjects) whose elements have a size of
         # len(self.parameters['mask_tissues']. The trick is to iter on elements with zip(*my_list)
@@ -154,15 +162,6 @@ class PETVolume(cpe.Pipeline):
             tissues_input_final.append(subject_tissue_list)
         tissues_input = tissues_input_final
 
-        # Flowfields
-        try:
-            flowfields_caps = clinica_file_reader(self.subjects,
-                                                  self.sessions,
-                                                  self.caps_directory,
-                                                  t1_volume_deformation_to_template(self.parameters['group_label']))
-        except ClinicaException as e:
-            all_errors.append(e)
-
         # Dartel Template
         try:
             final_template = clinica_group_reader(self.caps_directory,
@@ -170,26 +169,7 @@ class PETVolume(cpe.Pipeline):
         except ClinicaException as e:
             all_errors.append(e)
 
-        if self.parameters['pvc_psf_tsv'] is not None:
-            iterables_psf = read_psf_information(self.parameters['pvc_psf_tsv'], self.subjects, self.sessions)
-            self.parameters['apply_pvc'] = True
-        else:
-            iterables_psf = [[]] * len(self.subjects)
-            self.parameters['apply_pvc'] = False
-
         if self.parameters['apply_pvc']:
-            # pvc tissues input
-            pvc_tissues_input = []
-            for tissue_number in self.parameters['pvc_mask_tissues']:
-                try:
-                    current_file = clinica_file_reader(self.subjects,
-                                                       self.sessions,
-                                                       self.caps_directory,
-                                                       t1_volume_native_tpm(tissue_number))
-                    pvc_tissues_input.append(current_file)
-                except ClinicaException as e:
-                    all_errors.append(e)
-
             if len(all_errors) == 0:
                 pvc_tissues_input_final = []
                 for subject_tissue_list in zip(*pvc_tissues_input):
@@ -207,7 +187,8 @@ class PETVolume(cpe.Pipeline):
         check_relative_volume_location_in_world_coordinate_system('T1w-MRI', t1w_bids,
                                                                   self.parameters['acq_label'] + ' PET', pet_bids,
                                                                   self.bids_directory,
-                                                                  self.parameters['acq_label'])
+                                                                  self.parameters['acq_label'],
+                                                                  cache_dir=self.base_dir)
 
         # Save subjects to process in <WD>/<Pipeline.name>/participants.tsv
         folder_participants_tsv = os.path.join(self.base_dir, self.name)
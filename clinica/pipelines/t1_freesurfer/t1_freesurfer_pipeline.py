@@ -135,7 +135,8 @@ class T1FreeSurfer(cpe.Pipeline):
                              interface=nutil.IdentityInterface(
                                  fields=self.get_input_fields())
                              )
-        check_volume_location_in_world_coordinate_system(t1w_files, self.bids_directory)
+        check_volume_location_in_world_coordinate_system(t1w_files, self.bids_directory,
+                                                         cache_dir=self.base_dir)
         self.connect([
             (read_node, self.input_node, [('t1w', 't1w')]),
         ])
@@ -91,7 +91,8 @@ class T1VolumeTissueSegmentation(cpe.Pipeline):
             err = 'Clinica faced error(s) while trying to read files in your BIDS directory.\n' + str(e)
             raise ClinicaBIDSError(err)
 
-        check_volume_location_in_world_coordinate_system(t1w_files, self.bids_directory)
+        check_volume_location_in_world_coordinate_system(t1w_files, self.bids_directory,
+                                                         cache_dir=self.base_dir)
 
         if len(self.subjects):
             print_images_to_process(self.subjects, self.sessions)
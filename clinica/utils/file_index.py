@@ -0,0 +1,374 @@
+# coding: utf8
+
+"""
+This module contains a persistent index of the files of a BIDS or CAPS directory.
+
+The index is used by inputs.py::clinica_{file|group}_reader() so that finding the files of a subject/session list
+does not need a recursive glob per subject/session. It is stored as a SQLite database in the Clinica cache folder
+(~/.cache/clinica/file_index) and is refreshed incrementally: a directory is listed again only if its modification
+time changed since the last refresh.
+
+The index can be disabled by setting the environment variable CLINICA_FILE_INDEX to 0.
+"""
+
+import os
+import threading
+
+# Open indexes, one per absolute root directory
+_file_indexes = {}
+
+# Directories modified less than this number of seconds before a refresh are listed again at the next refresh.
+# This handles files created during the refresh within the mtime granularity of the file system.
+_RACY_MTIME_DELAY = 2.0
+
+
+def is_file_index_enabled():
+    """Return False if the file index was disabled with the CLINICA_FILE_INDEX environment variable."""
+    return os.environ.get("CLINICA_FILE_INDEX", "1").lower() not in ["0", "false", "no", "off"]
+
+
+def get_file_index(root_directory, file_suffixes=None):
+    """Return the (shared) FileIndex of the BIDS or CAPS directory `root_directory`.
+
+    See FileIndex for `file_suffixes`.
+    """
+    root_directory = os.path.abspath(root_directory)
+    key = (root_directory, tuple(file_suffixes) if file_suffixes is not None else None)
+    if key not in _file_indexes:
+        _file_indexes[key] = FileIndex(root_directory, file_suffixes=file_suffixes)
+    return _file_indexes[key]
+
+
+def compile_glob_pattern(pattern):
+    """Compile a glob pattern (e.g. 't1/freesurfer_cross_sectional/sub-*_ses-*/mri/orig_nu.mgz') for match_glob_pattern.
+
+    Args:
+        pattern: glob pattern relative to the folder where it is searched (using *, ? and [])
+
+    Returns:
+        List of (compiled case insensitive regex, name component of the pattern)
+    """
+    import re
+    from fnmatch import translate
+
+    return [
+        (re.compile(translate(component), re.IGNORECASE), component)
+        for component in pattern.split("/")
+        if component
+    ]
+
+
+def match_glob_pattern(relative_path, compiled_pattern):
+    """Check if `relative_path` is matched by the recursive glob '**/<pattern>' with `insensitive_glob`.
+
+    The matching follows the glob.glob() rules: '**/' matches zero or more non-hidden folders and wildcards
+    do not match names starting with '.' unless the pattern component starts with '.' itself.
+
+    Args:
+        relative_path: path relative to the folder where the pattern is searched
+        compiled_pattern: result of compile_glob_pattern()
+
+    Returns:
+        True if relative_path is matched by the pattern
+    """
+    names = relative_path.split("/")
+    n_prefix = len(names) - len(compiled_pattern)
+    if n_prefix < 0:
+        return False
+    if any(name.startswith(".") for name in names[:n_prefix]):
+        return False
+    for name, (regex, component) in zip(names[n_prefix:], compiled_pattern):
+        if name.startswith(".") and not component.startswith("."):
+            return False
+        if regex.match(name) is None:
+            return False
+    return True
+
+
+class FileIndex(object):
+    """Persistent index of the files and folders of a BIDS or CAPS directory.
+
+    Attributes:
+        root_directory (str): Absolute path of the indexed BIDS or CAPS directory.
+        file_suffixes (tuple): If not None, only the files ending with one of these suffixes are indexed
+            (all the folders are indexed). This keeps the index small for trees holding many files that are
+            never queried (e.g. DICOM slices).
+        database_file (str): Path of the SQLite database storing the index.
+    """
+
+    def __init__(self, root_directory, cache_directory=None, file_suffixes=None):
+        import hashlib
+        import sqlite3
+        from pathlib import Path
+
+        self.root_directory = os.path.abspath(root_directory)
+        self.file_suffixes = tuple(file_suffixes) if file_suffixes is not None else None
+        if cache_directory is None:
+            cache_directory = os.path.join(
+                str(Path.home()), ".cache", "clinica", "file_index"
+            )
+        os.makedirs(cache_directory, exist_ok=True)
+        index_key = self.root_directory
+        if self.file_suffixes is not None:
+            index_key += "\0" + "\0".join(self.file_suffixes)
+        root_hash = hashlib.sha256(index_key.encode("utf-8")).hexdigest()
+        self.database_file = os.path.join(cache_directory, f"{root_hash[:16]}.sqlite")
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.database_file, timeout=60, check_same_thread=False
+        )
+        with self._connection:
+            self._connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS directories (
+                    path TEXT PRIMARY KEY, parent TEXT, mtime INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS directories_parent ON directories (parent);
+                CREATE TABLE IF NOT EXISTS entries (
+                    path TEXT PRIMARY KEY, directory TEXT, subject TEXT, session TEXT
+                );
+                CREATE INDEX IF NOT EXISTS entries_directory ON entries (directory);
+                CREATE INDEX IF NOT EXISTS entries_subject_session ON entries (subject, session);
+                """
+            )
+
+    @staticmethod
+    def _subject_session(relative_path):
+        """Extract (subject, session) of an entry located inside a session folder, else (None, None)."""
+        names = relative_path.split("/")
+        if names[0] == "subjects":
+            names = names[1:]
+        if (
+            len(names) > 2
+            and names[0].lower().startswith("sub-")
+            and names[1].lower().startswith("ses-")
+        ):
+            return names[0], names[1]
+        return None, None
+
+    def _absolute(self, relative_path):
+        if relative_path:
+            return os.path.join(self.root_directory, relative_path)
+        return self.root_directory
+
+    def _purge(self, relative_directory):
+        """Remove a folder and everything below it from the index."""
+        cursor = self._connection.cursor()
+        if relative_directory:
+            lower, upper = relative_directory + "/", relative_directory + "0"
+            cursor.execute(
+                "DELETE FROM directories WHERE path = ? OR (path >= ? AND path < ?)",
+                (relative_directory, lower, upper),
+            )
+            cursor.execute(
+                "DELETE FROM entries WHERE path = ? OR (path >= ? AND path < ?)",
+                (relative_directory, lower, upper),
+            )
+        else:
+            cursor.execute("DELETE FROM directories")
+            cursor.execute("DELETE FROM entries")
+
+    def _scan_directory(self, relative_directory, stored_mtime):
+        """Stat a folder and list its content if its modification time changed (no database access).
+
+        Returns:
+            (mtime, listing): mtime is None if the folder does not exist anymore, listing is None if the folder
+            did not change, else a list of (name, is_dir)
+        """
+        try:
+            mtime = os.stat(self._absolute(relative_directory)).st_mtime_ns
+        except OSError:
+            return None, None
+        if mtime == stored_mtime:
+            return mtime, None
+
+        listing = []
+        try:
+            with os.scandir(self._absolute(relative_directory)) as iterator:
+                for entry in iterator:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if (
+                        is_dir
+                        or self.file_suffixes is None
+                        or entry.name.endswith(self.file_suffixes)
+                    ):
+                        listing.append((entry.name, is_dir))
+        except OSError:
+            return None, None
+        return mtime, listing
+
+    def _store_listing(self, relative_directory, mtime, listing):
+        """Store the content of a folder whose modification time changed.
+
+        Returns:
+            List of the sub-folders of relative_directory (relative to root_directory)
+        """
+        import time
+
+        cursor = self._connection.cursor()
+        entries, sub_directories = [], []
+        for name, is_dir in listing:
+            path = f"{relative_directory}/{name}" if relative_directory else name
+            subject, session = self._subject_session(path)
+            entries.append((path, relative_directory, subject, session))
+            if is_dir:
+                sub_directories.append(path)
+
+        # Remove folders that disappeared since the last refresh
+        known = [
+            row[0]
+            for row in cursor.execute(
+                "SELECT path FROM directories WHERE parent = ?", (relative_directory,)
+            )
+        ]
+        for path in set(known) - set(sub_directories):
+            self._purge(path)
+
+        cursor.execute("DELETE FROM entries WHERE directory = ?", (relative_directory,))
+        cursor.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", entries)
+        for path in set(sub_directories) - set(known):
+            cursor.execute(
+                "INSERT OR REPLACE INTO directories VALUES (?, ?, ?)",
+                (path, relative_directory, -1),
+            )
+
+        # A folder modified too recently may still change within the same mtime tick: list it again next time
+        if time.time() * 1e9 - mtime < _RACY_MTIME_DELAY * 1e9:
+            mtime = -1
+        cursor.execute(
+            "UPDATE directories SET mtime = ? WHERE path = ?", (mtime, relative_directory)
+        )
+        return sub_directories
+
+    def refresh(self, relative_directory="", n_threads=1):
+        """Update the index of `relative_directory` (relative to root_directory) and of all its sub-folders.
+
+        Each folder is stat-ed, but only folders whose modification time changed are listed again. The folders
+        of a same depth are stat-ed and listed by `n_threads` threads.
+        """
+        from multiprocessing.pool import ThreadPool
+
+        pool = ThreadPool(n_threads) if n_threads > 1 else None
+        try:
+            with self._lock, self._connection:
+                cursor = self._connection.cursor()
+                row = cursor.execute(
+                    "SELECT mtime FROM directories WHERE path = ?", (relative_directory,)
+                ).fetchone()
+                if row is None:
+                    parent = os.path.dirname(relative_directory) if relative_directory else None
+                    cursor.execute(
+                        "INSERT INTO directories VALUES (?, ?, ?)",
+                        (relative_directory, parent, -1),
+                    )
+
+                to_visit = [relative_directory]
+                while to_visit:
+                    list_args = [
+                        (
+                            current,
+                            cursor.execute(
+                                "SELECT mtime FROM directories WHERE path = ?", (current,)
+                            ).fetchone()[0],
+                        )
+                        for current in to_visit
+                    ]
+                    if pool is not None and len(list_args) > 1:
+                        results = pool.starmap(self._scan_directory, list_args)
+                    else:
+                        results = [self._scan_directory(*args) for args in list_args]
+
+                    to_visit = []
+                    for current, (mtime, listing) in zip([args[0] for args in list_args], results):
+                        if mtime is None:
+                            self._purge(current)
+                        elif listing is None:
+                            to_visit.extend(
+                                row[0]
+                                for row in cursor.execute(
+                                    "SELECT path FROM directories WHERE parent = ?", (current,)
+                                )
+                            )
+                        else:
+                            to_visit.extend(self._store_listing(current, mtime, listing))
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+    def directories_named(self, names, relative_directory=""):
+        """Find the folders of `relative_directory` whose name is in `names` (exact match, no refresh).
+
+        Returns:
+            Dictionary name -> sorted list of the matched folders, relative to root_directory
+        """
+        names = set(names)
+        prefix = relative_directory + "/" if relative_directory else ""
+        found = {}
+        with self._lock:
+            cursor = self._connection.cursor()
+            if relative_directory:
+                rows = cursor.execute(
+                    "SELECT path FROM directories WHERE path >= ? AND path < ?",
+                    (prefix, relative_directory + "0"),
+                )
+            else:
+                rows = cursor.execute("SELECT path FROM directories")
+            for (path,) in rows:
+                name = path.rsplit("/", 1)[-1]
+                if name in names and path.startswith(prefix):
+                    found.setdefault(name, []).append(path)
+        for paths in found.values():
+            paths.sort()
+        return found
+
+    def find(self, relative_directory, pattern, refresh=True):
+        """Find the entries of `relative_directory` matched by the recursive glob '**/<pattern>'.
+
+        Args:
+            relative_directory: folder (relative to root_directory) where the pattern is searched
+            pattern: glob pattern (case insensitive) as used by clinica_file_reader()
+            refresh: if True, the index of relative_directory is refreshed before the query
+
+        Returns:
+            Sorted list of the matched paths, relative to relative_directory
+        """
+        return self.find_patterns(relative_directory, [pattern], refresh=refresh)[0]
+
+    def find_patterns(self, relative_directory, patterns, refresh=True):
+        """Find the entries of `relative_directory` matched by each pattern of `patterns` in a single query.
+
+        Returns:
+            List (one element per pattern) of sorted lists of matched paths, relative to relative_directory
+        """
+        if refresh:
+            self.refresh(relative_directory)
+
+        compiled_patterns = [compile_glob_pattern(pattern) for pattern in patterns]
+        with self._lock:
+            cursor = self._connection.cursor()
+            if relative_directory:
+                subject, session = self._subject_session(relative_directory + "/_")
+                prefix = relative_directory + "/"
+                if subject is not None and relative_directory.endswith(f"{subject}/{session}"):
+                    rows = cursor.execute(
+                        "SELECT path FROM entries WHERE subject = ? AND session = ?",
+                        (subject, session),
+                    )
+                else:
+                    rows = cursor.execute(
+                        "SELECT path FROM entries WHERE path >= ? AND path < ?",
+                        (prefix, relative_directory + "0"),
+                    )
+                paths = [row[0][len(prefix):] for row in rows if row[0].startswith(prefix)]
+            else:
+                paths = [row[0] for row in cursor.execute("SELECT path FROM entries")]
+
+        return [
+            sorted(path for path in paths if match_glob_pattern(path, compiled))
+            for compiled in compiled_patterns
+        ]
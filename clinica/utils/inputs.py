@@ -27,6 +27,40 @@ def insensitive_glob(pattern_glob, recursive=False):
     return glob("".join(map(either, pattern_glob)), recursive=recursive)
 
 
+def find_files_recursively(input_directory, relative_directory, patterns):
+    """
+    This function finds the files matching the patterns "**/<pattern>" in <input_directory>/<relative_directory>
+    (insensitive to the case). The persistent file index of input_directory (see clinica.utils.file_index) is used
+    when it is enabled: all the patterns are then matched with a single query. Otherwise a recursive glob is run for
+    each pattern.
+    Args:
+        input_directory: BIDS or CAPS directory
+        relative_directory: folder relative to input_directory where the files are searched ('' for the whole folder)
+        patterns: list of patterns of the files to find (e.g. ['sub-*_ses-*_t1w.nii*'])
+    Returns:
+        list (one element per pattern) of the lists of files found, starting with <input_directory>/<relative_directory>
+    """
+    from os.path import join
+    import sqlite3
+    from clinica.utils.file_index import get_file_index, is_file_index_enabled
+
+    origin = join(input_directory, relative_directory)
+    if is_file_index_enabled():
+        try:
+            file_index = get_file_index(input_directory)
+            return [
+                [join(origin, f) for f in found_files]
+                for found_files in file_index.find_patterns(relative_directory, patterns)
+            ]
+        except (OSError, sqlite3.Error):
+            # The index could not be used (e.g. cache folder not writable): fall back to glob
+            pass
+    return [
+        insensitive_glob(join(origin, "**/", pattern), recursive=True)
+        for pattern in patterns
+    ]
+
+
 def determine_caps_or_bids(input_dir):
     """
     Determines if the input is a CAPS or a BIDS folder
@@ -236,90 +270,184 @@ def clinica_file_reader(
         Note:
             This function is case insensitive, meaning that the pattern argument can, for example, contain maj letter
             that do not exists in the existing file path.
+            Files are looked up in the persistent file index of input_directory (see clinica.utils.file_index),
+            which is refreshed for the requested subjects/sessions before each query.
 
     """
 
-    from os.path import join
-    from colorama import Fore
     from clinica.utils.exceptions import ClinicaBIDSError, ClinicaCAPSError
 
+    _check_information(information, ["pattern", "description"])
+    is_bids = determine_caps_or_bids(input_directory)
+
+    if is_bids:
+        check_bids_folder(input_directory)
+    else:
+        check_caps_folder(input_directory)
+
+    assert len(subjects) == len(
+        sessions
+    ), "Subjects and sessions must have the same length"
+    if len(subjects) == 0:
+        return []
+
+    [results], [error_encountered] = _read_sessions_files(
+        subjects, sessions, input_directory, is_bids, [information["pattern"]]
+    )
+
+    # We do not raise an error, so that the developper can gather all the problems before Clinica crashes
+    if len(error_encountered) > 0 and raise_exception is True:
+        error_message = _file_reader_error_message(information, error_encountered)
+        if is_bids:
+            raise ClinicaBIDSError(error_message)
+        else:
+            raise ClinicaCAPSError(error_message)
+    return results
+
+
+def clinica_list_of_files_reader(
+    participant_ids, session_ids, bids_or_caps_directory, list_information, raise_exception=True
+):
+    """
+    This function grabs the files of several patterns relative to a subject and session list. Each session folder is
+    scanned once and all the patterns are matched in a single pass, so that the cost does not grow with the number
+    of patterns.
+    Args:
+        participant_ids: list of subjects
+        session_ids: list of sessions (must be same size as participant_ids, and must correspond)
+        bids_or_caps_directory: location of the bids or caps directory
+        list_information: list of dictionaries described in clinica_file_reader
+        raise_exception: if True (normal behavior), an exception is raised if errors happen. If not, we return the
+                         file lists as they are
+
+    Returns:
+        list (one element per dictionary of list_information) of the lists of files returned by clinica_file_reader
+
+    Raises:
+        ClinicaCAPSError or ClinicaBIDSError gathering the errors of all the patterns
+    """
+    from clinica.utils.exceptions import ClinicaBIDSError, ClinicaCAPSError
+
+    for information in list_information:
+        _check_information(information, ["pattern", "description"])
+    is_bids = determine_caps_or_bids(bids_or_caps_directory)
+
+    if is_bids:
+        check_bids_folder(bids_or_caps_directory)
+    else:
+        check_caps_folder(bids_or_caps_directory)
+
+    assert len(participant_ids) == len(
+        session_ids
+    ), "Subjects and sessions must have the same length"
+    if len(participant_ids) == 0:
+        return [[] for _ in list_information]
+
+    list_results, list_errors = _read_sessions_files(
+        participant_ids,
+        session_ids,
+        bids_or_caps_directory,
+        is_bids,
+        [information["pattern"] for information in list_information],
+    )
+
+    error_message = ""
+    for information, error_encountered in zip(list_information, list_errors):
+        if len(error_encountered) > 0:
+            error_message += _file_reader_error_message(information, error_encountered)
+    if len(error_message) > 0 and raise_exception is True:
+        error_message = (
+            "Clinica faced error(s) while trying to read files in your BIDS or CAPS directories.\n"
+            + error_message
+        )
+        if is_bids:
+            raise ClinicaBIDSError(error_message)
+        else:
+            raise ClinicaCAPSError(error_message)
+    return list_results
+
+
+def _check_information(information, mandatory_keys):
+    """Check the format of an 'information' dictionary given to clinica_{file|group}_reader."""
     assert isinstance(
         information, dict
     ), "A dict must be provided for the argument 'dict'"
     assert all(
-        elem in information.keys() for elem in ["pattern", "description"]
-    ), "'information' must contain the keys 'pattern' and 'description'"
+        elem in information.keys() for elem in mandatory_keys
+    ), f"'information' must contain the keys {', '.join(mandatory_keys)}"
     assert all(
         elem in ["pattern", "description", "needed_pipeline"]
         for elem in information.keys()
     ), "'information' can only contain the keys 'pattern', 'description' and 'needed_pipeline'"
 
-    pattern = information["pattern"]
-    is_bids = determine_caps_or_bids(input_directory)
-
-    if is_bids:
-        check_bids_folder(input_directory)
-    else:
-        check_caps_folder(input_directory)
-
     # Some check on the formatting on the data
-    assert pattern[0] != "/", (
+    assert information["pattern"][0] != "/", (
         "pattern argument cannot start with char: / (does not work in os.path.join function). "
         "If you want to indicate the exact name of the file, use the format"
         " directory_name/filename.extension or filename.extension in the pattern argument"
     )
-    assert len(subjects) == len(
-        sessions
-    ), "Subjects and sessions must have the same length"
-    if len(subjects) == 0:
-        return []
+
+
+def _read_sessions_files(subjects, sessions, input_directory, is_bids, patterns):
+    """
+    Find, for each subject/session, the single file matching each pattern.
+    Returns:
+        list_results: list (one element per pattern) of the files found
+        list_errors: list (one element per pattern) of the errors encountered
+    """
+    from os.path import join
+    from colorama import Fore
 
     # results is the list containing the results
-    results = []
+    list_results = [[] for _ in patterns]
     # error is the list of the errors that happen during the whole process
-    error_encountered = []
+    list_errors = [[] for _ in patterns]
     for sub, ses in zip(subjects, sessions):
         if is_bids:
-            origin_pattern = join(input_directory, sub, ses)
-        else:
-            origin_pattern = join(input_directory, "subjects", sub, ses)
-
-        current_pattern = join(origin_pattern, "**/", pattern)
-        current_glob_found = insensitive_glob(current_pattern, recursive=True)
-
-        # Error handling if more than 1 file are found, or when no file is found
-        if len(current_glob_found) > 1:
-            error_str = f"\t* {Fore.BLUE}  ({sub} | {ses}) {Fore.RESET}: More than 1 file found:\n"
-            for found_file in current_glob_found:
-                error_str += f"\t\t{found_file}\n"
-            error_encountered.append(error_str)
-        elif len(current_glob_found) == 0:
-            error_encountered.append(
-                f"\t* {Fore.BLUE} ({sub} | {ses}) {Fore.RESET}: No file found\n"
-            )
-        # Otherwise the file found is added to the result
+            session_directory = join(sub, ses)
         else:
-            results.append(current_glob_found[0])
+            session_directory = join("subjects", sub, ses)
 
-    # We do not raise an error, so that the developper can gather all the problems before Clinica crashes
-    if len(error_encountered) > 0 and raise_exception is True:
-        error_message = (
-            f"{Fore.RED}\n[Error] Clinica encountered {len(error_encountered)} "
-            f"problem(s) while getting {information['description']}:\n{Fore.RESET}"
+        list_glob_found = find_files_recursively(
+            input_directory, session_directory, patterns
         )
-        if "needed_pipeline" in information.keys():
-            if information["needed_pipeline"]:
-                error_message += (
-                    f"{Fore.YELLOW}Please note that the following clinica pipeline(s) must "
-                    f"have run to obtain these files: {information['needed_pipeline']}{Fore.RESET}\n"
+
+        for current_glob_found, results, error_encountered in zip(
+            list_glob_found, list_results, list_errors
+        ):
+            # Error handling if more than 1 file are found, or when no file is found
+            if len(current_glob_found) > 1:
+                error_str = f"\t* {Fore.BLUE}  ({sub} | {ses}) {Fore.RESET}: More than 1 file found:\n"
+                for found_file in current_glob_found:
+                    error_str += f"\t\t{found_file}\n"
+                error_encountered.append(error_str)
+            elif len(current_glob_found) == 0:
+                error_encountered.append(
+                    f"\t* {Fore.BLUE} ({sub} | {ses}) {Fore.RESET}: No file found\n"
                 )
-        for msg in error_encountered:
-            error_message += msg
-        if is_bids:
-            raise ClinicaBIDSError(error_message)
-        else:
-            raise ClinicaCAPSError(error_message)
-    return results
+            # Otherwise the file found is added to the result
+            else:
+                results.append(current_glob_found[0])
+    return list_results, list_errors
+
+
+def _file_reader_error_message(information, error_encountered):
+    """Build the error message of clinica_file_reader from the errors encountered for a pattern."""
+    from colorama import Fore
+
+    error_message = (
+        f"{Fore.RED}\n[Error] Clinica encountered {len(error_encountered)} "
+        f"problem(s) while getting {information['description']}:\n{Fore.RESET}"
+    )
+    if "needed_pipeline" in information.keys():
+        if information["needed_pipeline"]:
+            error_message += (
+                f"{Fore.YELLOW}Please note that the following clinica pipeline(s) must "
+                f"have run to obtain these files: {information['needed_pipeline']}{Fore.RESET}\n"
+            )
+    for msg in error_encountered:
+        error_message += msg
+    return error_message
 
 
 def clinica_group_reader(caps_directory, information, raise_exception=True):
@@ -342,7 +470,6 @@ def clinica_group_reader(caps_directory, information, raise_exception=True):
     Raises:
         ClinicaCAPSError if no file is found, or more than 1 files are found
     """
-    from os.path import join
     from colorama import Fore
     from clinica.utils.exceptions import ClinicaCAPSError
 
@@ -364,8 +491,7 @@ def clinica_group_reader(caps_directory, information, raise_exception=True):
 
     check_caps_folder(caps_directory)
 
-    current_pattern = join(caps_directory, "**/", pattern)
-    current_glob_found = insensitive_glob(current_pattern, recursive=True)
+    [current_glob_found] = find_files_recursively(caps_directory, "", [pattern])
 
     if len(current_glob_found) != 1 and raise_exception is True:
         error_string = f"{Fore.RED}\n[Error] Clinica encountered a problem while getting {information['description']}. "
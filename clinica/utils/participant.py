@@ -84,8 +84,8 @@ def get_subject_session_list(input_dir, ss_file=None, is_bids_dir=True, use_sess
         ss_file: A subjects-sessions file (.tsv format).
         is_bids_dir: Indicates if input_dir is a BIDS or CAPS directory
         use_session_tsv (boolean): Specify if the list uses the sessions listed in the sessions.tsv files
-        tsv_dir (str): if TSV file does not exist, it will be created in output_dir. If
-            not specified, output_dir will be in <tmp> folder
+        tsv_dir (str): Not used anymore: without TSV file, the subjects and sessions are listed in memory
+            (see clinica.iotools.utils.data_handling.list_subjects_sessions)
 
     Returns:
         subjects: A subjects list.
@@ -102,28 +102,15 @@ def get_subject_session_list(input_dir, ss_file=None, is_bids_dir=True, use_sess
         However, if your pipeline needs both T1w and DWI files, you will need to check
         with e.g. clinica_file_reader_function.
     """
-    import os
-    import tempfile
-    from time import time, strftime, localtime
     import clinica.iotools.utils.data_handling as cdh
 
     if not ss_file:
-        if tsv_dir:
-            output_dir = tsv_dir
-        else:
-            output_dir = tempfile.mkdtemp()
-        timestamp = strftime('%Y%m%d_%H%M%S', localtime(time()))
-        tsv_file = 'subjects_sessions_list_%s.tsv' % timestamp
-        ss_file = os.path.join(output_dir, tsv_file)
-
-        cdh.create_subs_sess_list(
+        participant_ids, session_ids = cdh.list_subjects_sessions(
             input_dir=input_dir,
-            output_dir=output_dir,
-            file_name=tsv_file,
             is_bids_dir=is_bids_dir,
             use_session_tsv=use_session_tsv)
-
-    participant_ids, session_ids = read_participant_tsv(ss_file)
+    else:
+        participant_ids, session_ids = read_participant_tsv(ss_file)
     return session_ids, participant_ids
 
 
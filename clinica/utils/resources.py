@@ -0,0 +1,230 @@
+# coding: utf8
+
+"""
+This module contains the resource planner of the pipelines.
+
+The planner chooses the Nipype plugin and its arguments without asking anything to the user. The number of CPUs and
+the memory available to Clinica take into account the CPU affinity of the process and the cgroup limits (e.g. set by
+a batch scheduler like SLURM), so that a job only uses the resources allocated to it.
+
+The planner can be configured with the following environment variables:
+    - CLINICA_PLUGIN: Nipype plugin used to run the pipelines (default: the plugin given to Pipeline.run(),
+      MultiProc if none)
+    - CLINICA_MEMORY_GB: memory (in GB) available to the pipelines (default: memory available on the machine)
+"""
+
+import os
+
+
+def _read_first_line(file_path):
+    try:
+        with open(file_path, 'r') as f:
+            return f.readline().strip()
+    except (OSError, IOError):
+        return None
+
+
+def get_cgroup_directories(controller, cgroup_file='/proc/self/cgroup', cgroup_root='/sys/fs/cgroup'):
+    """Folders of the cgroup of the process for a controller, from the cgroup of the process up to the root cgroup.
+
+    The cgroup of the process is read from /proc/self/cgroup: the line of the controller for cgroup v1 (e.g.
+    '4:memory:/slurm/uid_1000/job_42'), the '0::' line for cgroup v2. As a limit set on a parent cgroup also applies
+    to the process, all the parents are listed. The root folders are always listed, since the cgroup of the process is
+    not visible inside the mount namespace of some containers.
+
+    Args:
+        controller (str): cgroup v1 controller (e.g. 'cpu' or 'memory')
+        cgroup_file (str): File listing the cgroups of the process
+        cgroup_root (str): Mount point of the cgroup file systems
+
+    Returns:
+        List of the existing cgroup v1 and cgroup v2 folders
+    """
+    v1_path, v2_path = '/', '/'
+    try:
+        with open(cgroup_file, 'r') as f:
+            for line in f:
+                fields = line.rstrip('\n').split(':', 2)
+                if len(fields) != 3:
+                    continue
+                if fields[0] == '0' and fields[1] == '':
+                    v2_path = fields[2]
+                elif controller in fields[1].split(','):
+                    v1_path = fields[2]
+    except (OSError, IOError):
+        pass
+
+    # cgroup v2 is mounted in cgroup_root, or in cgroup_root/unified on hybrid systems
+    mounts = [(os.path.join(cgroup_root, controller), v1_path),
+              (cgroup_root, v2_path),
+              (os.path.join(cgroup_root, 'unified'), v2_path)]
+    directories = []
+    for mount, path in mounts:
+        path = os.path.normpath('/' + path.lstrip('/'))
+        while True:
+            directory = os.path.normpath(os.path.join(mount, path.lstrip('/')))
+            if directory not in directories and os.path.isdir(directory):
+                directories.append(directory)
+            if path == '/':
+                break
+            path = os.path.dirname(path)
+    return directories
+
+
+def get_cgroup_cpu_limit():
+    """Number of CPUs allowed by the cgroup CPU quotas of the process (None if there is no quota)."""
+    import math
+
+    limits = []
+    for directory in get_cgroup_directories('cpu'):
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        cpu_max = _read_first_line(os.path.join(directory, 'cpu.max'))
+        if cpu_max is not None:
+            fields = cpu_max.split()
+            if len(fields) == 2 and fields[0] != 'max':
+                limits.append(float(fields[0]) / float(fields[1]))
+
+        # cgroup v1
+        quota = _read_first_line(os.path.join(directory, 'cpu.cfs_quota_us'))
+        period = _read_first_line(os.path.join(directory, 'cpu.cfs_period_us'))
+        if quota is not None and period is not None and int(quota) > 0 and int(period) > 0:
+            limits.append(float(quota) / float(period))
+
+    if not limits:
+        return None
+    return max(int(math.ceil(min(limits))), 1)
+
+
+def get_available_cpus():
+    """Number of CPUs the process can use (CPU affinity and cgroup quota)."""
+    from multiprocessing import cpu_count
+
+    try:
+        n_cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        # os.sched_getaffinity is not available on all platforms (e.g. macOS)
+        n_cpus = cpu_count()
+    cgroup_limit = get_cgroup_cpu_limit()
+    if cgroup_limit is not None:
+        n_cpus = min(n_cpus, cgroup_limit)
+    return max(n_cpus, 1)
+
+
+def get_default_n_procs():
+    """Number of available CPUs, minus one when Clinica can use all the CPUs of the machine (keeps it responsive)."""
+    from multiprocessing import cpu_count
+
+    n_cpus = get_available_cpus()
+    return max(n_cpus - 1 if n_cpus == cpu_count() else n_cpus, 1)
+
+
+def get_cgroup_memory_limit():
+    """Memory (in bytes) allowed by the cgroups of the process (None if there is no limit)."""
+    limits = []
+    for directory in get_cgroup_directories('memory'):
+        for limit_file in ['memory.max', 'memory.limit_in_bytes']:
+            limit = _read_first_line(os.path.join(directory, limit_file))
+            # cgroup v1 reports a huge number when there is no limit
+            if limit is not None and limit.isdigit() and int(limit) < 1 << 60:
+                limits.append(int(limit))
+    return min(limits) if limits else None
+
+
+def get_available_memory():
+    """Memory (in bytes) available to the process (available memory of the machine and cgroup limit).
+
+    Returns:
+        Available memory in bytes (None if it cannot be determined)
+    """
+    available_memory = None
+    try:
+        with open('/proc/meminfo', 'r') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    available_memory = int(line.split()[1]) * 1024
+                    break
+    except (OSError, IOError):
+        pass
+    if available_memory is None:
+        try:
+            available_memory = os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+        except (ValueError, OSError, AttributeError):
+            pass
+
+    cgroup_limit = get_cgroup_memory_limit()
+    if cgroup_limit is not None:
+        available_memory = cgroup_limit if available_memory is None else min(available_memory, cgroup_limit)
+    return available_memory
+
+
+def parse_memory_gb(memory):
+    """Convert a memory size of an info.json file (e.g. '500M', '2G' or a number of GB) into GB."""
+    if memory is None or isinstance(memory, (int, float)):
+        return memory
+    memory = str(memory).strip().upper().rstrip('B')
+    units = {'K': 1. / (1 << 20), 'M': 1. / (1 << 10), 'G': 1., 'T': float(1 << 10)}
+    if memory and memory[-1] in units:
+        return float(memory[:-1]) * units[memory[-1]]
+    return float(memory) / (1 << 30)
+
+
+def plan_resources(pipeline_name, n_images, plugin=None, plugin_args=None, memory_per_node_gb=None):
+    """Choose the Nipype plugin and its arguments to run a pipeline.
+
+    For the MultiProc plugin, the number of processes is the one given by the user (capped to the number of available
+    CPUs) or, by default, the number of available CPUs (minus one when Clinica can use all the CPUs of the machine,
+    to keep the machine responsive). When the memory needed by a node of the pipeline is known, the number of
+    processes is also limited so that the nodes running at the same time fit in the available memory. Other plugins
+    are used with the arguments given by the user.
+
+    Args:
+        pipeline_name (str): Name of the pipeline (written in the plan)
+        n_images (int): Number of images processed by the pipeline (written in the plan)
+        plugin (str): Plugin given to Pipeline.run() (None for MultiProc, overridden by CLINICA_PLUGIN)
+        plugin_args (dict): Arguments of the plugin given to Pipeline.run() (e.g. {'n_procs': 4})
+        memory_per_node_gb (float): Memory (in GB) needed by a node of the pipeline (None if unknown)
+
+    Returns:
+        (plugin, plugin_args, plan): plugin and arguments to give to Workflow.run(), and the plan (dictionary
+            describing the resources and the choices made)
+    """
+    plugin = os.environ.get('CLINICA_PLUGIN') or plugin or 'MultiProc'
+    plugin_args = dict(plugin_args) if plugin_args else {}
+
+    n_cpus = get_available_cpus()
+    available_memory = get_available_memory()
+    if os.environ.get('CLINICA_MEMORY_GB'):
+        memory_gb = float(os.environ['CLINICA_MEMORY_GB'])
+    elif available_memory is not None:
+        memory_gb = round(available_memory / float(1 << 30), 2)
+    else:
+        memory_gb = None
+
+    plan = {'pipeline': pipeline_name,
+            'n_images': n_images,
+            'plugin': plugin,
+            'available_cpus': n_cpus,
+            'available_memory_gb': memory_gb,
+            'memory_per_node_gb': memory_per_node_gb,
+            'warnings': []}
+
+    if plugin == 'MultiProc':
+        n_procs = plugin_args.get('n_procs')
+        if n_procs is None:
+            n_procs = get_default_n_procs()
+        elif n_procs > n_cpus:
+            plan['warnings'].append('%d processes were requested but only %d CPUs are available'
+                                    % (n_procs, n_cpus))
+            n_procs = n_cpus
+        if memory_per_node_gb and memory_gb and 'memory_gb' not in plugin_args:
+            n_procs_memory = int(memory_gb // memory_per_node_gb)
+            if n_procs_memory < n_procs:
+                plan['warnings'].append('The number of processes is limited to %d by the available memory'
+                                        % max(n_procs_memory, 1))
+                n_procs = n_procs_memory
+        plugin_args['n_procs'] = max(n_procs, 1)
+        if memory_gb is not None and 'memory_gb' not in plugin_args:
+            plugin_args['memory_gb'] = memory_gb
+
+    plan['plugin_args'] = plugin_args
+    return plugin, plugin_args, plan
@@ -3,9 +3,129 @@
 """
 This module contains utilities for statistics.
 
-Currently, it contains one function to generate TSV file containing mean map based on a parcellation.
+Currently, it contains functions to generate TSV files containing mean maps based on parcellations.
 """
 
+# Integer label volumes of the atlases already read, indexed by (path, size, mtime) of the atlas labels
+_atlas_labels_cache = {}
+
+
+def get_integer_labels(atlas_labels_file):
+    """
+    Read the label volume of an atlas as a flat array of integers.
+
+    The label volume is cached so that the atlas is read only once per process.
+
+    Args:
+        atlas_labels_file (str): Image containing the labels of the atlas.
+
+    Returns:
+        (labels, shape): labels (flat array of integers) and shape of the label volume.
+    """
+    import os
+    import nibabel as nib
+    import numpy as np
+
+    file_stat = os.stat(atlas_labels_file)
+    key = (os.path.abspath(atlas_labels_file), file_stat.st_size, file_stat.st_mtime_ns)
+    if key not in _atlas_labels_cache:
+        atlas_labels_data = np.asanyarray(nib.load(atlas_labels_file).dataobj)
+        labels = np.rint(atlas_labels_data).astype(np.int64).ravel()
+        _atlas_labels_cache[key] = (labels, atlas_labels_data.shape)
+    return _atlas_labels_cache[key]
+
+
+def label_statistics(img_data, labels, label_values):
+    """
+    Compute mean, std and number of voxels of an image for each label, in a single pass over the image.
+
+    Args:
+        img_data (numpy.ndarray): Image data (same number of voxels as labels).
+        labels (numpy.ndarray): Flat array of integer labels.
+        label_values (list): Labels for which the statistics are computed.
+
+    Returns:
+        (mean, std, count): arrays in the order of label_values (mean and std are NaN for empty labels).
+    """
+    import numpy as np
+
+    values = np.asarray(img_data, dtype=np.float64).ravel()
+    label_values = np.rint(np.asarray(label_values)).astype(np.int64)
+
+    # Labels are shifted so that np.bincount can be used with negative labels
+    offset = min(labels.min(), label_values.min(), 0) if labels.size > 0 else 0
+    shifted_labels = labels - offset if offset < 0 else labels
+    n_bins = max(int(shifted_labels.max()) + 1 if labels.size > 0 else 0, int(label_values.max() - offset) + 1)
+
+    count = np.bincount(shifted_labels, minlength=n_bins)
+    sum_values = np.bincount(shifted_labels, weights=values, minlength=n_bins)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_labels = sum_values / count
+        # Deviations to the mean of each label avoid the cancellation of sum(x^2) - n * mean^2
+        deviations = values - mean_labels[shifted_labels]
+        sum_squares = np.bincount(shifted_labels, weights=deviations * deviations, minlength=n_bins)
+        std_labels = np.sqrt(sum_squares / count)
+
+    index = label_values - offset
+    mean, std, count = mean_labels[index], std_labels[index], count[index]
+    return mean, std, count
+
+
+def statistics_on_atlases(in_normalized_map, in_atlases, out_files):
+    """
+    Compute statistics of a map on several atlases.
+
+    The map is loaded once and the statistics of all the labels of an atlas are computed in a single pass.
+
+    Args:
+        in_normalized_map (str): File containing a scalar image registered
+            on the atlases.
+        in_atlases (List[:obj: AbstractClass]): Atlases with a set of ROI.
+        out_files (List[str]): Names of the output files (one per atlas).
+
+    Returns:
+        out_files (List[str]): TSV files containing the statistics (content of the
+            columns: label, mean scalar, std of the scalar, number of voxels).
+    """
+    from clinica.utils.atlas import AtlasAbstract
+    import nibabel as nib
+    import numpy as np
+    import pandas
+    from clinica.utils.stream import cprint
+
+    for in_atlas in in_atlases:
+        if not isinstance(in_atlas, AtlasAbstract):
+            raise Exception("Atlas element must be an AtlasAbstract type")
+
+    img = nib.load(in_normalized_map)
+    img_data = np.asanyarray(img.dataobj)
+
+    for in_atlas, out_file in zip(in_atlases, out_files):
+        labels, labels_shape = get_integer_labels(in_atlas.get_atlas_labels())
+        if img_data.size != labels.size:
+            raise ValueError("Image %s (shape %s) and atlas %s (shape %s) do not have the same dimensions."
+                             % (in_normalized_map, img_data.shape, in_atlas.get_name_atlas(), labels_shape))
+
+        atlas_correspondence = pandas.io.parsers.read_csv(in_atlas.get_tsv_roi(), sep='\t')
+        label_name = list(atlas_correspondence.roi_name)
+        label_value = list(atlas_correspondence.roi_value)  # TODO create roi_value column in lut_*.txt and remove irrelevant RGB information
+
+        mean_signal_value, std_signal_value, n_voxels = label_statistics(img_data, labels, label_value)
+
+        try:
+            data = pandas.DataFrame({'label_name': label_name,
+                                     'mean_scalar': mean_signal_value,
+                                     'std_scalar': std_signal_value,
+                                     'number_of_voxels': n_voxels
+                                     })
+            data.to_csv(out_file, sep='\t', index=True, encoding='utf-8')
+        except Exception as e:
+            cprint("Impossible to save %s with pandas" % out_file)
+            raise e
+
+    return out_files
+
+
 def statistics_on_atlas(in_normalized_map, in_atlas, out_file=None):
     """
     Compute statistics of a map on an atlas.
@@ -25,11 +145,7 @@ def statistics_on_atlas(in_normalized_map, in_atlas, out_file=None):
             columns: label, mean scalar, std of the scalar', number of voxels).
     """
     from clinica.utils.atlas import AtlasAbstract
-    import nibabel as nib
-    import numpy as np
-    import pandas
     import os.path as op
-    from clinica.utils.stream import cprint
 
     if not isinstance(in_atlas, AtlasAbstract):
         raise Exception("Atlas element must be an AtlasAbstract type")
@@ -42,30 +158,6 @@ def statistics_on_atlas(in_normalized_map, in_atlas, out_file=None):
         out_file = op.abspath("%s_statistics_%s.tsv"
                               % (fname, in_atlas.get_name_atlas()))
 
-    atlas_labels = nib.load(in_atlas.get_atlas_labels())
-    atlas_labels_data = atlas_labels.get_data()
-
-    img = nib.load(in_normalized_map)
-    img_data = img.get_data()
-
-    atlas_correspondence = pandas.io.parsers.read_csv(in_atlas.get_tsv_roi(), sep='\t')
-    label_name = list(atlas_correspondence.roi_name)
-    label_value = list(atlas_correspondence.roi_value)  # TODO create roi_value column in lut_*.txt and remove irrelevant RGB information
-
-    mean_signal_value = []
-    for label in label_value:
-        current_mask_label = atlas_labels_data == label
-        masked_data = np.array(img_data, copy=True)
-        masked_data[np.invert(current_mask_label)] = 0
-        mean_signal_value.append(np.sum(masked_data) / np.sum(current_mask_label))
-
-    try:
-        data = pandas.DataFrame({'label_name': label_name,
-                                 'mean_scalar': mean_signal_value
-                                 })
-        data.to_csv(out_file, sep='\t', index=True, encoding='utf-8')
-    except Exception as e:
-        cprint("Impossible to save %s with pandas" % out_file)
-        raise e
+    [out_file] = statistics_on_atlases(in_normalized_map, [in_atlas], [out_file])
 
     return out_file
@@ -0,0 +1,135 @@
+# coding: utf8
+
+"""
+    Unit tests of the conversion manifest of the ADNI, AIBL and NIFD converters (clinica.iotools.conversion_manifest)
+"""
+
+
+def create_dicom_folder(folder, n_slices=3):
+    import os
+
+    os.makedirs(str(folder), exist_ok=True)
+    for i in range(n_slices):
+        with open(os.path.join(str(folder), 'slice_%03d.dcm' % i), 'w') as dicom:
+            dicom.write('slice %d' % i)
+
+
+def create_output(bids_dir, relative_path, extensions=('.nii.gz', '.json')):
+    import os
+
+    output_stem = os.path.join(str(bids_dir), relative_path)
+    os.makedirs(os.path.dirname(output_stem), exist_ok=True)
+    for extension in extensions:
+        open(output_stem + extension, 'w').close()
+    return output_stem + extensions[0]
+
+
+def test_compute_source_signature(tmp_path):
+    import os
+    from clinica.iotools.conversion_manifest import compute_source_signature
+
+    dicom_folder = tmp_path / 'dicom'
+    create_dicom_folder(dicom_folder)
+    signature = compute_source_signature(str(dicom_folder))
+    assert signature == compute_source_signature(str(dicom_folder))
+
+    # A new slice changes the signature
+    create_dicom_folder(dicom_folder, n_slices=4)
+    assert compute_source_signature(str(dicom_folder)) != signature
+    signature = compute_source_signature(str(dicom_folder))
+
+    # A modified slice (size or mtime) changes the signature
+    slice_file = str(dicom_folder / 'slice_000.dcm')
+    os.utime(slice_file, ns=(0, 10 ** 18))
+    assert compute_source_signature(str(dicom_folder)) != signature
+
+    assert compute_source_signature(str(tmp_path / 'missing')) is None
+
+
+def test_manifest_skips_converted_images(tmp_path):
+    from clinica.iotools.conversion_manifest import ConversionManifest, compute_source_signature
+
+    bids_dir = tmp_path / 'bids'
+    dicom_folder = tmp_path / 'dicom'
+    create_dicom_folder(dicom_folder)
+    signature = compute_source_signature(str(dicom_folder))
+    output_image = create_output(bids_dir, 'sub-01/ses-M00/anat/sub-01_ses-M00_T1w')
+
+    manifest = ConversionManifest(str(bids_dir), 'adni-to-bids-1.0')
+    assert not manifest.is_up_to_date('t1_01_bl_1', signature)
+    manifest.record('t1_01_bl_1', signature, output_image)
+    assert manifest.is_up_to_date('t1_01_bl_1', signature)
+
+    # The manifest is read again by the next conversion
+    manifest = ConversionManifest(str(bids_dir), 'adni-to-bids-1.0')
+    assert manifest.is_up_to_date('t1_01_bl_1', signature)
+    assert manifest.get_output_path('t1_01_bl_1') == output_image
+    assert manifest.get_output_path('t1_01_bl_2') is None
+
+    # New source, new converter version or missing output: the image is converted again
+    create_dicom_folder(dicom_folder, n_slices=4)
+    assert not manifest.is_up_to_date('t1_01_bl_1', compute_source_signature(str(dicom_folder)))
+    assert not ConversionManifest(str(bids_dir), 'adni-to-bids-2.0').is_up_to_date('t1_01_bl_1', signature)
+    assert not manifest.is_up_to_date('t1_01_bl_1', None)
+    (bids_dir / 'sub-01' / 'ses-M00' / 'anat' / 'sub-01_ses-M00_T1w.nii.gz').unlink()
+    assert not manifest.is_up_to_date('t1_01_bl_1', signature)
+
+
+def test_manifest_does_not_record_failed_conversions(tmp_path):
+    import os
+    from clinica.iotools.conversion_manifest import ConversionManifest
+
+    bids_dir = tmp_path / 'bids'
+    manifest = ConversionManifest(str(bids_dir), 'adni-to-bids-1.0')
+    manifest.record('t1_01_bl_1', 'signature', None)
+    manifest.record('t1_01_bl_1', 'signature', str(bids_dir / 'missing.nii.gz'))
+    manifest.record('t1_01_bl_1', None, create_output(bids_dir, 'sub-01/ses-M00/anat/sub-01_ses-M00_T1w'))
+    assert manifest.get_output_path('t1_01_bl_1') is None
+    assert not os.path.isfile(manifest.manifest_file)
+
+
+def test_manifest_last_record_wins_and_truncated_line(tmp_path):
+    from clinica.iotools.conversion_manifest import ConversionManifest
+
+    bids_dir = tmp_path / 'bids'
+    first_output = create_output(bids_dir, 'sub-01/ses-M00/anat/sub-01_ses-M00_run-01_T1w')
+    second_output = create_output(bids_dir, 'sub-01/ses-M00/anat/sub-01_ses-M00_run-02_T1w')
+    manifest = ConversionManifest(str(bids_dir), 'adni-to-bids-1.0')
+    manifest.record('t1_01_bl_1', 'first', first_output)
+    manifest.record('t1_01_bl_1', 'second', second_output)
+
+    # Interrupted write of a third record
+    with open(manifest.manifest_file, 'a', encoding='utf-8') as manifest_file:
+        manifest_file.write('t1_01_bl_2\tthird\tadni')
+
+    manifest = ConversionManifest(str(bids_dir), 'adni-to-bids-1.0')
+    assert manifest.is_up_to_date('t1_01_bl_1', 'second')
+    assert manifest.get_output_path('t1_01_bl_1') == second_output
+    assert manifest.get_output_path('t1_01_bl_2') is None
+
+    # The next record starts on a new line
+    manifest.record('t1_01_bl_3', 'fourth', first_output)
+    manifest = ConversionManifest(str(bids_dir), 'adni-to-bids-1.0')
+    assert manifest.is_up_to_date('t1_01_bl_3', 'fourth')
+    assert manifest.is_up_to_date('t1_01_bl_1', 'second')
+
+
+def test_manifest_remove_outputs(tmp_path):
+    import os
+    from clinica.iotools.conversion_manifest import ConversionManifest
+
+    bids_dir = tmp_path / 'bids'
+    output_image = create_output(bids_dir, 'sub-01/ses-M00/dwi/sub-01_ses-M00_dwi',
+                                 extensions=('.nii.gz', '.json', '.bval', '.bvec'))
+    other_image = create_output(bids_dir, 'sub-01/ses-M00/dwi/sub-01_ses-M00_acq-axial_dwi')
+    manifest = ConversionManifest(str(bids_dir), 'adni-to-bids-1.0')
+    manifest.record('dwi_01_bl_1', 'signature', output_image)
+
+    manifest.remove_outputs('dwi_01_bl_1')
+    assert sorted(os.listdir(str(bids_dir / 'sub-01' / 'ses-M00' / 'dwi'))) == [
+        'sub-01_ses-M00_acq-axial_dwi.json',
+        'sub-01_ses-M00_acq-axial_dwi.nii.gz',
+    ]
+    assert os.path.isfile(other_image)
+    # Nothing to remove for an image that is not in the manifest
+    manifest.remove_outputs('dwi_01_bl_2')
@@ -0,0 +1,168 @@
+# coding: utf8
+
+"""
+    Unit tests of the scheduler of the ADNI, AIBL and NIFD conversions (clinica.iotools.conversion_scheduler)
+"""
+
+import os
+
+import pytest
+
+
+@pytest.fixture
+def conversion_slots(monkeypatch):
+    """Two conversion slots shared by the schedulers of the test."""
+    import threading
+    from clinica.iotools import conversion_scheduler
+
+    monkeypatch.setattr(conversion_scheduler, '_conversion_slots', threading.BoundedSemaphore(2))
+    return 2
+
+
+def test_imap_keeps_order(tmp_path, conversion_slots):
+    import time
+    from clinica.iotools.conversion_scheduler import ConversionScheduler
+
+    def convert(task):
+        # Later tasks finish first
+        time.sleep(0.01 * (5 - task))
+        output_image = str(tmp_path / ('image_%d.nii.gz' % task))
+        open(output_image, 'w').close()
+        return output_image
+
+    scheduler = ConversionScheduler('T1', n_workers=4, retries=0)
+    results = list(scheduler.imap(convert, range(5)))
+    assert results == [str(tmp_path / ('image_%d.nii.gz' % task)) for task in range(5)]
+    assert [report['status'] for report in scheduler.reports] == ['converted'] * 5
+
+
+def test_conversion_slots_bound_concurrency(conversion_slots):
+    import threading
+    import time
+    from clinica.iotools.conversion_scheduler import ConversionScheduler
+
+    lock = threading.Lock()
+    running = [0]
+    max_running = [0]
+
+    def convert(task):
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return task
+
+    # Two schedulers with 4 workers each share the 2 conversion slots of the process
+    schedulers = [ConversionScheduler(name, n_workers=4, retries=0) for name in ['T1', 'PET']]
+    threads = [threading.Thread(target=scheduler.map, args=(convert, range(6)), kwargs={'succeeded': lambda r: True})
+               for scheduler in schedulers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max_running[0] <= conversion_slots
+    assert all(len(scheduler.reports) == 6 for scheduler in schedulers)
+
+
+def test_failed_conversions_are_retried(conversion_slots):
+    from clinica.iotools.conversion_scheduler import ConversionScheduler
+
+    attempts = {}
+
+    def convert(task):
+        attempts[task] = attempts.get(task, 0) + 1
+        if task == 'flaky' and attempts[task] == 1:
+            raise RuntimeError('dcm2niix crashed')
+        if task == 'broken':
+            return None
+        return task
+
+    scheduler = ConversionScheduler('DWI', n_workers=2, retries=2)
+    results = scheduler.map(convert, ['flaky', 'broken', 'ok'], succeeded=lambda result: result is not None)
+    assert results == ['flaky', None, 'ok']
+    assert attempts == {'flaky': 2, 'broken': 3, 'ok': 1}
+    reports = {report['name']: report for report in scheduler.reports}
+    assert (reports['0']['status'], reports['0']['attempts']) == ('converted', 2)
+    assert (reports['1']['status'], reports['1']['attempts']) == ('failed', 3)
+    assert (reports['2']['status'], reports['2']['attempts']) == ('converted', 1)
+
+
+def test_conversion_timeout(conversion_slots):
+    import time
+    from clinica.iotools.conversion_scheduler import ConversionScheduler, run_conversion_command
+
+    def convert(task):
+        run_conversion_command('sleep 10')
+        return task
+
+    scheduler = ConversionScheduler('FDG', n_workers=1, timeout=0.2, retries=0)
+    start = time.monotonic()
+    assert scheduler.map(convert, ['slow'], task_names=['subject 01'], succeeded=lambda r: True) == [None]
+    assert time.monotonic() - start < 5
+    assert scheduler.reports[0]['name'] == 'subject 01'
+    assert scheduler.reports[0]['status'] == 'failed'
+
+
+def is_running(pid):
+    """Check if a process is alive (a killed process waiting to be reaped by init is not)."""
+    try:
+        with open('/proc/%d/stat' % pid, 'r') as stat:
+            return stat.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except (OSError, IOError):
+        return False
+
+
+def test_conversion_timeout_kills_converter(tmp_path):
+    """The converter started by the shell of the command is killed with it."""
+    import subprocess
+    import time
+    from clinica.iotools import conversion_scheduler
+
+    if not os.path.isdir('/proc'):
+        pytest.skip('/proc is needed to check the processes')
+    pid_file = tmp_path / 'converter.pid'
+    conversion_scheduler._current_conversion.deadline = time.monotonic() + 1
+    try:
+        with pytest.raises(subprocess.TimeoutExpired):
+            conversion_scheduler.run_conversion_command('sleep 30 & echo $! > %s; wait' % pid_file)
+    finally:
+        conversion_scheduler._current_conversion.deadline = None
+
+    pid = int(pid_file.read_text())
+    for _ in range(50):
+        if not is_running(pid):
+            break
+        time.sleep(0.1)
+    assert not is_running(pid)
+
+
+def test_scheduler_environment(monkeypatch):
+    from clinica.iotools.conversion_scheduler import ConversionScheduler, get_conversion_workers
+
+    monkeypatch.setenv('CLINICA_CONVERSION_WORKERS', '3')
+    monkeypatch.setenv('CLINICA_CONVERSION_TIMEOUT', '60')
+    monkeypatch.setenv('CLINICA_CONVERSION_RETRIES', '4')
+    assert get_conversion_workers() == 3
+    scheduler = ConversionScheduler('T1')
+    assert (scheduler.n_workers, scheduler.timeout, scheduler.retries) == (3, 60.0, 4)
+
+    monkeypatch.setenv('CLINICA_CONVERSION_WORKERS', '0')
+    assert get_conversion_workers() == 1
+
+
+def test_write_reports(tmp_path, conversion_slots):
+    from clinica.iotools.conversion_scheduler import ConversionScheduler
+
+    scheduler = ConversionScheduler('T1', n_workers=2, retries=0)
+    scheduler.map(lambda task: task, ['a', 'b'], task_names=['subject a', 'subject b'], succeeded=lambda r: True)
+    tsv_file = tmp_path / 'conversion_info' / 'conversion_timings.tsv'
+    scheduler.write_reports(str(tsv_file))
+    scheduler.write_reports(str(tsv_file))
+
+    lines = tsv_file.read_text().splitlines()
+    assert lines[0] == 'name\tstatus\tattempts\tduration'
+    assert len(lines) == 5
+    assert sorted(line.split('\t')[0] for line in lines[1:3]) == ['subject a', 'subject b']
+    assert all(line.split('\t')[1:3] == ['converted', '1'] for line in lines[1:])
@@ -0,0 +1,131 @@
+# coding: utf8
+
+"""
+    Unit tests of the conversion of cross-sectional BIDS datasets (clinica.iotools.utils.data_handling)
+"""
+
+import pytest
+
+
+def write_files(root, relative_files):
+    import os
+
+    for relative_file in relative_files:
+        path = os.path.join(str(root), relative_file)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(relative_file)
+
+
+@pytest.fixture
+def bids(tmp_path):
+    """BIDS dataset with a cross-sectional subject (sub-01) and a longitudinal subject (sub-02)."""
+    bids = tmp_path / 'bids'
+    write_files(bids, ['sub-01/anat/sub-01_T1w.nii.gz',
+                       'sub-01/pet/sub-01_ses-M12_pet.nii.gz',
+                       'sub-01/sub-01_scans.tsv',
+                       'sub-01/.hidden',
+                       'sub-02/ses-M00/anat/sub-02_ses-M00_T1w.nii.gz',
+                       'sub-02/sub-02_sessions.tsv'])
+    return bids
+
+
+# Files of the converted dataset and the files of the original dataset they come from
+CONVERTED_FILES = {'sub-01/ses-M00/anat/sub-01_ses-M00_T1w.nii.gz': 'sub-01/anat/sub-01_T1w.nii.gz',
+                   'sub-01/ses-M00/pet/sub-01_ses-M12_pet.nii.gz': 'sub-01/pet/sub-01_ses-M12_pet.nii.gz',
+                   'sub-01/ses-M00/sub-01_ses-M00_scans.tsv': 'sub-01/sub-01_scans.tsv',
+                   'sub-02/ses-M00/anat/sub-02_ses-M00_T1w.nii.gz': 'sub-02/ses-M00/anat/sub-02_ses-M00_T1w.nii.gz',
+                   'sub-02/sub-02_sessions.tsv': 'sub-02/sub-02_sessions.tsv'}
+
+
+def list_files(root):
+    import os
+
+    return sorted(os.path.relpath(os.path.join(folder, f), str(root)).replace(os.sep, '/')
+                  for folder, _, files in os.walk(str(root)) for f in files)
+
+
+def check_converted_dataset(output):
+    for converted, original in CONVERTED_FILES.items():
+        assert (output / converted).read_text() == original
+    assert list_files(output) == sorted(CONVERTED_FILES)
+
+
+@pytest.mark.parametrize('filename, expected', [
+    ('sub-ADNI001_scans.tsv', 'sub-ADNI001_ses-M00_scans.tsv'),
+    ('sub-023a_ses-M12_T1w.nii.gz', 'sub-023a_ses-M12_T1w.nii.gz'),
+    ('dataset_description.json', 'dataset_description.json'),
+])
+def test_add_session_to_filename(filename, expected):
+    from clinica.iotools.utils.data_handling import _add_session_to_filename
+
+    assert _add_session_to_filename(filename) == expected
+
+
+def test_convert_cross_sectional_copy(bids, tmp_path):
+    import os
+    from clinica.iotools.utils.data_handling import convert_cross_sectional
+
+    output = tmp_path / 'bids_clinica_compliant'
+    convert_cross_sectional(str(bids), str(output), ['sub-01'], ['sub-02'])
+    check_converted_dataset(output)
+    for converted, original in CONVERTED_FILES.items():
+        assert not os.path.islink(str(output / converted))
+        assert not os.path.samefile(str(output / converted), str(bids / original))
+
+
+def test_convert_cross_sectional_hardlink(bids, tmp_path):
+    import os
+    from clinica.iotools.utils.data_handling import convert_cross_sectional
+
+    output = tmp_path / 'bids_clinica_compliant'
+    convert_cross_sectional(str(bids), str(output), ['sub-01'], ['sub-02'], mode='hardlink')
+    check_converted_dataset(output)
+    for converted, original in CONVERTED_FILES.items():
+        assert not os.path.islink(str(output / converted))
+        assert os.path.samefile(str(output / converted), str(bids / original))
+
+
+def test_convert_cross_sectional_symlink(bids, tmp_path, monkeypatch):
+    import os
+    from clinica.iotools.utils.data_handling import convert_cross_sectional
+
+    # The links point to absolute paths, even if the dataset is given with a relative path
+    monkeypatch.chdir(str(tmp_path))
+    convert_cross_sectional('bids', 'bids_clinica_compliant', ['sub-01'], ['sub-02'], mode='symlink')
+    output = tmp_path / 'bids_clinica_compliant'
+    check_converted_dataset(output)
+    for converted, original in CONVERTED_FILES.items():
+        assert os.path.islink(str(output / converted))
+        assert os.readlink(str(output / converted)) == os.path.abspath(str(bids / original))
+
+
+@pytest.mark.parametrize('mode, link_function', [('hardlink', 'link'), ('symlink', 'symlink')])
+def test_convert_cross_sectional_falls_back_to_copy(bids, tmp_path, monkeypatch, mode, link_function):
+    import errno
+    import os
+    from clinica.iotools.utils.data_handling import convert_cross_sectional
+
+    def refuse_link(src, dst):
+        raise OSError(errno.EXDEV, 'Invalid cross-device link')
+
+    monkeypatch.setattr(os, link_function, refuse_link)
+    output = tmp_path / 'bids_clinica_compliant'
+    convert_cross_sectional(str(bids), str(output), ['sub-01'], ['sub-02'], mode=mode)
+    check_converted_dataset(output)
+    for converted, original in CONVERTED_FILES.items():
+        assert not os.path.islink(str(output / converted))
+        assert not os.path.samefile(str(output / converted), str(bids / original))
+
+
+@pytest.mark.parametrize('value, expected', [
+    (None, 'copy'), ('hardlink', 'hardlink'), ('SYMLINK', 'symlink'), ('virtual', 'copy'), ('unknown', 'copy'),
+])
+def test_get_cross_sectional_conversion_mode(monkeypatch, value, expected):
+    from clinica.iotools.utils.data_handling import get_cross_sectional_conversion_mode
+
+    if value is None:
+        monkeypatch.delenv('CLINICA_CROSS_SECTIONAL_CONVERSION', raising=False)
+    else:
+        monkeypatch.setenv('CLINICA_CROSS_SECTIONAL_CONVERSION', value)
+    assert get_cross_sectional_conversion_mode() == expected
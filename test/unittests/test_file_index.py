@@ -0,0 +1,174 @@
+# coding: utf8
+
+"""
+    Unit tests of the persistent file index (clinica.utils.file_index) used by clinica_{file|group}_reader
+"""
+
+import pytest
+
+
+def create_tree(root, relative_files):
+    import os
+
+    for relative_file in relative_files:
+        path = os.path.join(str(root), relative_file)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "w").close()
+
+
+def set_old_mtime(directory):
+    """Set the modification time of a folder one hour in the past (out of the racy-mtime window)."""
+    import os
+    import time
+
+    old_time = time.time() - 3600
+    os.utime(str(directory), (old_time, old_time))
+    return os.stat(str(directory)).st_mtime_ns
+
+
+@pytest.fixture
+def file_index_home(tmp_path, monkeypatch):
+    """Store the file indexes in a temporary home folder and forget the indexes opened by other tests."""
+    from clinica.utils import file_index
+
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("CLINICA_FILE_INDEX", "1")
+    monkeypatch.setattr(file_index, "_file_indexes", {})
+    return tmp_path
+
+
+def find_with_glob(input_directory, relative_directory, patterns, monkeypatch):
+    from clinica.utils.inputs import find_files_recursively
+
+    with monkeypatch.context() as context:
+        context.setenv("CLINICA_FILE_INDEX", "0")
+        return find_files_recursively(input_directory, relative_directory, patterns)
+
+
+BIDS_FILES = [
+    "sub-01/ses-M00/anat/sub-01_ses-M00_T1w.nii.gz",
+    "sub-01/ses-M00/anat/sub-01_ses-M00_T1w.json",
+    "sub-01/ses-M00/pet/sub-01_ses-M00_task-rest_acq-fdg_pet.nii.gz",
+    "sub-01/ses-M12/anat/SUB-01_SES-M12_T1W.NII.GZ",
+    "sub-02/ses-M00/anat/sub-02_ses-M00_T1w.nii",
+    "sub-02/ses-M00/anat/.hidden/sub-02_ses-M00_T1w.nii",
+    "sub-02/ses-M00/.anat/sub-02_ses-M00_T1w.nii.gz",
+    "sub-02/ses-M00/dwi/sub-02_ses-M00_dwi.nii.gz",
+]
+
+PATTERNS = [
+    "sub-*_ses-*_t1w.nii*",
+    "*_pet.nii*",
+    "anat/*.json",
+    "dwi/sub-*_dwi.nii.gz",
+    "*_flair.nii*",
+]
+
+
+@pytest.mark.parametrize(
+    "relative_directory",
+    ["", "sub-01/ses-M00", "sub-01/ses-M12", "sub-02/ses-M00", "sub-02", "sub-03/ses-M00"],
+)
+def test_find_files_recursively_matches_glob(file_index_home, monkeypatch, relative_directory):
+    from clinica.utils.inputs import find_files_recursively
+
+    bids = file_index_home / "bids"
+    create_tree(bids, BIDS_FILES)
+
+    expected = find_with_glob(str(bids), relative_directory, PATTERNS, monkeypatch)
+    found = find_files_recursively(str(bids), relative_directory, PATTERNS)
+    assert [sorted(files) for files in found] == [sorted(files) for files in expected]
+
+
+def test_find_files_recursively_stale_index(file_index_home, monkeypatch):
+    import os
+    import shutil
+    from clinica.utils.inputs import find_files_recursively
+
+    bids = file_index_home / "bids"
+    create_tree(bids, BIDS_FILES)
+    # Fill the index, then change the tree
+    find_files_recursively(str(bids), "", PATTERNS)
+
+    os.remove(str(bids / "sub-01" / "ses-M00" / "anat" / "sub-01_ses-M00_T1w.nii.gz"))
+    shutil.rmtree(str(bids / "sub-02" / "ses-M00" / "dwi"))
+    create_tree(
+        bids,
+        [
+            "sub-03/ses-M00/anat/sub-03_ses-M00_T1w.nii.gz",
+            "sub-01/ses-M00/anat/sub-01_ses-M00_FLAIR.nii.gz",
+        ],
+    )
+
+    for relative_directory in ["", "sub-01/ses-M00", "sub-02/ses-M00", "sub-03/ses-M00"]:
+        expected = find_with_glob(str(bids), relative_directory, PATTERNS, monkeypatch)
+        found = find_files_recursively(str(bids), relative_directory, PATTERNS)
+        assert [sorted(files) for files in found] == [sorted(files) for files in expected]
+
+
+def test_file_index_racy_mtime(tmp_path):
+    """A folder modified within the racy-mtime window must be listed again even if its mtime did not change."""
+    import os
+    from clinica.utils.file_index import FileIndex
+
+    bids = tmp_path / "bids"
+    anat = bids / "sub-01" / "ses-M00" / "anat"
+    create_tree(bids, ["sub-01/ses-M00/anat/sub-01_ses-M00_T1w.nii.gz"])
+    file_index = FileIndex(str(bids), cache_directory=str(tmp_path / "cache"))
+    assert file_index.find("", "*_t1w.nii.gz") == ["sub-01/ses-M00/anat/sub-01_ses-M00_T1w.nii.gz"]
+
+    # New file within the same mtime tick: the mtime of the folder is restored to its value at the last refresh
+    mtime = os.stat(str(anat)).st_mtime_ns
+    create_tree(bids, ["sub-01/ses-M00/anat/sub-01_ses-M00_FLAIR.nii.gz"])
+    os.utime(str(anat), ns=(mtime, mtime))
+    assert file_index.find("", "*.nii.gz") == [
+        "sub-01/ses-M00/anat/sub-01_ses-M00_FLAIR.nii.gz",
+        "sub-01/ses-M00/anat/sub-01_ses-M00_T1w.nii.gz",
+    ]
+
+
+def test_file_index_trusts_old_mtime(tmp_path):
+    """A folder whose mtime is out of the racy-mtime window is not listed again while its mtime is unchanged."""
+    import os
+    from clinica.utils.file_index import FileIndex
+
+    bids = tmp_path / "bids"
+    anat = bids / "sub-01" / "ses-M00" / "anat"
+    create_tree(bids, ["sub-01/ses-M00/anat/sub-01_ses-M00_T1w.nii.gz"])
+    mtime = set_old_mtime(anat)
+    file_index = FileIndex(str(bids), cache_directory=str(tmp_path / "cache"))
+    file_index.find("", "*.nii.gz")
+
+    create_tree(bids, ["sub-01/ses-M00/anat/sub-01_ses-M00_FLAIR.nii.gz"])
+    os.utime(str(anat), ns=(mtime, mtime))
+    assert file_index.find("", "*.nii.gz") == ["sub-01/ses-M00/anat/sub-01_ses-M00_T1w.nii.gz"]
+
+    # Once the folder mtime changes, the index is up to date again
+    set_old_mtime(anat)
+    assert len(file_index.find("", "*.nii.gz")) == 2
+
+
+def test_file_index_persistent(tmp_path):
+    from clinica.utils.file_index import FileIndex
+
+    bids = tmp_path / "bids"
+    create_tree(bids, BIDS_FILES)
+    cache = str(tmp_path / "cache")
+    first = FileIndex(str(bids), cache_directory=cache).find("", "*_t1w.nii*")
+    second = FileIndex(str(bids), cache_directory=cache).find("", "*_t1w.nii*", refresh=False)
+    assert first == second
+    assert len(first) == 3
+
+
+def test_file_index_file_suffixes(tmp_path):
+    from clinica.utils.file_index import FileIndex
+
+    bids = tmp_path / "bids"
+    create_tree(bids, BIDS_FILES)
+    file_index = FileIndex(str(bids), cache_directory=str(tmp_path / "cache"), file_suffixes=[".json"])
+    assert file_index.find("", "*.*") == ["sub-01/ses-M00/anat/sub-01_ses-M00_T1w.json"]
+    assert file_index.directories_named(["anat"])["anat"] == [
+        "sub-01/ses-M00/anat",
+        "sub-01/ses-M12/anat",
+        "sub-02/ses-M00/anat",
+    ]
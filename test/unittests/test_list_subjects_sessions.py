@@ -0,0 +1,134 @@
+# coding: utf8
+
+"""
+    Unit tests of the listing of the subjects and sessions kept in memory (clinica.iotools.utils.data_handling)
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    """Forget the listings of the other tests."""
+    from clinica.iotools.utils import data_handling
+
+    monkeypatch.setattr(data_handling, '_subjects_sessions_cache', {})
+
+
+def create_folders(root, relative_folders):
+    import os
+
+    for relative_folder in relative_folders:
+        os.makedirs(os.path.join(str(root), relative_folder), exist_ok=True)
+
+
+def write_sessions_tsv(bids, subject, sessions):
+    import os
+
+    with open(os.path.join(str(bids), subject, subject + '_sessions.tsv'), 'w') as f:
+        f.write('session_id\n' + ''.join(session + '\n' for session in sessions))
+    return os.path.join(str(bids), subject, subject + '_sessions.tsv')
+
+
+def set_old_mtime(path, age=3600):
+    """Set the modification time of a file or folder out of the racy-mtime window."""
+    import os
+    import time
+
+    old_time = time.time() - age
+    os.utime(str(path), (old_time, old_time))
+    return os.stat(str(path)).st_mtime_ns
+
+
+def test_list_subjects_sessions(tmp_path):
+    from clinica.iotools.utils.data_handling import list_subjects_sessions
+
+    bids = tmp_path / 'bids'
+    create_folders(bids, ['sub-02/ses-M00', 'sub-01/ses-M12', 'sub-01/ses-M00', 'sub-01/.ses-hidden',
+                          'sub-01/anat', '.sub-03/ses-M00'])
+    subjects, sessions = list_subjects_sessions(str(bids), n_threads=2)
+    # Subjects are sorted, the sessions of a subject are in the order of the file system
+    assert subjects == ['sub-01', 'sub-01', 'sub-02']
+    assert sorted(zip(subjects, sessions)) == [('sub-01', 'ses-M00'), ('sub-01', 'ses-M12'), ('sub-02', 'ses-M00')]
+
+    caps = tmp_path / 'caps'
+    create_folders(caps, ['subjects/sub-01/ses-M00'])
+    assert list_subjects_sessions(str(caps), is_bids_dir=False) == (['sub-01'], ['ses-M00'])
+
+    with pytest.raises(IOError):
+        list_subjects_sessions(str(tmp_path / 'missing'))
+
+
+def test_session_added_after_listing(tmp_path):
+    import os
+    from clinica.iotools.utils.data_handling import list_subjects_sessions
+
+    bids = tmp_path / 'bids'
+    create_folders(bids, ['sub-01/ses-M00'])
+    set_old_mtime(bids / 'sub-01', age=7200)
+    assert list_subjects_sessions(str(bids)) == (['sub-01'], ['ses-M00'])
+
+    # A new session changes the mtime of the subject folder
+    create_folders(bids, ['sub-01/ses-M12'])
+    set_old_mtime(bids / 'sub-01')
+    subjects, sessions = list_subjects_sessions(str(bids))
+    assert (subjects, sorted(sessions)) == (['sub-01', 'sub-01'], ['ses-M00', 'ses-M12'])
+
+    # A folder whose mtime did not change is not listed again
+    mtime = os.stat(str(bids / 'sub-01')).st_mtime_ns
+    create_folders(bids, ['sub-01/ses-M24'])
+    os.utime(str(bids / 'sub-01'), ns=(mtime, mtime))
+    subjects, sessions = list_subjects_sessions(str(bids))
+    assert sorted(sessions) == ['ses-M00', 'ses-M12']
+
+    # A new subject is always found
+    create_folders(bids, ['sub-02/ses-M00'])
+    subjects, _ = list_subjects_sessions(str(bids))
+    assert sorted(set(subjects)) == ['sub-01', 'sub-02']
+
+
+def test_racy_mtime(tmp_path):
+    """A folder modified within the racy-mtime window is listed again even if its mtime did not change."""
+    import os
+    from clinica.iotools.utils.data_handling import list_subjects_sessions
+
+    bids = tmp_path / 'bids'
+    create_folders(bids, ['sub-01/ses-M00'])
+    assert list_subjects_sessions(str(bids)) == (['sub-01'], ['ses-M00'])
+
+    mtime = os.stat(str(bids / 'sub-01')).st_mtime_ns
+    create_folders(bids, ['sub-01/ses-M12'])
+    os.utime(str(bids / 'sub-01'), ns=(mtime, mtime))
+    subjects, sessions = list_subjects_sessions(str(bids))
+    assert sorted(sessions) == ['ses-M00', 'ses-M12']
+
+
+def test_sessions_tsv(tmp_path):
+    import os
+    from clinica.iotools.utils.data_handling import list_subjects_sessions
+
+    bids = tmp_path / 'bids'
+    # The session folders are not read in this mode
+    create_folders(bids, ['sub-01/ses-M00', 'sub-01/ses-M06'])
+    sessions_tsv = write_sessions_tsv(bids, 'sub-01', ['ses-M00', 'ses-M12 '])
+    set_old_mtime(sessions_tsv, age=7200)
+    assert list_subjects_sessions(str(bids), use_session_tsv=True) == (['sub-01', 'sub-01'], ['ses-M00', 'ses-M12'])
+    # The listings of the two modes are kept separately
+    assert sorted(list_subjects_sessions(str(bids))[1]) == ['ses-M00', 'ses-M06']
+
+    write_sessions_tsv(bids, 'sub-01', ['ses-M00', 'ses-M12', 'ses-M24'])
+    mtime = set_old_mtime(sessions_tsv)
+    assert list_subjects_sessions(str(bids), use_session_tsv=True)[1] == ['ses-M00', 'ses-M12', 'ses-M24']
+
+    # Same mtime out of the racy window: the cached listing is used
+    write_sessions_tsv(bids, 'sub-01', ['ses-M00'])
+    os.utime(sessions_tsv, ns=(mtime, mtime))
+    assert list_subjects_sessions(str(bids), use_session_tsv=True)[1] == ['ses-M00', 'ses-M12', 'ses-M24']
+
+    # Same mtime within the racy window: the file is read again
+    write_sessions_tsv(bids, 'sub-01', ['ses-M00', 'ses-M36'])
+    mtime = os.stat(sessions_tsv).st_mtime_ns
+    list_subjects_sessions(str(bids), use_session_tsv=True)
+    write_sessions_tsv(bids, 'sub-01', ['ses-M48'])
+    os.utime(sessions_tsv, ns=(mtime, mtime))
+    assert list_subjects_sessions(str(bids), use_session_tsv=True)[1] == ['ses-M48']
@@ -0,0 +1,101 @@
+# coding: utf8
+
+"""
+    Unit tests of the execution backends of the ML validations (clinica.pipelines.machine_learning.ml_executor)
+"""
+
+import pytest
+
+
+def add(x, y):
+    return x + y
+
+
+@pytest.mark.parametrize(
+    "n_workers, n_outer_tasks, expected",
+    [
+        (1, 10, (1, 1)),
+        (15, 10, (10, 1)),
+        (16, 4, (4, 4)),
+        (15, 4, (4, 3)),
+        (3, 10, (3, 1)),
+        (8, 1, (1, 8)),
+        (8, 0, (1, 8)),
+    ],
+)
+def test_split_workers(n_workers, n_outer_tasks, expected):
+    from clinica.pipelines.machine_learning.ml_executor import split_workers
+
+    n_outer_workers, n_inner_workers = split_workers(n_workers, n_outer_tasks)
+    assert (n_outer_workers, n_inner_workers) == expected
+    assert n_outer_workers * n_inner_workers <= max(n_workers, 1)
+
+
+@pytest.mark.parametrize("backend", ["thread", "process", "loky"])
+@pytest.mark.parametrize("n_workers", [1, 3, 20])
+def test_run_tasks(backend, n_workers):
+    from clinica.pipelines.machine_learning.ml_executor import run_tasks
+
+    if backend == "loky":
+        pytest.importorskip("joblib")
+    list_args = [(i, 10 * i) for i in range(7)]
+    assert run_tasks(add, list_args, backend=backend, n_workers=n_workers) == [11 * i for i in range(7)]
+
+
+def test_run_tasks_process_backend_does_not_pickle_function():
+    """The function of the 'process' backend is inherited by the forked workers (a lambda cannot be pickled)."""
+    from clinica.pipelines.machine_learning.ml_executor import run_tasks
+
+    offset = 5
+    results = run_tasks(lambda x: x + offset, [(i,) for i in range(4)], backend="process", n_workers=2)
+    assert results == [5, 6, 7, 8]
+
+
+def test_run_tasks_unknown_backend():
+    from clinica.pipelines.machine_learning.ml_executor import run_tasks
+
+    with pytest.raises(ValueError):
+        run_tasks(add, [(1, 2)], backend="mpi")
+
+
+def test_run_evaluations_restores_n_threads():
+    from clinica.pipelines.machine_learning import base
+
+    class Algorithm(base.MLAlgorithm):
+        @staticmethod
+        def uses_kernel():
+            return False
+
+        def evaluate(self, train_index, test_index):
+            return self._algorithm_params['n_threads']
+
+        def save_classifier(self, classifier, output_dir):
+            pass
+
+        def save_parameters(self, parameters, output_dir):
+            pass
+
+        @staticmethod
+        def get_default_parameters():
+            return {'n_threads': 15}
+
+    class Validation(base.MLValidation):
+        def validate(self, y):
+            pass
+
+        @staticmethod
+        def get_default_parameters():
+            return {'n_threads': 8, 'backend': 'thread'}
+
+    algorithm = Algorithm(None, None, {'n_threads': 6})
+    validation = Validation(algorithm, {})
+    # 8 threads for 4 evaluations: 4 evaluations run at the same time, each of them using 2 threads
+    assert validation.run_evaluations(algorithm.evaluate, [(None, None)] * 4) == [2] * 4
+    assert algorithm.get_n_threads() == 6
+
+    def failing_evaluation(train_index, test_index):
+        raise RuntimeError("evaluation failed")
+
+    with pytest.raises(RuntimeError):
+        validation.run_evaluations(failing_evaluation, [(None, None)] * 2)
+    assert algorithm.get_n_threads() == 6
@@ -0,0 +1,94 @@
+# coding: utf8
+
+"""
+    Unit tests of the cgroup limits read by the resource planner of the pipelines (clinica.utils.resources)
+"""
+
+
+def write_file(path, content):
+    import os
+
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(str(path), 'w') as f:
+        f.write(content + '\n')
+
+
+def create_cgroup_v1(tmp_path):
+    cgroup_root = tmp_path / 'cgroup'
+    write_file(tmp_path / 'cgroup_file', '4:memory:/slurm/job_42\n2:cpu,cpuacct:/slurm/job_42\n1:cpuset:/\n0::/')
+    write_file(cgroup_root / 'memory' / 'memory.limit_in_bytes', '9223372036854771712')
+    write_file(cgroup_root / 'memory' / 'slurm' / 'memory.limit_in_bytes', str(64 << 30))
+    write_file(cgroup_root / 'memory' / 'slurm' / 'job_42' / 'memory.limit_in_bytes', str(8 << 30))
+    write_file(cgroup_root / 'cpu' / 'cpu.cfs_quota_us', '-1')
+    write_file(cgroup_root / 'cpu' / 'slurm' / 'job_42' / 'cpu.cfs_quota_us', '250000')
+    write_file(cgroup_root / 'cpu' / 'slurm' / 'job_42' / 'cpu.cfs_period_us', '100000')
+    return str(tmp_path / 'cgroup_file'), str(cgroup_root)
+
+
+def create_cgroup_v2(tmp_path):
+    cgroup_root = tmp_path / 'cgroup'
+    write_file(tmp_path / 'cgroup_file', '0::/user.slice/job')
+    write_file(cgroup_root / 'cpu.max', 'max 100000')
+    write_file(cgroup_root / 'user.slice' / 'memory.max', str(4 << 30))
+    write_file(cgroup_root / 'user.slice' / 'cpu.max', '400000 100000')
+    write_file(cgroup_root / 'user.slice' / 'job' / 'memory.max', 'max')
+    write_file(cgroup_root / 'user.slice' / 'job' / 'cpu.max', '150000 100000')
+    return str(tmp_path / 'cgroup_file'), str(cgroup_root)
+
+
+def use_cgroup(monkeypatch, cgroup_file, cgroup_root):
+    from clinica.utils import resources
+
+    get_cgroup_directories = resources.get_cgroup_directories
+    monkeypatch.setattr(resources, 'get_cgroup_directories',
+                        lambda controller: get_cgroup_directories(controller, cgroup_file, cgroup_root))
+
+
+def test_cgroup_directories_v1(tmp_path):
+    import os
+    from clinica.utils.resources import get_cgroup_directories
+
+    cgroup_file, cgroup_root = create_cgroup_v1(tmp_path)
+    assert get_cgroup_directories('memory', cgroup_file, cgroup_root) == [
+        os.path.join(cgroup_root, 'memory', 'slurm', 'job_42'),
+        os.path.join(cgroup_root, 'memory', 'slurm'),
+        os.path.join(cgroup_root, 'memory'),
+        cgroup_root,
+    ]
+
+
+def test_cgroup_limits_v1(tmp_path, monkeypatch):
+    from clinica.utils.resources import get_cgroup_cpu_limit, get_cgroup_memory_limit
+
+    use_cgroup(monkeypatch, *create_cgroup_v1(tmp_path))
+    assert get_cgroup_memory_limit() == 8 << 30
+    assert get_cgroup_cpu_limit() == 3
+
+
+def test_cgroup_limits_v2(tmp_path, monkeypatch):
+    from clinica.utils.resources import get_cgroup_cpu_limit, get_cgroup_memory_limit
+
+    # The limits of the parent cgroups also apply to the process
+    use_cgroup(monkeypatch, *create_cgroup_v2(tmp_path))
+    assert get_cgroup_memory_limit() == 4 << 30
+    assert get_cgroup_cpu_limit() == 2
+
+
+def test_cgroup_not_visible(tmp_path, monkeypatch):
+    """The cgroup of the process may not be mounted in a container: the root cgroup is read."""
+    from clinica.utils.resources import get_cgroup_cpu_limit, get_cgroup_memory_limit
+
+    cgroup_root = tmp_path / 'cgroup'
+    write_file(tmp_path / 'cgroup_file', '0::/docker/0123456789')
+    write_file(cgroup_root / 'memory.max', str(2 << 30))
+    use_cgroup(monkeypatch, str(tmp_path / 'cgroup_file'), str(cgroup_root))
+    assert get_cgroup_memory_limit() == 2 << 30
+    assert get_cgroup_cpu_limit() is None
+
+
+def test_no_cgroup(tmp_path, monkeypatch):
+    from clinica.utils.resources import get_cgroup_cpu_limit, get_cgroup_memory_limit
+
+    use_cgroup(monkeypatch, str(tmp_path / 'missing'), str(tmp_path / 'missing_root'))
+    assert get_cgroup_memory_limit() is None
+    assert get_cgroup_cpu_limit() is None
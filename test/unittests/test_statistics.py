@@ -0,0 +1,74 @@
+# coding: utf8
+
+"""
+    Unit tests of the single-pass label statistics (clinica.utils.statistics.label_statistics)
+"""
+
+import pytest
+
+
+def reference_statistics(img_data, labels, label_values):
+    """Statistics computed label by label with boolean masks (previous implementation)."""
+    import numpy as np
+
+    values = np.asarray(img_data, dtype=np.float64).ravel()
+    mean, std, count = [], [], []
+    for label in label_values:
+        mask = labels == label
+        count.append(int(mask.sum()))
+        mean.append(values[mask].mean() if mask.any() else np.nan)
+        std.append(values[mask].std() if mask.any() else np.nan)
+    return np.array(mean), np.array(std), np.array(count)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_label_statistics_matches_masks(seed):
+    import numpy as np
+    from clinica.utils.statistics import label_statistics
+
+    rng = np.random.RandomState(seed)
+    img_data = rng.normal(loc=100.0, scale=20.0, size=(8, 9, 10)).astype(np.float32)
+    labels = rng.randint(0, 12, size=img_data.size)
+    # Label 20 is not in the image, label 11 is
+    label_values = list(range(0, 12)) + [20]
+
+    mean, std, count = label_statistics(img_data, labels, label_values)
+    expected_mean, expected_std, expected_count = reference_statistics(img_data, labels, label_values)
+    np.testing.assert_array_equal(count, expected_count)
+    np.testing.assert_allclose(mean, expected_mean, rtol=1e-10, equal_nan=True)
+    np.testing.assert_allclose(std, expected_std, rtol=1e-8, equal_nan=True)
+
+
+def test_label_statistics_negative_labels():
+    import numpy as np
+    from clinica.utils.statistics import label_statistics
+
+    img_data = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+    labels = np.array([-1, -1, 0, 0, 0, 3])
+    mean, std, count = label_statistics(img_data, labels, [-2, -1, 0, 3])
+    np.testing.assert_array_equal(count, [0, 2, 3, 1])
+    np.testing.assert_allclose(mean, [np.nan, 1.5, 4.0, 6.0], equal_nan=True)
+    np.testing.assert_allclose(std, [np.nan, 0.5, np.sqrt(2.0 / 3.0), 0.0], equal_nan=True)
+
+
+def test_label_statistics_large_offset():
+    """The deviations to the mean avoid the cancellation of sum(x^2) - n * mean^2 on large values."""
+    import numpy as np
+    from clinica.utils.statistics import label_statistics
+
+    img_data = 1e9 + np.array([1.0, 2.0, 3.0, 4.0])
+    labels = np.array([1, 1, 1, 1])
+    mean, std, count = label_statistics(img_data, labels, [1])
+    np.testing.assert_allclose(std, [np.std([1.0, 2.0, 3.0, 4.0])], rtol=1e-9)
+
+
+def test_label_statistics_float_label_values():
+    """Label values read from atlas TSV files may be floats."""
+    import numpy as np
+    from clinica.utils.statistics import label_statistics
+
+    img_data = np.arange(6, dtype=np.float64).reshape(2, 3)
+    labels = np.array([0, 1, 1, 2, 2, 2])
+    mean, std, count = label_statistics(img_data, labels, [2.0, 1.0])
+    np.testing.assert_array_equal(count, [3, 2])
+    np.testing.assert_allclose(mean, [4.0, 1.5])